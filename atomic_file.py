@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Crash-safe file writes: write a temp file next to the target and rename it
+into place, so readers in other threads or processes see either the old or
+the new content, never a truncated file.
+"""
+import json
+import os
+import stat
+import tempfile
+
+
+def atomic_write(path, data, fsync=False):
+    """Replace path with data (str or bytes).
+
+    The file keeps the mode of the one it replaces; a new file gets the
+    usual 0666 & ~umask rather than mkstemp's 0600. With fsync=True the file
+    and its directory are flushed to disk before returning, so the new
+    content also survives a power cut.
+    """
+    folder = os.path.dirname(os.path.abspath(path))
+    os.makedirs(folder, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=folder, prefix=f'.{os.path.basename(path)}.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data.encode('utf-8') if isinstance(data, str) else data)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.chmod(tmp_path, _file_mode(path))
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+    if fsync:
+        _fsync_dir(folder)
+
+
+def write_json(path, obj, indent=None, fsync=False, ensure_ascii=True):
+    """Atomically write obj as JSON; machine-only files should keep indent=None"""
+    separators = (',', ':') if indent is None else None
+    atomic_write(path, json.dumps(obj, indent=indent, ensure_ascii=ensure_ascii, separators=separators), fsync)
+
+
+def _file_mode(path):
+    """Permission bits for a file written to path"""
+    try:
+        return stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        return 0o666 & ~umask
+
+
+def _fsync_dir(folder):
+    try:
+        fd = os.open(folder, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
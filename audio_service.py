@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Preloaded adhan/alarm playback.
+
+The configured sound is resolved and loaded once, at startup or when the
+setting changes, so an alert only starts an already-loaded player instead
+of searching for a file and spawning a decoder. WAV files are decoded into
+memory by QSoundEffect; compressed files (.oga/.mp3 adhans) are opened in
+a QMediaPlayer ahead of time. Without QtMultimedia the resolved file is
+played with paplay. Playback can fade in, and stop_all() silences it.
+"""
+import os
+import subprocess
+
+from PyQt5.QtCore import QElapsedTimer, QObject, QTimer, QUrl
+
+from config_service import get_config
+
+try:
+    from PyQt5.QtMultimedia import QMediaContent, QMediaPlayer, QSoundEffect
+except ImportError:  # QtMultimedia or its audio backend not installed
+    QSoundEffect = None
+
+SYSTEM_SOUNDS = [
+    '/usr/share/sounds/freedesktop/stereo/alarm-clock-elapsed.oga',
+    '/usr/share/sounds/freedesktop/stereo/message-new-instant.oga',
+    '/usr/share/sounds/alsa/Front_Left.wav',
+]
+RAMP_STEP_MS = 100
+RAMP_START = 0.1  # fraction of the target volume a fade-in starts at
+
+
+def resolve_sound(custom_file=''):
+    """The custom file if it exists, else the first installed system sound"""
+    candidates = [os.path.expanduser(custom_file)] if custom_file else []
+    for path in candidates + SYSTEM_SOUNDS:
+        if os.path.isfile(path):
+            return path
+    return None
+
+
+def ramp_volume(elapsed_ms, ramp_ms, target):
+    """Volume (0-1) elapsed_ms into a linear fade-in to target"""
+    if ramp_ms <= 0 or elapsed_ms >= ramp_ms:
+        return target
+    return target * (RAMP_START + (1 - RAMP_START) * elapsed_ms / ramp_ms)
+
+
+class EffectSound:
+    """WAV decoded into memory once by QSoundEffect"""
+
+    can_ramp = True
+
+    def __init__(self, path):
+        self.effect = QSoundEffect()
+        self.effect.setSource(QUrl.fromLocalFile(path))
+
+    def play(self, volume):
+        self.effect.stop()
+        self.effect.setVolume(volume)
+        self.effect.play()
+
+    def set_volume(self, volume):
+        self.effect.setVolume(volume)
+
+    def stop(self):
+        self.effect.stop()
+
+    def is_playing(self):
+        return self.effect.isPlaying()
+
+
+class MediaSound:
+    """Compressed file opened once in a QMediaPlayer"""
+
+    can_ramp = True
+
+    def __init__(self, path):
+        self.player = QMediaPlayer()
+        self.player.setMedia(QMediaContent(QUrl.fromLocalFile(path)))
+
+    def play(self, volume):
+        self.player.setPosition(0)
+        self.set_volume(volume)
+        self.player.play()
+
+    def set_volume(self, volume):
+        self.player.setVolume(round(volume * 100))
+
+    def stop(self):
+        self.player.stop()
+
+    def is_playing(self):
+        return self.player.state() == QMediaPlayer.PlayingState
+
+
+class CommandSound:
+    """paplay fallback; the file is still only resolved once"""
+
+    can_ramp = False  # paplay's volume is fixed once it has started
+
+    def __init__(self, path, popen=subprocess.Popen):
+        self.path = path
+        self.popen = popen
+        self.processes = []
+
+    def play(self, volume):
+        self.processes = [p for p in self.processes if p.poll() is None]
+        try:
+            self.processes.append(self.popen(
+                ['paplay', f'--volume={round(volume * 65536)}', self.path],
+                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL))
+        except OSError as e:
+            print(f"Could not play {self.path}: {e}")
+            print('\a')  # Fallback beep
+
+    def set_volume(self, volume):
+        pass
+
+    def stop(self):
+        for process in self.processes:
+            if process.poll() is None:
+                process.terminate()
+        self.processes = []
+
+    def is_playing(self):
+        return any(p.poll() is None for p in self.processes)
+
+
+def load_sound(path):
+    """The best available player for path, with the file already loaded"""
+    if QSoundEffect is None:
+        return CommandSound(path)
+    if path.lower().endswith('.wav'):
+        return EffectSound(path)
+    return MediaSound(path)
+
+
+class AudioService(QObject):
+    """The configured alert sound, loaded once and replayed on demand"""
+
+    def __init__(self, settings=None, load=load_sound, parent=None):
+        super().__init__(parent)
+        self.load = load
+        self.sound = None
+        self.path = None
+        self.volume = 1.0
+        self.ramp_ms = 0
+        self.plays = 0
+        self.ramp_clock = QElapsedTimer()
+        self.ramp_timer = QTimer(self)
+        self.ramp_timer.setInterval(RAMP_STEP_MS)
+        self.ramp_timer.timeout.connect(self.ramp_step)
+        if settings is not None:
+            self.configure(settings)
+
+    def configure(self, settings):
+        """Apply notification settings; the file is only reloaded if it changed"""
+        self.volume = max(0, min(100, settings.get('sound_volume', 100))) / 100
+        self.ramp_ms = max(0, settings.get('volume_ramp_seconds', 0)) * 1000
+        path = resolve_sound(settings.get('adhan_file', ''))
+        if path == self.path and self.sound is not None:
+            return
+        self.stop_all()
+        self.path = path
+        self.sound = None
+        if path:
+            try:
+                self.sound = self.load(path)
+                print(f"Audio: loaded {path}")
+            except Exception as e:
+                print(f"Could not load sound {path}: {e}")
+
+    def play(self):
+        """Start the sound from the beginning; False if there is none to play"""
+        if self.sound is None:
+            print('\a')  # Fallback beep
+            return False
+        self.plays += 1
+        ramp = self.ramp_ms > 0 and self.sound.can_ramp
+        self.sound.play(ramp_volume(0, self.ramp_ms, self.volume) if ramp else self.volume)
+        if ramp:
+            self.ramp_clock.start()
+            self.ramp_timer.start()
+        else:
+            self.ramp_timer.stop()
+        return True
+
+    def ramp_step(self):
+        elapsed = self.ramp_clock.elapsed()
+        self.sound.set_volume(ramp_volume(elapsed, self.ramp_ms, self.volume))
+        if elapsed >= self.ramp_ms:
+            self.ramp_timer.stop()
+
+    def stop_all(self):
+        """Silence anything playing"""
+        self.ramp_timer.stop()
+        if self.sound is not None:
+            self.sound.stop()
+
+    def is_playing(self):
+        return self.sound is not None and self.sound.is_playing()
+
+
+_service = None
+
+
+def get_audio():
+    """The process-wide AudioService (create after the QApplication)"""
+    global _service
+    if _service is None:
+        _service = AudioService(get_config().notification_settings())
+    return _service
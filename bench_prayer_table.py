@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Benchmark the vectorized prayer table against the scalar per-day loop
+"""
+
+import sys
+import time
+from datetime import date, timedelta
+
+import prayer_calc
+from ultra_modern_salah import CITIES
+
+
+def main():
+    days = int(sys.argv[1]) if len(sys.argv) > 1 else 365
+    start = date(date.today().year, 1, 1)
+    coordinates = [(city['lat'], city['lon']) for city in CITIES.values()]
+    city_days = len(coordinates) * days
+    print(f"{len(coordinates)} cities x {days} days = {city_days} city-days")
+
+    t0 = time.perf_counter()
+    for lat, lon in coordinates:
+        for i in range(days):
+            prayer_calc.compute_minutes(lat, lon, start + timedelta(days=i))
+    scalar = time.perf_counter() - t0
+    print(f"  scalar loop  {scalar * 1000:9.1f} ms  {city_days / scalar:12,.0f} city-days/s")
+
+    if prayer_calc.np is None:
+        print("  numpy not installed, vectorized path unavailable")
+        return
+
+    t0 = time.perf_counter()
+    table = prayer_calc.compute_table(coordinates, start, days)
+    vectorized = time.perf_counter() - t0
+    print(f"  vectorized   {vectorized * 1000:9.1f} ms  {city_days / vectorized:12,.0f} city-days/s")
+    print(f"  speedup {scalar / vectorized:.1f}x, table {table.nbytes / 1024:.0f} KiB ({table.dtype})")
+
+
+if __name__ == "__main__":
+    main()
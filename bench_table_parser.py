@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+Benchmark the streaming table parser against the BeautifulSoup path
+"""
+
+import sys
+import time
+
+import prayer_table_parser
+from test_table_parser import FIXTURES, load_fixture, parse_with_bs4, parse_with_backend
+
+
+def bench(label, func, html, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        func(html)
+    elapsed = time.perf_counter() - start
+    per_page = elapsed / rounds * 1000
+    print(f"  {label:<14} {per_page:8.3f} ms/page")
+    return per_page
+
+
+def main():
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    for name in FIXTURES:
+        html = load_fixture(name)
+        print(f"{name} ({len(html)} bytes, {rounds} rounds)")
+        baseline = bench("bs4", parse_with_bs4, html, rounds)
+        stdlib = bench("html.parser", lambda h: parse_with_backend(h, False), html, rounds)
+        print(f"  html.parser speedup: {baseline / stdlib:.1f}x")
+        if prayer_table_parser.etree is not None:
+            fast = bench("lxml", lambda h: parse_with_backend(h, True), html, rounds)
+            print(f"  lxml speedup: {baseline / fast:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Benchmark tray icon updates: render + setIcon on every tick against the
+cached icons with setIcon only when the HH:MM text changes
+"""
+
+import os
+import subprocess
+import sys
+import time
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt5.QtWidgets import QApplication, QSystemTrayIcon
+
+from tray_icon import TrayIconCache, render_tray_icon
+
+
+def rss_kib():
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') // 1024
+
+
+def ticks(count):
+    """HH:MM texts a 1 s tick would show counting down from 05:00"""
+    remaining = 5 * 3600
+    for _ in range(count):
+        yield f"{remaining // 3600:02d}:{remaining % 3600 // 60:02d}"
+        remaining = max(0, remaining - 1)
+
+
+def uncached(tray, texts):
+    for text in texts:
+        tray.setIcon(render_tray_icon(text))
+
+
+def cached(tray, texts):
+    cache = TrayIconCache()
+    shown = None
+    for text in texts:
+        if text != shown:
+            shown = text
+            tray.setIcon(cache.get(text))
+    return cache
+
+
+def run(mode, count):
+    """One mode in a fresh process, so its resident memory is its own"""
+    app = QApplication(sys.argv[:1])
+    tray = QSystemTrayIcon()
+    before = rss_kib()
+    start = time.perf_counter()
+    result = (uncached if mode == 'uncached' else cached)(tray, ticks(count))
+    elapsed = time.perf_counter() - start
+    line = f"  {mode:<10} {count / elapsed:12,.0f} updates/s  RSS {before:,} -> {rss_kib():,} KiB"
+    if result is not None:
+        line += f"  ({result.misses} icons rendered, {len(result.icons)} kept)"
+    print(line)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 3600
+    if len(sys.argv) > 2:
+        run(sys.argv[2], count)
+        return
+    print(f"{count} one-second ticks")
+    for mode in ('uncached', 'cached'):
+        sys.stdout.flush()
+        subprocess.run([sys.executable, os.path.abspath(__file__), str(count), mode], check=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Process-wide in-memory cache of each city's prayer times.
+
+Entries hold a city's whole cached range and are checked against the
+store's version (SQLite data_version plus this process's own writes), so a
+refresh by the main app or another process invalidates them, and the least
+recently used city is evicted beyond max_cities. Month/week navigation and
+the timezone view are then served from memory once a city is warm.
+"""
+import threading
+from collections import OrderedDict
+from datetime import datetime
+
+from prayer_store import get_store
+
+
+class CityDataCache:
+    """LRU of {city: {date: times}}, validated against the store version"""
+
+    def __init__(self, store, max_cities=16):
+        self.store = store
+        self.max_cities = max_cities
+        self.entries = OrderedDict()
+        self.version = None
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _check_version(self):
+        version = self.store.version()
+        if version != self.version:
+            self.entries.clear()
+            self.version = version
+
+    def get_city(self, city):
+        """{date: times} for every cached day of a city"""
+        with self.lock:
+            self._check_version()
+            days = self.entries.get(city)
+            if days is not None:
+                self.entries.move_to_end(city)
+                self.hits += 1
+                return days
+            self.misses += 1
+            days = self.store.get_city(city)
+            self.entries[city] = days
+            while len(self.entries) > self.max_cities:
+                self.entries.popitem(last=False)
+            return days
+
+    def get_day(self, city, day):
+        if isinstance(day, datetime):
+            day = day.date()
+        return self.get_city(city).get(day)
+
+    def get_range(self, city, start, end):
+        """{date: times} for start <= date < end"""
+        if isinstance(start, datetime):
+            start = start.date()
+        if isinstance(end, datetime):
+            end = end.date()
+        return {day: times for day, times in self.get_city(city).items() if start <= day < end}
+
+    def get_cities_day(self, cities, day):
+        """{city: times} for several cities on one day"""
+        result = {}
+        for city in cities:
+            times = self.get_day(city, day)
+            if times is not None:
+                result[city] = times
+        return result
+
+    def invalidate(self, city=None):
+        with self.lock:
+            if city is None:
+                self.entries.clear()
+            else:
+                self.entries.pop(city, None)
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_city_cache():
+    """The shared CityDataCache over the default prayer time store"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = CityDataCache(get_store())
+        return _cache
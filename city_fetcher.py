@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Concurrent, rate-limited page fetcher used to refresh all cities at once
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import requests
+from requests.adapters import HTTPAdapter
+
+YABILADI_CITY_URL = 'https://www.yabiladi.com/prieres/details/{}/city.html'
+
+
+class TokenBucket:
+    """Simple thread-safe token bucket (rate tokens/second, up to burst)"""
+
+    def __init__(self, rate, burst=1, clock=time.monotonic, sleep=time.sleep):
+        self.rate = float(rate)
+        self.capacity = max(1, int(burst))
+        self.tokens = float(self.capacity)
+        self.clock = clock
+        self.sleep = sleep
+        self.last = clock()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available"""
+        if self.rate <= 0:
+            return
+        while True:
+            with self.lock:
+                now = self.clock()
+                self.tokens = min(self.capacity, self.tokens + (now - self.last) * self.rate)
+                self.last = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            self.sleep(wait)
+
+
+class CityFetcher:
+    """Fetch many pages in parallel over one keep-alive session"""
+
+    def __init__(self, max_workers=6, rate_per_second=8.0, burst=4, timeout=10):
+        self.max_workers = max(1, int(max_workers))
+        self.timeout = timeout
+        self.bucket = TokenBucket(rate_per_second, burst)
+        self.last_elapsed = 0.0
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_workers)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers.update({
+            'Accept-Encoding': 'gzip, deflate',
+            'Connection': 'keep-alive',
+            'User-Agent': 'SalahTimes/2.0',
+        })
+
+    def fetch(self, url, headers=None):
+        """Fetch a single URL through the shared session.
+
+        A 304 Not Modified answer to a conditional request is returned as is.
+        """
+        self.bucket.acquire()
+        response = self.session.get(url, headers=headers, timeout=self.timeout)
+        response.raise_for_status()
+        return response
+
+    def fetch_all(self, urls, on_result=None):
+        """Fetch {key: url} or {key: (url, headers)} concurrently.
+
+        Returns {key: response or exception}. If given, on_result(key, result)
+        is called in the caller's thread as each page completes.
+        """
+        results = {}
+        start = time.monotonic()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {}
+            for key, target in urls.items():
+                url, headers = target if isinstance(target, tuple) else (target, None)
+                futures[pool.submit(self.fetch, url, headers)] = key
+            for future in as_completed(futures):
+                key = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    result = e
+                results[key] = result
+                if on_result:
+                    try:
+                        on_result(key, result)
+                    except Exception as e:
+                        print(f"Error handling {key}: {e}")
+
+        self.last_elapsed = time.monotonic() - start
+        return results
+
+    def close(self):
+        self.session.close()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Notice suspend/resume, wall clock steps and time zone changes.
+
+QTimers run on the monotonic clock, which stops while the machine sleeps,
+so a timer armed for the adhan fires late after a resume. ClockMonitor
+compares the monotonic, boot and wall clocks on a coarse timer and
+reports a jump as soon as it sees one; with logind available it also
+checks right on PrepareForSleep(false), without waiting for the timer.
+"""
+import time
+
+from PyQt5.QtCore import QObject, Qt, QTimer, pyqtSignal, pyqtSlot
+from PyQt5.QtDBus import QDBusConnection, QDBusMessage
+
+LOGIND_SERVICE = 'org.freedesktop.login1'
+LOGIND_PATH = '/org/freedesktop/login1'
+LOGIND_MANAGER = 'org.freedesktop.login1.Manager'
+
+CHECK_INTERVAL_MS = 60 * 1000
+JUMP_THRESHOLD = 2.0  # seconds of disagreement between clocks
+
+
+class SystemClock:
+    """The real clocks; boot time keeps counting while suspended (Linux)"""
+
+    def monotonic(self):
+        return time.monotonic()
+
+    def boottime(self):
+        if hasattr(time, 'CLOCK_BOOTTIME'):
+            return time.clock_gettime(time.CLOCK_BOOTTIME)
+        return time.monotonic()
+
+    def time(self):
+        return time.time()
+
+    def utc_offset(self):
+        time.tzset()  # pick up a changed /etc/localtime or TZ
+        return time.localtime().tm_gmtoff
+
+
+class ClockMonitor(QObject):
+    """Emit clock_jumped(reason, seconds) when wall time moves unexpectedly.
+
+    reason is 'resume' (seconds asleep), 'timezone' (change of the UTC
+    offset) or 'clock' (wall clock stepped, negative if set back). Without
+    CLOCK_BOOTTIME a suspend is reported as 'clock'.
+    """
+
+    clock_jumped = pyqtSignal(str, float)
+    suspending = pyqtSignal()
+
+    def __init__(self, clock=None, interval_ms=CHECK_INTERVAL_MS, threshold=JUMP_THRESHOLD, parent=None):
+        super().__init__(parent)
+        self.clock = clock or SystemClock()
+        self.threshold = threshold
+        self.jumps = 0
+        self.last = self.sample()
+        self.timer = QTimer(self)
+        self.timer.setTimerType(Qt.VeryCoarseTimer)
+        self.timer.setInterval(interval_ms)
+        self.timer.timeout.connect(self.check)
+
+    def start(self):
+        self.last = self.sample()
+        self.timer.start()
+
+    def stop(self):
+        self.timer.stop()
+
+    def sample(self):
+        return (self.clock.monotonic(), self.clock.boottime(), self.clock.time(), self.clock.utc_offset())
+
+    def check(self):
+        """Compare the clocks with the last sample; returns the jump reported, if any"""
+        current = self.sample()
+        monotonic, boot, wall, offset = current
+        last_monotonic, last_boot, last_wall, last_offset = self.last
+        self.last = current
+        slept = (boot - monotonic) - (last_boot - last_monotonic)
+        stepped = (wall - boot) - (last_wall - last_boot)
+        if slept > self.threshold:
+            jump = ('resume', slept + stepped)
+        elif offset != last_offset:
+            jump = ('timezone', float(offset - last_offset))
+        elif abs(stepped) > self.threshold:
+            jump = ('clock', stepped)
+        else:
+            return None
+        self.jumps += 1
+        self.clock_jumped.emit(*jump)
+        return jump
+
+    def listen_for_sleep(self, bus=None):
+        """Also check on logind's PrepareForSleep; False if logind is unreachable"""
+        bus = bus if bus is not None else QDBusConnection.systemBus()
+        if not bus.isConnected():
+            return False
+        return bus.connect(LOGIND_SERVICE, LOGIND_PATH, LOGIND_MANAGER, 'PrepareForSleep',
+                           self.on_prepare_for_sleep)
+
+    @pyqtSlot(QDBusMessage)
+    def on_prepare_for_sleep(self, message):
+        if message.arguments()[0]:
+            self.suspending.emit()
+        else:
+            self.check()
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Process-wide config service for the main app, the tray and the dialogs.
+
+Every config file is a named section with typed defaults. A section is read
+from disk once and then served from memory; writes go through atomic_file
+and update the in-memory copy, so reading settings (e.g. on every
+notification) does no file I/O. Changes made by another process are picked
+up with reload_changed().
+"""
+import copy
+import json
+import os
+import threading
+from contextlib import contextmanager
+
+from atomic_file import write_json
+
+SALAH_DIR = os.path.join(os.path.expanduser('~'), '.salah_times')
+
+DEFAULT_IQAMA = {'Fajr': 20, 'Dohr': 15, 'Asr': 15, 'Maghreb': 10, 'Isha': 15}
+DEFAULT_PRAYER_NOTIFICATION = {'enabled': True, 'repeat_count': 3}
+DEFAULT_NOTIFICATIONS = {
+    'sound_enabled': True,
+    'snooze_duration': 5,
+    'notification_interval': 2,
+    'pre_alert_minutes': 0,
+    'alarm_dialog': False,  # show PrayerAlarmDialog at the adhan
+    'missed_prayer_notice': True,  # one notice for adhans slept through
+    'adhan_file': '',  # custom adhan/alarm sound, empty for the system sound
+    'sound_volume': 100,
+    'volume_ramp_seconds': 0,
+    'Fajr': DEFAULT_PRAYER_NOTIFICATION,
+    'Dohr': DEFAULT_PRAYER_NOTIFICATION,
+    'Asr': DEFAULT_PRAYER_NOTIFICATION,
+    'Maghreb': DEFAULT_PRAYER_NOTIFICATION,
+    'Isha': DEFAULT_PRAYER_NOTIFICATION,
+}
+
+# name: (path relative to ~/.salah_times, defaults, human-edited)
+# Human-edited files keep indent=2 and are fsynced, machine-only ones are compact
+SECTIONS = {
+    'app': ('config/app_config.json',
+            {'city': 'Tangier', 'language': 'en', 'fetch_concurrency': 6, 'fetch_rate': 8.0,
+             'cache_format': 'sqlite', 'second_ticks_window': 600}, True),
+    'iqama': ('config/iqama_times.json', DEFAULT_IQAMA, True),
+    'notifications': ('config/notifications.json', DEFAULT_NOTIFICATIONS, True),
+    'tray': ('tray/tray_config.json', {}, True),
+    'main_geometry': ('config/main_geometry.json', {}, False),
+    'settings_geometry': ('config/settings_geometry.json', {}, False),
+    'last_update': ('config/last_update.json', {}, False),
+}
+
+
+def coerce(value, default):
+    """Give value the type of default, or return default if it cannot be"""
+    if default is None:
+        return value
+    if isinstance(default, dict):
+        if not isinstance(value, dict):
+            return copy.deepcopy(default)
+        merged = {key: coerce(value[key], sub) if key in value else copy.deepcopy(sub)
+                  for key, sub in default.items()}
+        for key, sub in value.items():
+            if key not in merged:
+                merged[key] = sub
+        return merged
+    if isinstance(default, bool):
+        return value if isinstance(value, bool) else default
+    if isinstance(default, (int, float)):
+        if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+            return default
+        try:
+            return type(default)(value)
+        except ValueError:
+            return default
+    if isinstance(default, str):
+        return value if isinstance(value, str) else default
+    return value
+
+
+class ConfigService:
+    """Typed, cached access to all config sections"""
+
+    def __init__(self, base_dir=SALAH_DIR):
+        self.base_dir = base_dir
+        self.lock = threading.RLock()
+        self.raw = {}           # section -> dict as saved on disk
+        self.data = {}          # section -> raw merged with defaults
+        self.signatures = {}    # section -> (mtime_ns, size) of the file we last read or wrote
+        self.dirty = None       # set of sections while inside batch()
+
+    def path(self, section):
+        return os.path.join(self.base_dir, SECTIONS[section][0])
+
+    def _signature(self, section):
+        try:
+            stat = os.stat(self.path(section))
+            return stat.st_mtime_ns, stat.st_size
+        except OSError:
+            return None
+
+    def _load(self, section):
+        _, defaults, _ = SECTIONS[section]
+        raw = {}
+        signature = self._signature(section)
+        if signature is not None:
+            try:
+                with open(self.path(section), 'r', encoding='utf-8') as f:
+                    raw = json.load(f)
+            except Exception as e:
+                print(f"Could not load {section} config: {e}")
+        if not isinstance(raw, dict):
+            raw = {}
+        self.raw[section] = raw
+        self.data[section] = coerce(raw, defaults)
+        self.signatures[section] = signature
+
+    def get(self, section):
+        """The section as a dict merged with its defaults.
+
+        The returned dict is shared; change settings with update() or replace().
+        """
+        with self.lock:
+            if section not in self.data:
+                self._load(section)
+            return self.data[section]
+
+    def value(self, section, key, default=None):
+        return self.get(section).get(key, default)
+
+    def iqama_delays(self):
+        return self.get('iqama')
+
+    def iqama_delay(self, prayer):
+        return self.get('iqama').get(prayer, 15)
+
+    def notification_settings(self):
+        return self.get('notifications')
+
+    def prayer_notification(self, prayer):
+        return self.get('notifications').get(prayer, DEFAULT_PRAYER_NOTIFICATION)
+
+    def update(self, section, values):
+        """Merge values into a section and save it"""
+        with self.lock:
+            self.get(section)
+            data = dict(self.raw[section])
+            data.update(values)
+            self._store(section, data)
+
+    def replace(self, section, data):
+        """Replace a section's saved content"""
+        with self.lock:
+            self._store(section, dict(data))
+
+    def _store(self, section, data):
+        self.raw[section] = data
+        self.data[section] = coerce(data, SECTIONS[section][1])
+        if self.dirty is not None:
+            self.dirty.add(section)
+        else:
+            self._write(section)
+
+    def _write(self, section):
+        _, _, human = SECTIONS[section]
+        write_json(self.path(section), self.raw[section], indent=2 if human else None, fsync=human)
+        self.signatures[section] = self._signature(section)
+
+    @contextmanager
+    def batch(self):
+        """Group updates; each touched file is written once when the block ends.
+
+        If the block raises, nothing is written and the touched sections are
+        reloaded from disk on their next use.
+        """
+        with self.lock:
+            if self.dirty is not None:
+                yield self
+                return
+            self.dirty = set()
+            try:
+                yield self
+            except BaseException:
+                dirty, self.dirty = self.dirty, None
+                for section in dirty:
+                    self.data.pop(section, None)
+                    self.raw.pop(section, None)
+                raise
+            dirty, self.dirty = self.dirty, None
+            for section in sorted(dirty):
+                self._write(section)
+
+    def ensure_defaults(self, *sections):
+        """Create missing section files with their defaults"""
+        with self.lock:
+            for section in sections:
+                if not os.path.exists(self.path(section)):
+                    self.replace(section, copy.deepcopy(SECTIONS[section][1]))
+
+    def reload_changed(self):
+        """Drop sections whose file changed behind our back; returns their names"""
+        changed = set()
+        with self.lock:
+            for section in list(self.data):
+                if self._signature(section) != self.signatures.get(section):
+                    del self.data[section]
+                    del self.raw[section]
+                    changed.add(section)
+        return changed
+
+    def invalidate(self, section=None):
+        with self.lock:
+            if section is None:
+                self.data.clear()
+                self.raw.clear()
+            else:
+                self.data.pop(section, None)
+                self.raw.pop(section, None)
+
+
+_config = None
+_config_lock = threading.Lock()
+
+
+def get_config():
+    """The shared ConfigService for ~/.salah_times"""
+    global _config
+    with _config_lock:
+        if _config is None:
+            _config = ConfigService()
+        return _config
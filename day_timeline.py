@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Immutable per-day timeline of adhan and iqama events.
+
+The "HH:MM" strings are parsed once when the timeline is built; every later
+query (current prayer, next prayer, countdowns) is a bisect over sorted
+integer seconds since midnight.
+"""
+from bisect import bisect_left, bisect_right
+
+DAY_SECONDS = 24 * 3600
+DEFAULT_IQAMA_DELAY = 15
+
+
+def parse_hhmm(time_str):
+    """'HH:MM' -> minutes since midnight, or None if it is not a time"""
+    try:
+        hours, minutes = map(int, time_str.split(':'))
+        return hours * 60 + minutes
+    except (AttributeError, ValueError):
+        return None
+
+
+def format_hms(seconds):
+    h = seconds // 3600
+    m = (seconds % 3600) // 60
+    s = seconds % 60
+    return f"{h:02d}:{m:02d}:{s:02d}"
+
+
+def format_hhmm(seconds):
+    minutes = (seconds // 60) % (24 * 60)
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+class DayTimeline:
+    """Sorted adhan/iqama events for one city and day"""
+
+    __slots__ = ('day', 'names', 'times', 'texts', 'iqama', 'events', 'event_times')
+
+    def __init__(self, prayer_times, iqama_delays=None, day=None, default_delay=DEFAULT_IQAMA_DELAY):
+        iqama_delays = iqama_delays or {}
+        prayers = []
+        for name, text in prayer_times.items():
+            if name == 'Date':
+                continue
+            minutes = parse_hhmm(text)
+            if minutes is not None:
+                prayers.append((minutes * 60, name, text))
+        prayers.sort(key=lambda p: p[0])
+
+        self.day = day
+        self.names = tuple(p[1] for p in prayers)
+        self.times = tuple(p[0] for p in prayers)
+        self.texts = {p[1]: p[2] for p in prayers}
+        self.iqama = {name: secs + iqama_delays.get(name, default_delay) * 60
+                      for secs, name, _ in prayers}
+
+        events = [(secs, 'adhan', name) for secs, name, _ in prayers]
+        events += [(secs, 'iqama', name) for name, secs in self.iqama.items()]
+        events.sort()
+        self.events = tuple(events)
+        self.event_times = tuple(e[0] for e in events)
+
+    def __bool__(self):
+        return bool(self.names)
+
+    def time_of(self, name):
+        """Adhan time as seconds since midnight"""
+        return self.times[self.names.index(name)]
+
+    def text(self, name, default='--:--'):
+        return self.texts.get(name, default)
+
+    def current(self, now_secs):
+        """Prayer whose period contains now (None before the first one)"""
+        i = bisect_right(self.times, now_secs)
+        return self.names[i - 1] if i else None
+
+    def next(self, now_secs):
+        """(name, seconds until it, is_tomorrow) for the next adhan"""
+        if not self.names:
+            return None, 0, False
+        i = bisect_right(self.times, now_secs)
+        if i < len(self.times):
+            return self.names[i], self.times[i] - now_secs, False
+        return self.names[0], DAY_SECONDS - now_secs + self.times[0], True
+
+    def seconds_until(self, name, now_secs):
+        """Seconds until a prayer's adhan, wrapping to tomorrow once passed"""
+        remaining = self.time_of(name) - now_secs
+        if remaining <= 0:
+            remaining += DAY_SECONDS
+        return remaining
+
+    def iqama_time(self, name):
+        return self.iqama[name]
+
+    def seconds_until_iqama(self, name, now_secs):
+        """Seconds until a prayer's iqama (may be negative once passed)"""
+        return self.iqama[name] - now_secs
+
+    def in_iqama_window(self, name, now_secs):
+        """True between a prayer's adhan and its iqama"""
+        if name not in self.iqama:
+            return False
+        return self.time_of(name) <= now_secs < self.iqama[name]
+
+    def next_event(self, now_secs):
+        """(seconds, kind, name) of the next adhan or iqama today, or None"""
+        i = bisect_right(self.event_times, now_secs)
+        return self.events[i] if i < len(self.events) else None
+
+    def events_between(self, start_secs, end_secs):
+        """Events with start_secs <= time < end_secs"""
+        return self.events[bisect_left(self.event_times, start_secs):bisect_left(self.event_times, end_secs)]
+
+
+def seconds_since_midnight(now):
+    return now.hour * 3600 + now.minute * 60 + now.second
@@ -1,7 +1,5 @@
 #!/usr/bin/env python3
 import sys
-import os
-import json
 import calendar
 from datetime import datetime, timedelta
 from PyQt5.QtWidgets import *
@@ -10,13 +8,13 @@ from PyQt5.QtGui import *
 
 # Import from main app
 from ultra_modern_salah import TRANSLATIONS, CITIES
+from city_cache import get_city_cache
 
 class MonthlyCalendarDialog(QDialog):
     def __init__(self, current_city, current_language, parent=None):
         super().__init__(parent)
         self.current_city = current_city
         self.current_language = current_language
-        self.data_folder = os.path.join(os.path.expanduser('~'), '.salah_times', 'cities')
         self.current_date = datetime.now()
         self.init_ui()
         self.load_monthly_data()
@@ -112,7 +110,9 @@ class MonthlyCalendarDialog(QDialog):
         self.month_label.setText(f"{month_name} {self.current_date.year}")
         
         # Load prayer data for this month
-        prayer_data = self.load_city_data()
+        month_start = self.current_date.date().replace(day=1)
+        month_end = (month_start + timedelta(days=31)).replace(day=1)
+        prayer_data = self.load_city_data(month_start, month_end)
         
         # Get calendar for this month
         cal = calendar.monthcalendar(self.current_date.year, self.current_date.month)
@@ -130,7 +130,6 @@ class MonthlyCalendarDialog(QDialog):
                 if day == 0:
                     continue
                 
-                date_str = f"{day:02d}/{self.current_date.month:02d}"
                 current_day = datetime(self.current_date.year, self.current_date.month, day)
                 
                 # Date column
@@ -146,8 +145,8 @@ class MonthlyCalendarDialog(QDialog):
                 self.calendar_table.setItem(row, 0, date_item)
                 
                 # Prayer times
-                if prayer_data and date_str in prayer_data:
-                    day_prayers = prayer_data[date_str]
+                if current_day.date() in prayer_data:
+                    day_prayers = prayer_data[current_day.date()]
                     prayers = ['Fajr', 'Sunrise', 'Dohr', 'Asr', 'Maghreb', 'Isha']
                     
                     for col, prayer in enumerate(prayers, 1):
@@ -164,13 +163,10 @@ class MonthlyCalendarDialog(QDialog):
                 
                 row += 1
     
-    def load_city_data(self):
+    def load_city_data(self, start, end):
+        """{date: prayer times} for start <= date < end"""
         try:
-            city_file = os.path.join(self.data_folder, f'{self.current_city.lower()}.json')
-            if os.path.exists(city_file):
-                with open(city_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    return data.get('prayer_times', {})
+            return get_city_cache().get_range(self.current_city, start, end)
         except Exception as e:
             print(f"Error loading city data: {e}")
         return {}
@@ -189,7 +185,6 @@ class WeeklyScheduleDialog(QDialog):
         super().__init__(parent)
         self.current_city = current_city
         self.current_language = current_language
-        self.data_folder = os.path.join(os.path.expanduser('~'), '.salah_times', 'cities')
         self.current_date = datetime.now()
         # Get start of week (Monday)
         self.week_start = self.current_date - timedelta(days=self.current_date.weekday())
@@ -288,13 +283,12 @@ class WeeklyScheduleDialog(QDialog):
             self.week_label.setText(f"{self.week_start.day} {start_month} - {week_end.day} {end_month} {self.week_start.year}")
         
         # Load prayer data
-        prayer_data = self.load_city_data()
+        prayer_data = self.load_city_data(self.week_start.date(), self.week_start.date() + timedelta(days=7))
         today = datetime.now().date()
         
         # Fill weekly data
         for i in range(7):
             current_day = self.week_start + timedelta(days=i)
-            date_str = current_day.strftime('%d/%m')
             
             # Day name and date
             day_name = self.tr('days')[current_day.weekday()]
@@ -309,8 +303,8 @@ class WeeklyScheduleDialog(QDialog):
             self.weekly_table.setItem(i, 0, day_item)
             
             # Prayer times
-            if prayer_data and date_str in prayer_data:
-                day_prayers = prayer_data[date_str]
+            if current_day.date() in prayer_data:
+                day_prayers = prayer_data[current_day.date()]
                 prayers = ['Fajr', 'Sunrise', 'Dohr', 'Asr', 'Maghreb', 'Isha']
                 
                 for col, prayer in enumerate(prayers, 1):
@@ -325,13 +319,10 @@ class WeeklyScheduleDialog(QDialog):
                     no_data_item.setTextAlignment(Qt.AlignCenter)
                     self.weekly_table.setItem(i, col, no_data_item)
     
-    def load_city_data(self):
+    def load_city_data(self, start, end):
+        """{date: prayer times} for start <= date < end"""
         try:
-            city_file = os.path.join(self.data_folder, f'{self.current_city.lower()}.json')
-            if os.path.exists(city_file):
-                with open(city_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    return data.get('prayer_times', {})
+            return get_city_cache().get_range(self.current_city, start, end)
         except Exception as e:
             print(f"Error loading city data: {e}")
         return {}
@@ -350,7 +341,6 @@ class TimezoneViewDialog(QDialog):
         super().__init__(parent)
         self.current_city = current_city
         self.current_language = current_language
-        self.data_folder = os.path.join(os.path.expanduser('~'), '.salah_times', 'cities')
         # Default major cities for comparison
         self.selected_cities = ['Tangier', 'Casablanca', 'Rabat', 'Marrakech', 'Fes', 'Agadir']
         if self.current_city not in self.selected_cities:
@@ -438,8 +428,8 @@ class TimezoneViewDialog(QDialog):
             self.load_timezone_data()
     
     def load_timezone_data(self):
-        today = datetime.now().strftime('%d/%m')
         current_time = datetime.now()
+        prayer_data_by_city = self.load_cities_data(self.selected_cities, current_time.date())
         
         # Update table size
         self.timezone_table.setRowCount(len(self.selected_cities))
@@ -462,11 +452,9 @@ class TimezoneViewDialog(QDialog):
             time_item.setTextAlignment(Qt.AlignCenter)
             self.timezone_table.setItem(row, 1, time_item)
             
-            # Load prayer data for this city
-            prayer_data = self.load_city_data(city)
-            
-            if prayer_data and today in prayer_data:
-                day_prayers = prayer_data[today]
+            # Prayer data for this city
+            if city in prayer_data_by_city:
+                day_prayers = prayer_data_by_city[city]
                 prayers = ['Fajr', 'Sunrise', 'Dohr', 'Asr', 'Maghreb', 'Isha']
                 
                 for col, prayer in enumerate(prayers, 2):
@@ -486,15 +474,12 @@ class TimezoneViewDialog(QDialog):
                     no_data_item.setTextAlignment(Qt.AlignCenter)
                     self.timezone_table.setItem(row, col, no_data_item)
     
-    def load_city_data(self, city):
+    def load_cities_data(self, cities, day):
+        """{city: prayer times} for one day from the shared city cache"""
         try:
-            city_file = os.path.join(self.data_folder, f'{city.lower()}.json')
-            if os.path.exists(city_file):
-                with open(city_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    return data.get('prayer_times', {})
+            return get_city_cache().get_cities_day(cities, day)
         except Exception as e:
-            print(f"Error loading city data for {city}: {e}")
+            print(f"Error loading city data: {e}")
         return {}
     
     def tr(self, key):
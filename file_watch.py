@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Debounced file watching on top of QFileSystemWatcher (inotify on Linux).
+
+Config and cache files are replaced by renaming a temp file over them,
+which drops the inotify watch on the old inode. The parent directories are
+therefore watched as well and file watches are re-added after every event.
+Bursts of events (temp file created, renamed, WAL appended...) are coalesced
+into a single changed() signal.
+"""
+import os
+
+from PyQt5.QtCore import QFileSystemWatcher, QObject, QTimer, pyqtSignal
+
+
+class DebouncedWatcher(QObject):
+    """Emit changed(paths) once per burst of file system events"""
+
+    changed = pyqtSignal(list)
+
+    def __init__(self, delay_ms=300, parent=None):
+        super().__init__(parent)
+        self.files = set()
+        self.directories = set()
+        self.pending = set()
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.fileChanged.connect(self.on_event)
+        self.watcher.directoryChanged.connect(self.on_event)
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(delay_ms)
+        self.timer.timeout.connect(self.flush)
+
+    def add_file(self, path):
+        """Watch a file, which may not exist yet, and its directory"""
+        self.files.add(path)
+        self.directories.add(os.path.dirname(path))
+        self.rearm()
+
+    def add_directory(self, path):
+        self.directories.add(path)
+        self.rearm()
+
+    def remove_file(self, path):
+        self.files.discard(path)
+        if path in self.watcher.files():
+            self.watcher.removePath(path)
+
+    def rearm(self):
+        """(Re)add watches for every tracked path that currently exists"""
+        watched = set(self.watcher.files()) | set(self.watcher.directories())
+        missing = [p for p in sorted(self.directories | self.files) if p not in watched and os.path.exists(p)]
+        if missing:
+            self.watcher.addPaths(missing)
+
+    def on_event(self, path):
+        self.pending.add(path)
+        self.rearm()
+        self.timer.start()  # restart: wait for the burst to settle
+
+    def flush(self):
+        paths = sorted(self.pending)
+        self.pending.clear()
+        self.rearm()
+        if paths:
+            self.changed.emit(paths)
@@ -11,7 +11,7 @@ from kivy.uix.scrollview import ScrollView
 from kivy.clock import Clock
 from kivy.metrics import dp
 import requests
-from bs4 import BeautifulSoup
+from prayer_table_parser import parse_prayer_table
 from datetime import datetime, timedelta
 import threading
 import json
@@ -200,24 +200,13 @@ class SalahTimesApp(App):
             response = requests.get(url, timeout=10)
             response.raise_for_status()
             
-            soup = BeautifulSoup(response.text, 'html.parser')
-            prayer_table = soup.find('table')
+            all_prayer_times = parse_prayer_table(response.text)
+            today = datetime.now().strftime('%d/%m')
             
-            if prayer_table:
-                headers = [header.text.strip() for header in prayer_table.find_all('th')]
-                rows = prayer_table.find_all('tr')[1:]
-                
-                today = datetime.now().strftime('%d/%m')
-                
-                for row in rows:
-                    columns = row.find_all('td')
-                    if columns and columns[0].text.strip() == today:
-                        prayer_times = {}
-                        for header, col in zip(headers, columns):
-                            prayer_times[header] = col.text.strip()
-                        
-                        Clock.schedule_once(lambda dt: self.display_prayer_times(prayer_times))
-                        return
+            if all_prayer_times and today in all_prayer_times:
+                prayer_times = all_prayer_times[today]
+                Clock.schedule_once(lambda dt: self.display_prayer_times(prayer_times))
+                return
             
             Clock.schedule_once(lambda dt: self.show_error("No prayer times found"))
             
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Non-blocking desktop notifications.
+
+Notifications go straight to org.freedesktop.Notifications over QtDBus with
+an asynchronous call, so the Qt thread never waits for a notification
+daemon or a spawned process. Without a session bus (or if the call fails)
+they fall back to notify-send, run by CommandQueue: one worker thread
+behind a bounded queue that also runs other external commands such as
+sound players. Dispatch and reply latencies are recorded for diagnostics.
+"""
+import queue
+import subprocess
+import threading
+import time
+from collections import deque
+
+from PyQt5.QtCore import QMetaType, QObject, pyqtSignal, pyqtSlot
+from PyQt5.QtDBus import (QDBusArgument, QDBusConnection, QDBusMessage, QDBusPendingCallWatcher,
+                          QDBusPendingReply, QDBusVariant)
+
+SERVICE = 'org.freedesktop.Notifications'
+PATH = '/org/freedesktop/Notifications'
+INTERFACE = 'org.freedesktop.Notifications'
+URGENCY = {'low': 0, 'normal': 1, 'critical': 2}
+
+
+class CommandQueue:
+    """Run external commands on one worker thread, at most max_pending queued.
+
+    Each job is a list of alternative commands: the next one is tried if a
+    command cannot be started (e.g. the program is not installed).
+    """
+
+    def __init__(self, max_pending=8, timeout=5):
+        self.jobs = queue.Queue(max_pending)
+        self.timeout = timeout
+        self.dropped = 0
+        self.worker = None
+        self.lock = threading.Lock()
+
+    def submit(self, *commands):
+        """Queue a job; returns False (and drops it) when the queue is full"""
+        with self.lock:
+            if self.worker is None or not self.worker.is_alive():
+                self.worker = threading.Thread(target=self.run, name='command-queue', daemon=True)
+                self.worker.start()
+        try:
+            self.jobs.put_nowait(commands)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            print(f"Command queue full, dropped {commands[0][0]}")
+            return False
+
+    def run(self):
+        while True:
+            commands = self.jobs.get()
+            try:
+                for command in commands:
+                    try:
+                        subprocess.run(command, check=False, timeout=self.timeout,
+                                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                        break
+                    except OSError:
+                        continue
+                    except subprocess.TimeoutExpired:
+                        break
+            finally:
+                self.jobs.task_done()
+
+    def wait(self):
+        """Block until every queued job has run (for tests and shutdown)"""
+        self.jobs.join()
+
+
+class NotificationDispatcher(QObject):
+    """Send desktop notifications without blocking the caller"""
+
+    # tag passed to notify(), action key (e.g. 'stop')
+    action_invoked = pyqtSignal(str, str)
+
+    def __init__(self, bus=None, app_name='Salah Times', commands=None, parent=None):
+        super().__init__(parent)
+        self.bus = bus if bus is not None else QDBusConnection.sessionBus()
+        self.app_name = app_name
+        self.commands = commands or CommandQueue()
+        self.ids = {}            # tag -> notification id, so repeats replace the last one
+        self.tags = {}           # notification id -> tag
+        self.pending = set()     # watchers of calls still in flight
+        self.dispatch_ms = deque(maxlen=100)   # time spent in notify()
+        self.reply_ms = deque(maxlen=100)      # notify() to daemon reply
+        self.fallbacks = 0
+        if self.bus.isConnected():
+            self.bus.connect('', PATH, INTERFACE, 'ActionInvoked', self.on_action_invoked)
+            self.bus.connect('', PATH, INTERFACE, 'NotificationClosed', self.on_notification_closed)
+
+    def notify(self, summary, body='', tag='', urgency='normal', expire_ms=-1,
+               icon='appointment-soon', actions=None):
+        """Show a notification; actions is a list of (key, label) pairs"""
+        start = time.perf_counter()
+        actions = actions or []
+        if self.bus.isConnected():
+            message = QDBusMessage.createMethodCall(SERVICE, PATH, INTERFACE, 'Notify')
+            flat_actions = [text for action in actions for text in action]
+            hints = {'urgency': QDBusVariant(QDBusArgument(URGENCY.get(urgency, 1), QMetaType.UChar))}
+            message.setArguments([
+                self.app_name,
+                QDBusArgument(self.ids.get(tag, 0) if tag else 0, QMetaType.UInt),
+                icon,
+                summary,
+                body,
+                QDBusArgument(flat_actions, QMetaType.QStringList),
+                hints,
+                expire_ms,
+            ])
+            watcher = QDBusPendingCallWatcher(self.bus.asyncCall(message), self)
+            watcher.finished.connect(
+                lambda w, args=(summary, body, tag, urgency, expire_ms, icon, actions), t=start:
+                self.on_reply(w, args, t))
+            self.pending.add(watcher)
+        else:
+            self.notify_command(summary, body, urgency, expire_ms, icon, actions)
+        self.dispatch_ms.append((time.perf_counter() - start) * 1000)
+
+    def notify_command(self, summary, body, urgency, expire_ms, icon, actions):
+        """notify-send on the command queue (actions cannot be reported back)"""
+        self.fallbacks += 1
+        command = ['notify-send', summary, body, f'--urgency={urgency}', f'--icon={icon}']
+        if expire_ms >= 0:
+            command.append(f'--expire-time={expire_ms}')
+        self.commands.submit(command)
+
+    def on_reply(self, watcher, args, start):
+        self.pending.discard(watcher)
+        reply = QDBusPendingReply(watcher)
+        if reply.isError():
+            print(f"D-Bus notification failed ({reply.error().name()}), using notify-send")
+            self.notify_command(*args[:2], *args[3:])
+        else:
+            self.reply_ms.append((time.perf_counter() - start) * 1000)
+            notification_id = reply.argumentAt(0)
+            tag = args[2]
+            if tag:
+                self.ids[tag] = notification_id
+                self.tags[notification_id] = tag
+        watcher.deleteLater()
+
+    @pyqtSlot(QDBusMessage)
+    def on_action_invoked(self, message):
+        notification_id, action = message.arguments()
+        tag = self.tags.get(notification_id)
+        if tag is not None:
+            self.action_invoked.emit(tag, action)
+
+    @pyqtSlot(QDBusMessage)
+    def on_notification_closed(self, message):
+        notification_id = message.arguments()[0]
+        tag = self.tags.pop(notification_id, None)
+        if tag is not None and self.ids.get(tag) == notification_id:
+            del self.ids[tag]
+
+    def latency_summary(self):
+        """Text summary of recorded dispatch/reply latencies"""
+        def stats(values):
+            if not values:
+                return "n/a"
+            ordered = sorted(values)
+            return f"median {ordered[len(ordered) // 2]:.2f} ms, max {ordered[-1]:.2f} ms"
+        return f"dispatch {stats(self.dispatch_ms)}; reply {stats(self.reply_ms)}; fallbacks {self.fallbacks}"
+
+
+_dispatcher = None
+
+
+def get_notifier():
+    """The process-wide NotificationDispatcher (create after the QApplication)"""
+    global _dispatcher
+    if _dispatcher is None:
+        _dispatcher = NotificationDispatcher()
+    return _dispatcher
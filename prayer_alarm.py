@@ -1,40 +1,61 @@
 #!/usr/bin/env python3
 import sys
-import os
-import json
-import subprocess
 from datetime import datetime, timedelta
 from PyQt5.QtWidgets import *
 from PyQt5.QtCore import *
 from PyQt5.QtGui import *
+from config_service import get_config
+from style_state import set_style_state
+from notifier import get_notifier
+from audio_service import get_audio
 
 class PrayerAlarmDialog(QDialog):
-    def __init__(self, prayer_name, prayer_time, language='en', parent=None):
+    """Alarm window for a prayer.
+    
+    With show_now=False the dialog is only built (e.g. a minute ahead by the
+    tray's scheduler); prepare() points it at a prayer and present() shows
+    it. The same instance is shown again after a snooze.
+    """
+    
+    stopped = pyqtSignal()  # Stop clicked
+    snooze_started = pyqtSignal(object)  # datetime the alarm is due again
+    
+    def __init__(self, prayer_name, prayer_time, language='en', parent=None, show_now=True):
         super().__init__(parent)
         self.prayer_name = prayer_name
         self.prayer_time = prayer_time
         self.language = language
-        self.config_dir = os.path.join(os.path.expanduser('~'), '.salah_times', 'config')
-        self.notifications_config = self.load_notification_settings()
-        self.snooze_duration = self.notifications_config.get('snooze_duration', 5)
-        self.sound_enabled = self.notifications_config.get('sound_enabled', True)
+        self.snoozed = False
+        self.load_settings()
         
         self.init_ui()
-        self.play_alarm_sound()
         
         # Auto-close timer (30 seconds)
-        self.auto_close_timer = QTimer()
+        self.auto_close_timer = QTimer(self)
+        self.auto_close_timer.setSingleShot(True)
+        self.auto_close_timer.setInterval(30000)
         self.auto_close_timer.timeout.connect(self.auto_dismiss)
-        self.auto_close_timer.start(30000)
         
         # Flash timer for attention
-        self.flash_timer = QTimer()
+        self.flash_timer = QTimer(self)
+        self.flash_timer.setInterval(500)
         self.flash_timer.timeout.connect(self.flash_window)
-        self.flash_timer.start(500)
         self.flash_state = False
+        
+        # Snooze timer, shows this same dialog again
+        self.snooze_timer = QTimer(self)
+        self.snooze_timer.setSingleShot(True)
+        self.snooze_timer.timeout.connect(self.show_snoozed_alarm)
+        
+        if show_now:
+            self.start_alarm()
+    
+    def load_settings(self):
+        self.notifications_config = self.load_notification_settings()
+        self.snooze_duration = self.notifications_config.get('snooze_duration', 5)
+        self.sound_enabled = self.notifications_config.get('sound_enabled', True)
     
     def init_ui(self):
-        self.setWindowTitle(f"🕌 {self.prayer_name} Prayer Time")
         self.setFixedSize(400, 300)
         self.setModal(True)
         self.setWindowFlags(Qt.Dialog | Qt.WindowStaysOnTopHint | Qt.WindowCloseButtonHint)
@@ -51,23 +72,23 @@ class PrayerAlarmDialog(QDialog):
         layout.setContentsMargins(30, 30, 30, 30)
         
         # Prayer icon
-        icon_label = QLabel(self.get_prayer_icon())
-        icon_label.setAlignment(Qt.AlignCenter)
-        icon_label.setStyleSheet("font-size: 64px;")
-        layout.addWidget(icon_label)
+        self.icon_label = QLabel()
+        self.icon_label.setAlignment(Qt.AlignCenter)
+        self.icon_label.setStyleSheet("font-size: 64px;")
+        layout.addWidget(self.icon_label)
         
         # Prayer name
-        prayer_label = QLabel(f"🕌 {self.prayer_name} Prayer Time")
-        prayer_label.setProperty("class", "alarm_title")
-        prayer_label.setAlignment(Qt.AlignCenter)
-        prayer_label.setWordWrap(True)
-        layout.addWidget(prayer_label)
+        self.prayer_label = QLabel()
+        self.prayer_label.setProperty("class", "alarm_title")
+        self.prayer_label.setAlignment(Qt.AlignCenter)
+        self.prayer_label.setWordWrap(True)
+        layout.addWidget(self.prayer_label)
         
         # Time
-        time_label = QLabel(self.prayer_time)
-        time_label.setProperty("class", "alarm_time")
-        time_label.setAlignment(Qt.AlignCenter)
-        layout.addWidget(time_label)
+        self.time_label = QLabel()
+        self.time_label.setProperty("class", "alarm_time")
+        self.time_label.setAlignment(Qt.AlignCenter)
+        layout.addWidget(self.time_label)
         
         # Message
         message = QLabel("It's time for prayer")
@@ -83,11 +104,11 @@ class PrayerAlarmDialog(QDialog):
         button_layout.setSpacing(15)
         
         # Snooze button
-        snooze_btn = QPushButton(f"😴 Snooze ({self.snooze_duration} min)")
-        snooze_btn.setProperty("class", "snooze_button")
-        snooze_btn.clicked.connect(self.snooze_alarm)
-        snooze_btn.setCursor(Qt.PointingHandCursor)
-        button_layout.addWidget(snooze_btn)
+        self.snooze_btn = QPushButton()
+        self.snooze_btn.setProperty("class", "snooze_button")
+        self.snooze_btn.clicked.connect(self.snooze_alarm)
+        self.snooze_btn.setCursor(Qt.PointingHandCursor)
+        button_layout.addWidget(self.snooze_btn)
         
         # Stop button
         stop_btn = QPushButton("⏹️ Stop")
@@ -97,6 +118,45 @@ class PrayerAlarmDialog(QDialog):
         button_layout.addWidget(stop_btn)
         
         layout.addLayout(button_layout)
+        self.update_texts()
+    
+    def update_texts(self):
+        """Show the current prayer, time and snooze state"""
+        title = f"{self.prayer_name} (Snoozed)" if self.snoozed else self.prayer_name
+        self.setWindowTitle(f"🕌 {title} Prayer Time")
+        self.icon_label.setText(self.get_prayer_icon())
+        self.prayer_label.setText(f"🕌 {title} Prayer Time")
+        self.time_label.setText(self.prayer_time)
+        self.snooze_btn.setText(f"😴 Snooze ({self.snooze_duration} min)")
+    
+    def prepare(self, prayer_name, prayer_time):
+        """Point the hidden dialog at a prayer and polish it ahead of present()"""
+        self.snooze_timer.stop()
+        self.prayer_name = prayer_name
+        self.prayer_time = prayer_time
+        self.snoozed = False
+        self.load_settings()
+        self.update_texts()
+        self.ensurePolished()
+        for widget in self.findChildren(QWidget):
+            widget.ensurePolished()
+        self.layout().activate()
+    
+    def present(self, play_sound=True):
+        """Show the dialog and start the alarm"""
+        self.start_alarm(play_sound)
+        self.show()
+        self.raise_()
+        self.activateWindow()
+    
+    def start_alarm(self, play_sound=True):
+        """Start the sound, flashing and auto-dismiss countdown"""
+        self.flash_state = False
+        set_style_state(self, "flash", False)
+        if play_sound:
+            self.play_alarm_sound()
+        self.auto_close_timer.start()
+        self.flash_timer.start()
     
     def get_alarm_stylesheet(self):
         return """
@@ -107,6 +167,10 @@ class PrayerAlarmDialog(QDialog):
                 border-radius: 15px;
             }
             
+            QDialog[flash="true"] {
+                border: 3px solid #FF4444;
+            }
+            
             .alarm_title {
                 color: white;
                 font-size: 24px;
@@ -174,90 +238,55 @@ class PrayerAlarmDialog(QDialog):
     
     def load_notification_settings(self):
         """Load notification settings"""
-        try:
-            notifications_file = os.path.join(self.config_dir, 'notifications.json')
-            if os.path.exists(notifications_file):
-                with open(notifications_file, 'r') as f:
-                    return json.load(f)
-        except Exception as e:
-            print(f"Could not load notification settings: {e}")
-        return {}
+        return get_config().notification_settings()
     
     def play_alarm_sound(self):
-        """Play alarm sound if enabled"""
+        """Play the preloaded alarm sound if enabled"""
         if not self.sound_enabled:
             return
-            
-        try:
-            # Try different system sounds
-            sound_files = [
-                '/usr/share/sounds/freedesktop/stereo/alarm-clock-elapsed.oga',
-                '/usr/share/sounds/freedesktop/stereo/message-new-instant.oga',
-                '/usr/share/sounds/alsa/Front_Left.wav'
-            ]
-            
-            for sound_file in sound_files:
-                if os.path.exists(sound_file):
-                    subprocess.Popen(['paplay', sound_file], 
-                                   stdout=subprocess.DEVNULL, 
-                                   stderr=subprocess.DEVNULL)
-                    break
-            else:
-                # Fallback: system beep
-                print('\a' * 3)
-        except Exception as e:
-            print(f"Could not play alarm sound: {e}")
-            print('\a' * 3)  # Fallback beep
+        get_audio().play()
     
     def flash_window(self):
         """Flash window border for attention"""
-        if self.flash_state:
-            self.setStyleSheet(self.get_alarm_stylesheet())
-        else:
-            flash_style = self.get_alarm_stylesheet().replace(
-                "border: 3px solid #FFD700;",
-                "border: 3px solid #FF4444;"
-            )
-            self.setStyleSheet(flash_style)
         self.flash_state = not self.flash_state
+        set_style_state(self, "flash", self.flash_state)
     
     def snooze_alarm(self):
         """Snooze the alarm"""
         self.stop_timers()
+        get_audio().stop_all()
         
         # Schedule next alarm
         snooze_time = datetime.now() + timedelta(minutes=self.snooze_duration)
         
         # Show snooze notification
         try:
-            subprocess.run([
-                'notify-send', 
+            get_notifier().notify(
                 f'🕌 {self.prayer_name} Prayer Snoozed',
                 f'Will remind again at {snooze_time.strftime("%H:%M")}',
-                '--urgency=low',
-                '--expire-time=3000'
-            ], check=False, timeout=2)
-        except:
-            pass
+                urgency='low',
+                expire_ms=3000
+            )
+        except Exception as e:
+            print(f"Could not send snooze notification: {e}")
         
+        # Start before accept() so a finished handler can see the snooze
+        self.snooze_timer.start(self.snooze_duration * 60 * 1000)
+        self.snooze_started.emit(snooze_time)
         self.accept()
-        
-        # Schedule snoozed alarm (this would need integration with main app)
-        QTimer.singleShot(self.snooze_duration * 60 * 1000, 
-                         lambda: self.show_snoozed_alarm())
     
     def show_snoozed_alarm(self):
-        """Show snoozed alarm"""
-        snoozed_dialog = PrayerAlarmDialog(
-            self.prayer_name + " (Snoozed)", 
-            self.prayer_time, 
-            self.language
-        )
-        snoozed_dialog.exec_()
+        """Show this dialog again once the snooze is over"""
+        self.snoozed = True
+        self.update_texts()
+        self.present()
     
     def stop_alarm(self):
         """Stop the alarm"""
         self.stop_timers()
+        self.snooze_timer.stop()
+        get_audio().stop_all()
+        self.stopped.emit()
         self.accept()
     
     def auto_dismiss(self):
@@ -266,11 +295,9 @@ class PrayerAlarmDialog(QDialog):
         self.accept()
     
     def stop_timers(self):
-        """Stop all timers"""
-        if hasattr(self, 'auto_close_timer'):
-            self.auto_close_timer.stop()
-        if hasattr(self, 'flash_timer'):
-            self.flash_timer.stop()
+        """Stop the flash and auto-dismiss timers"""
+        self.auto_close_timer.stop()
+        self.flash_timer.stop()
     
     def closeEvent(self, event):
         """Handle close event"""
@@ -297,7 +324,10 @@ if __name__ == '__main__':
     args = parser.parse_args()
     
     app = QApplication(sys.argv)
-    app.setQuitOnLastWindowClosed(True)
+    app.setQuitOnLastWindowClosed(False)
     
-    alarm = PrayerAlarmDialog(args.prayer, args.time, args.language)
-    sys.exit(alarm.exec_())
\ No newline at end of file
+    alarm = PrayerAlarmDialog(args.prayer, args.time, args.language, show_now=False)
+    # Keep running while snoozed, quit once the alarm is stopped or dismissed
+    alarm.finished.connect(lambda: alarm.snooze_timer.isActive() or app.quit())
+    alarm.present()
+    sys.exit(app.exec_())
\ No newline at end of file
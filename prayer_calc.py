@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Offline astronomical prayer time engine.
+
+Sun position follows the usual low-precision almanac formulas (declination
+and equation of time from the mean anomaly and ecliptic longitude), which
+are good to well under a minute for Morocco's latitudes. Defaults follow the
+Moroccan Habous ministry conventions.
+"""
+import math
+from datetime import date as date_type, datetime, timedelta
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+PRAYERS = ['Fajr', 'Sunrise', 'Dohr', 'Asr', 'Maghreb', 'Isha']
+
+# Morocco keeps UTC+1 all year (the Ramadan switch to UTC+0 is not modelled)
+MOROCCO_UTC_OFFSET = 1
+
+HABOUS = {
+    'fajr_angle': 19.0,     # sun below horizon, degrees
+    'isha_angle': 17.0,
+    'asr_factor': 1,        # shadow length factor, 1 = Shafi'i
+    'rise_set_angle': 0.833,  # refraction + solar semi-diameter
+    'offsets': {'Fajr': 0, 'Sunrise': 0, 'Dohr': 5, 'Asr': 0, 'Maghreb': 5, 'Isha': 0},
+}
+
+DEG = math.pi / 180.0
+
+
+def julian_day(year, month, day):
+    if month <= 2:
+        year -= 1
+        month += 12
+    a = year // 100
+    b = 2 - a + a // 4
+    return math.floor(365.25 * (year + 4716)) + math.floor(30.6001 * (month + 1)) + day + b - 1524.5
+
+
+def sun_position(jd):
+    """Return (declination in degrees, equation of time in hours)"""
+    d = jd - 2451545.0
+    g = (357.529 + 0.98560028 * d) * DEG
+    q = (280.459 + 0.98564736 * d) % 360.0
+    l = (q + 1.915 * math.sin(g) + 0.020 * math.sin(2 * g)) * DEG
+    e = (23.439 - 0.00000036 * d) * DEG
+
+    ra = math.atan2(math.cos(e) * math.sin(l), math.cos(l)) / DEG / 15.0
+    eqt = q / 15.0 - ra
+    eqt = (eqt + 12.0) % 24.0 - 12.0
+    decl = math.asin(math.sin(e) * math.sin(l)) / DEG
+    return decl, eqt
+
+
+def compute_hours(lat, lon, day, tz=MOROCCO_UTC_OFFSET, method=HABOUS):
+    """Prayer times for one day as local decimal hours (None if undefined).
+
+    Each event is computed from the sun position at its own approximate
+    time, which is one refinement step beyond a single noon position.
+    """
+    jd = julian_day(day.year, day.month, day.day) - lon / (15.0 * 24.0)
+    sin_lat = math.sin(lat * DEG)
+    cos_lat = math.cos(lat * DEG)
+
+    def noon_at(hours):
+        _, eqt = sun_position(jd + hours / 24.0)
+        return 12.0 - eqt
+
+    def angle_time(angle, hours, before_noon):
+        decl, eqt = sun_position(jd + hours / 24.0)
+        sin_decl = math.sin(decl * DEG)
+        cos_decl = math.cos(decl * DEG)
+        cos_t = (-math.sin(angle * DEG) - sin_decl * sin_lat) / (cos_decl * cos_lat)
+        if cos_t < -1.0 or cos_t > 1.0:
+            return None
+        t = math.acos(cos_t) / DEG / 15.0
+        noon = 12.0 - eqt
+        return noon - t if before_noon else noon + t
+
+    def asr_time(factor, hours):
+        decl, _ = sun_position(jd + hours / 24.0)
+        angle = -math.atan(1.0 / (factor + math.tan(abs(lat - decl) * DEG))) / DEG
+        return angle_time(angle, hours, False)
+
+    rise_set = method['rise_set_angle']
+    times = {
+        'Fajr': angle_time(method['fajr_angle'], 5.0, True),
+        'Sunrise': angle_time(rise_set, 6.0, True),
+        'Dohr': noon_at(12.0),
+        'Asr': asr_time(method['asr_factor'], 13.0),
+        'Maghreb': angle_time(rise_set, 18.0, False),
+        'Isha': angle_time(method['isha_angle'], 18.0, False),
+    }
+
+    shift = tz - lon / 15.0
+    offsets = method.get('offsets', {})
+    for prayer, value in times.items():
+        if value is not None:
+            times[prayer] = value + shift + offsets.get(prayer, 0) / 60.0
+    return times
+
+
+def compute_minutes(lat, lon, day, tz=MOROCCO_UTC_OFFSET, method=HABOUS):
+    """Prayer times as whole minutes since local midnight, in PRAYERS order"""
+    hours = compute_hours(lat, lon, day, tz, method)
+    return [None if hours[p] is None else int(round(hours[p] * 60.0)) % 1440 for p in PRAYERS]
+
+
+def format_minutes(minutes):
+    if minutes is None:
+        return '--:--'
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def compute_prayer_times(lat, lon, day, tz=MOROCCO_UTC_OFFSET, method=HABOUS):
+    """Prayer times in the same {'Date': 'dd/mm', 'Fajr': 'HH:MM', ...} shape as the scraped cache"""
+    times = {'Date': day.strftime('%d/%m')}
+    for prayer, minutes in zip(PRAYERS, compute_minutes(lat, lon, day, tz, method)):
+        times[prayer] = format_minutes(minutes)
+    return times
+
+
+def compute_range(lat, lon, start, days, tz=MOROCCO_UTC_OFFSET, method=HABOUS):
+    """{ISO date: prayer times} for a run of consecutive days"""
+    if isinstance(start, datetime):
+        start = start.date()
+    result = {}
+    for i in range(days):
+        day = start + timedelta(days=i)
+        result[day.isoformat()] = compute_prayer_times(lat, lon, day, tz, method)
+    return result
+
+
+def _sun_position_array(jd):
+    d = jd - 2451545.0
+    g = np.radians(357.529 + 0.98560028 * d)
+    q = np.mod(280.459 + 0.98564736 * d, 360.0)
+    l = np.radians(q + 1.915 * np.sin(g) + 0.020 * np.sin(2 * g))
+    e = np.radians(23.439 - 0.00000036 * d)
+
+    ra = np.degrees(np.arctan2(np.cos(e) * np.sin(l), np.cos(l))) / 15.0
+    eqt = np.mod(q / 15.0 - ra + 12.0, 24.0) - 12.0
+    decl = np.degrees(np.arcsin(np.sin(e) * np.sin(l)))
+    return decl, eqt
+
+
+def compute_table(coordinates, start, days, tz=MOROCCO_UTC_OFFSET, method=HABOUS):
+    """Vectorized prayer times over a (city, day) grid.
+
+    coordinates is a list of (lat, lon). Returns an int16 array of shape
+    (cities, days, 6) holding minutes since midnight in PRAYERS order, -1
+    where the time is undefined. Falls back to the scalar engine (as nested
+    lists) when NumPy is not installed.
+    """
+    if isinstance(start, datetime):
+        start = start.date()
+    if np is None:
+        return [[[-1 if m is None else m
+                  for m in compute_minutes(lat, lon, start + timedelta(days=i), tz, method)]
+                 for i in range(days)]
+                for lat, lon in coordinates]
+
+    coords = np.asarray(coordinates, dtype=np.float64).reshape(-1, 2)
+    lat = coords[:, 0:1]
+    lon = coords[:, 1:2]
+    jd0 = julian_day(start.year, start.month, start.day)
+    jd = jd0 + np.arange(days, dtype=np.float64)[np.newaxis, :] - lon / (15.0 * 24.0)
+    sin_lat = np.sin(np.radians(lat))
+    cos_lat = np.cos(np.radians(lat))
+
+    def angle_time(angle, hours, before_noon):
+        decl, eqt = _sun_position_array(jd + hours / 24.0)
+        decl_r = np.radians(decl)
+        cos_t = (-np.sin(np.radians(angle)) - np.sin(decl_r) * sin_lat) / (np.cos(decl_r) * cos_lat)
+        with np.errstate(invalid='ignore'):
+            t = np.degrees(np.arccos(cos_t)) / 15.0
+        noon = 12.0 - eqt
+        return noon - t if before_noon else noon + t
+
+    def asr_time(factor, hours):
+        decl, _ = _sun_position_array(jd + hours / 24.0)
+        angle = -np.degrees(np.arctan(1.0 / (factor + np.tan(np.radians(np.abs(lat - decl))))))
+        return angle_time(angle, hours, False)
+
+    rise_set = method['rise_set_angle']
+    _, noon_eqt = _sun_position_array(jd + 0.5)
+    hours = np.stack([
+        angle_time(method['fajr_angle'], 5.0, True),
+        angle_time(rise_set, 6.0, True),
+        12.0 - noon_eqt,
+        asr_time(method['asr_factor'], 13.0),
+        angle_time(rise_set, 18.0, False),
+        angle_time(method['isha_angle'], 18.0, False),
+    ], axis=-1)
+
+    offsets = method.get('offsets', {})
+    shift = (tz - lon / 15.0)[:, :, np.newaxis]
+    hours = hours + shift + np.array([offsets.get(p, 0) for p in PRAYERS]) / 60.0
+    minutes = np.mod(np.round(hours * 60.0), 1440.0)
+    return np.where(np.isnan(minutes), -1, minutes).astype(np.int16)
+
+
+def compare_with_cache(lat, lon, cached_prayer_times, year, tz=MOROCCO_UTC_OFFSET, method=HABOUS):
+    """Compare the engine against scraped {date key: times} data.
+
+    Keys are ISO dates, or 'dd/mm' taken to be in year. Returns {prayer: {'days': n, 'mean': minutes, 'max': minutes}} of the
+    absolute differences.
+    """
+    diffs = {prayer: [] for prayer in PRAYERS}
+    for date_str, scraped in cached_prayer_times.items():
+        try:
+            if '-' in date_str:
+                day = date_type.fromisoformat(date_str)
+            else:
+                day_num, month = map(int, date_str.split('/'))
+                day = date_type(year, month, day_num)
+        except ValueError:
+            continue
+        computed = compute_minutes(lat, lon, day, tz, method)
+        for prayer, minutes in zip(PRAYERS, computed):
+            value = scraped.get(prayer)
+            if minutes is None or not value or ':' not in value:
+                continue
+            h, m = map(int, value.split(':'))
+            delta = abs(h * 60 + m - minutes)
+            diffs[prayer].append(min(delta, 1440 - delta))
+
+    report = {}
+    for prayer, values in diffs.items():
+        if values:
+            report[prayer] = {'days': len(values), 'mean': sum(values) / len(values), 'max': max(values)}
+    return report
+
+
+def main():
+    """Validate the engine against every scraped city in the prayer time store"""
+    import time
+    from prayer_store import get_store
+    from ultra_modern_salah import CITIES
+
+    store = get_store()
+    year = datetime.now().year
+
+    start = time.perf_counter()
+    compute_range(CITIES['Rabat']['lat'], CITIES['Rabat']['lon'], date_type(year, 1, 1), 365)
+    print(f"One year for one city: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    for city_name, city in CITIES.items():
+        days = store.get_range(city_name, date_type(year, 1, 1), date_type(year + 1, 1, 1))
+        if not days:
+            continue
+        cached = {day.isoformat(): times for day, times in days.items()}
+        report = compare_with_cache(city['lat'], city['lon'], cached, year)
+        summary = '  '.join(f"{p} {r['mean']:.1f}/{r['max']}" for p, r in report.items())
+        print(f"{city_name:<22} {summary}")
+
+
+if __name__ == '__main__':
+    main()
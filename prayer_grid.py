@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+The main window's grid of prayer cards.
+
+Each PrayerCard keeps direct references to its labels and the text it
+last pushed, so a refresh only touches labels whose text or state actually
+changed instead of scanning the card's children.
+"""
+from PyQt5.QtCore import Qt
+from PyQt5.QtWidgets import QGridLayout, QHBoxLayout, QLabel, QVBoxLayout, QWidget
+
+from style_state import set_style_state
+
+# Chorok (calculated sunrise) is shown instead of the scraped Sunrise
+GRID_PRAYERS = ['Fajr', 'Chorok', 'Dohr', 'Asr', 'Maghreb', 'Isha']
+GRID_ICONS = {'Fajr': '☽', 'Chorok': '☀', 'Dohr': '☉',
+              'Asr': '☀', 'Maghreb': '☾', 'Isha': '★'}
+
+
+class PrayerCard:
+    """One prayer card widget and its name/time labels"""
+
+    def __init__(self, icon, name, time, is_current=False):
+        self.widget = QWidget()
+        self.widget.setProperty("class", "prayer_card")
+        self.widget.setProperty("current", is_current)
+        self.pushes = 0  # label/state updates actually sent to Qt
+
+        layout = QVBoxLayout(self.widget)
+        layout.setContentsMargins(12, 10, 12, 10)
+        layout.setSpacing(5)
+
+        # Icon and name row
+        top_layout = QHBoxLayout()
+
+        icon_label = QLabel(icon)
+        icon_label.setProperty("class", "prayer_icon")
+        top_layout.addWidget(icon_label)
+
+        self.name_label = QLabel(name)
+        self.name_label.setProperty("class", "prayer_name")
+        self.name_label.setWordWrap(True)
+        top_layout.addWidget(self.name_label)
+
+        top_layout.addStretch()
+        layout.addLayout(top_layout)
+
+        # Time
+        self.time_label = QLabel(time)
+        self.time_label.setProperty("class", "prayer_time")
+        self.time_label.setProperty("error", False)
+        self.time_label.setAlignment(Qt.AlignCenter)
+        self.time_label.setWordWrap(True)
+        layout.addWidget(self.time_label)
+
+        self.name = name
+        self.time = time
+        self.current = is_current
+        self.error = False
+
+    def set_name(self, name):
+        if name != self.name:
+            self.name = name
+            self.name_label.setText(name)
+            self.pushes += 1
+
+    def set_time(self, time, error=False):
+        if time != self.time:
+            self.time = time
+            self.time_label.setText(time)
+            self.pushes += 1
+        if error != self.error:
+            self.error = error
+            set_style_state(self.time_label, "error", error)
+            self.pushes += 1
+
+    def set_current(self, is_current):
+        if is_current != self.current:
+            self.current = is_current
+            set_style_state(self.widget, "current", is_current, descendants=True)
+            self.pushes += 1
+
+
+class PrayerGrid:
+    """2x3 grid of PrayerCards keyed by prayer"""
+
+    def __init__(self, tr_prayer):
+        self.tr_prayer = tr_prayer
+        self.widget = QWidget()
+
+        grid = QGridLayout(self.widget)
+        grid.setContentsMargins(0, 0, 0, 0)
+        grid.setSpacing(10)
+
+        # Make rows and columns stretch equally
+        for i in range(3):  # 3 rows
+            grid.setRowStretch(i, 1)
+        for i in range(2):  # 2 columns
+            grid.setColumnStretch(i, 1)
+
+        self.cards = {}
+        for i, prayer in enumerate(GRID_PRAYERS):
+            card = PrayerCard(GRID_ICONS[prayer], tr_prayer(prayer), "--:--")
+            grid.addWidget(card.widget, i // 2, i % 2)
+            self.cards[prayer] = card
+
+    def show_times(self, times, current=None):
+        """Show {prayer: 'HH:MM'} and mark the current prayer's card"""
+        for prayer, time in times.items():
+            card = self.cards.get(prayer)
+            if card is None:
+                continue
+            card.set_current(prayer == current)
+            card.set_name(self.tr_prayer(prayer))
+            card.set_time(time)
+
+    def show_placeholder(self, text, error=False):
+        """Same text on every card, e.g. '...' while loading or 'Error'"""
+        for card in self.cards.values():
+            card.set_time(text, error)
+
+    def pushes(self):
+        return sum(card.pushes for card in self.cards.values())
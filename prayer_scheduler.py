@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Event-driven notification scheduler for the tray.
+
+The day's notification events (pre-alert, alarm warm-up, adhan, repeats,
+iqama) are kept in a heap and a single precise single-shot QTimer is armed
+for the earliest one. When it fires, every due event is emitted and the
+timer is re-armed for the next, so nothing depends on a poll landing in the
+right minute.
+"""
+import heapq
+import itertools
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+from PyQt5.QtCore import QObject, Qt, QTimer, pyqtSignal
+
+# count is the notification number for adhan/repeat events (1 = adhan)
+Event = namedtuple('Event', 'when kind prayer count')
+
+# Events this late (event loop stalled, machine suspended) are dropped
+# instead of notifying long after the fact
+DEFAULT_GRACE = timedelta(minutes=5)
+MAX_TIMER_MS = 3600 * 1000
+# The alarm window is built this long before the adhan, then only shown
+ALARM_WARMUP = timedelta(minutes=1)
+
+
+def plan_day(timeline, day, notification_settings, iqama_prayers=None):
+    """Events for one day's DayTimeline, sorted by time.
+
+    Adhan and repeats follow each prayer's enabled/repeat_count settings,
+    a pre-alert comes pre_alert_minutes before the adhan when that is set,
+    a warm-up ALARM_WARMUP before it when alarm_dialog is on, and iqama
+    events are planned for iqama_prayers (default: all).
+    """
+    midnight = datetime.combine(day, datetime.min.time())
+    interval = timedelta(minutes=notification_settings.get('notification_interval', 2))
+    pre_alert = notification_settings.get('pre_alert_minutes', 0)
+    alarm_dialog = notification_settings.get('alarm_dialog', False)
+    events = []
+    for prayer in timeline.names:
+        adhan = midnight + timedelta(seconds=timeline.time_of(prayer))
+        config = notification_settings.get(prayer, {'enabled': True, 'repeat_count': 3})
+        if config.get('enabled', True):
+            if pre_alert > 0:
+                events.append(Event(adhan - timedelta(minutes=pre_alert), 'pre_alert', prayer, 0))
+            if alarm_dialog:
+                events.append(Event(adhan - ALARM_WARMUP, 'warmup', prayer, 0))
+            events.append(Event(adhan, 'adhan', prayer, 1))
+            for count in range(2, config.get('repeat_count', 3) + 1):
+                events.append(Event(adhan + (count - 1) * interval, 'repeat', prayer, count))
+        if iqama_prayers is None or prayer in iqama_prayers:
+            events.append(Event(midnight + timedelta(seconds=timeline.iqama_time(prayer)), 'iqama', prayer, 0))
+    events.sort()
+    return events
+
+
+class PrayerScheduler(QObject):
+    """Heap of Events driving one single-shot timer"""
+
+    fired = pyqtSignal(object)  # Event
+
+    def __init__(self, clock=datetime.now, grace=DEFAULT_GRACE, parent=None):
+        super().__init__(parent)
+        self.clock = clock
+        self.grace = grace
+        self.heap = []
+        self.counter = itertools.count()
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        # Coarse timers may be off by 5% of the interval, minutes for a
+        # wait of several hours
+        self.timer.setTimerType(Qt.PreciseTimer)
+        self.timer.timeout.connect(self.run_due)
+
+    def schedule(self, events, catch_up=False):
+        """Replace the queue with events, ignoring those already past.
+
+        With catch_up, events missed by less than the grace period are kept
+        and fire at once; the caller must leave out those already handled.
+        """
+        now = self.clock()
+        since = now - self.grace if catch_up else now
+        self.heap = [(event.when, next(self.counter), event) for event in events if event.when > since]
+        heapq.heapify(self.heap)
+        self.arm()
+
+    def add(self, event):
+        heapq.heappush(self.heap, (event.when, next(self.counter), event))
+        self.arm()
+
+    def cancel(self, prayer, kinds=None):
+        """Drop a prayer's pending events (only the given kinds if set)"""
+        self.heap = [entry for entry in self.heap
+                     if not (entry[2].prayer == prayer and (kinds is None or entry[2].kind in kinds))]
+        heapq.heapify(self.heap)
+        self.arm()
+
+    def clear(self):
+        self.heap = []
+        self.timer.stop()
+
+    def upcoming(self, limit=None):
+        """Pending events in firing order"""
+        events = [entry[2] for entry in sorted(self.heap)]
+        return events if limit is None else events[:limit]
+
+    def next_event(self):
+        return self.heap[0][2] if self.heap else None
+
+    def arm(self):
+        """Start the timer for the earliest event"""
+        if not self.heap:
+            self.timer.stop()
+            return
+        delay = (self.heap[0][0] - self.clock()).total_seconds()
+        # Long waits are split so a wall clock change is noticed within the hour
+        self.timer.start(max(0, min(MAX_TIMER_MS, int(delay * 1000) + 1)))
+
+    def run_due(self):
+        """Emit every due event, then re-arm for the next one"""
+        now = self.clock()
+        while self.heap and self.heap[0][0] <= now:
+            _, _, event = heapq.heappop(self.heap)
+            if now - event.when > self.grace:
+                print(f"Skipped late {event.kind} for {event.prayer} ({event.when:%H:%M})")
+                continue
+            self.fired.emit(event)
+        self.arm()
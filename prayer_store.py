@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+SQLite store for cached prayer times, one row per (city, date).
+
+The main app, the tray process and the display dialogs all share one
+database file in WAL mode, so readers never block the refresher and a single
+day (or a week/month range) is an indexed lookup instead of a json.load of a
+whole city file.
+"""
+import json
+import os
+import sqlite3
+import threading
+from datetime import date as date_type, datetime
+
+from prayer_calc import PRAYERS
+
+SALAH_DIR = os.path.join(os.path.expanduser('~'), '.salah_times')
+DEFAULT_DB_PATH = os.path.join(SALAH_DIR, 'prayer_times.db')
+LEGACY_CITIES_FOLDER = os.path.join(SALAH_DIR, 'cities')
+
+# 1: prayer_times table and import of the old JSON cache
+# 2: per-city first/last date bounds
+SCHEMA_VERSION = 2
+COLUMNS = [p.lower() for p in PRAYERS]
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS prayer_times (
+    city TEXT NOT NULL,
+    date TEXT NOT NULL,
+    {', '.join(f'{c} TEXT' for c in COLUMNS)},
+    PRIMARY KEY (city, date)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS cities (
+    city TEXT PRIMARY KEY,
+    last_updated TEXT,
+    first_date TEXT,
+    last_date TEXT
+);
+"""
+
+
+def resolve_date(date_str, reference=None):
+    """Turn a 'dd/mm' (or ISO) key into a date, picking the year closest to reference"""
+    if isinstance(date_str, datetime):
+        return date_str.date()
+    if isinstance(date_str, date_type):
+        return date_str
+    if '-' in date_str:
+        return date_type.fromisoformat(date_str)
+    reference = reference or date_type.today()
+    day, month = map(int, date_str.split('/'))
+    candidates = []
+    for year in (reference.year - 1, reference.year, reference.year + 1):
+        try:
+            candidates.append(date_type(year, month, day))
+        except ValueError:
+            continue
+    if not candidates:
+        raise ValueError(f"Invalid date key: {date_str}")
+    return min(candidates, key=lambda d: abs((d - reference).days))
+
+
+class PrayerStore:
+    """Prayer times keyed by (city, ISO date), safe to share between threads"""
+
+    def __init__(self, path=DEFAULT_DB_PATH, legacy_folder=LEGACY_CITIES_FOLDER):
+        self.path = path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.lock = threading.Lock()
+        self.writes = 0
+        self.conn = sqlite3.connect(path, timeout=5, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+
+        with self.lock, self.conn:
+            version = self.conn.execute('PRAGMA user_version').fetchone()[0]
+            self.conn.executescript(SCHEMA)
+        if version < SCHEMA_VERSION:
+            self.migrate(version, legacy_folder)
+
+    def migrate(self, version, legacy_folder):
+        """Bring an older database up to SCHEMA_VERSION, one step at a time"""
+        if version < 1:
+            # First run: pull in the old dd/mm-keyed per-city JSON files
+            if legacy_folder and os.path.isdir(legacy_folder):
+                imported = self.import_json_cache(legacy_folder)
+                if imported:
+                    print(f"Imported {imported} cached cities into {self.path}")
+        if version < 2:
+            with self.lock, self.conn:
+                columns = [row[1] for row in self.conn.execute('PRAGMA table_info(cities)')]
+                for column in ('first_date', 'last_date'):
+                    if column not in columns:
+                        self.conn.execute(f'ALTER TABLE cities ADD COLUMN {column} TEXT')
+                self.conn.execute(
+                    'UPDATE cities SET '
+                    'first_date = (SELECT MIN(date) FROM prayer_times WHERE prayer_times.city = cities.city), '
+                    'last_date = (SELECT MAX(date) FROM prayer_times WHERE prayer_times.city = cities.city)')
+        with self.lock, self.conn:
+            self.conn.execute(f'PRAGMA user_version={SCHEMA_VERSION}')
+
+    def upsert_city(self, city, prayer_times, last_updated=None, reference=None):
+        """Bulk insert or replace {date key: times} for one city in a single transaction"""
+        return self.upsert_cities({city: prayer_times}, last_updated, reference)
+
+    def upsert_cities(self, cities, last_updated=None, reference=None):
+        """Write {city: {date key: times}} as one transaction, so readers see all or none of a refresh"""
+        last_updated = last_updated or datetime.now().isoformat()
+        rows = []
+        bounds = []
+        for city, prayer_times in cities.items():
+            city_rows = []
+            for key, times in prayer_times.items():
+                try:
+                    day = resolve_date(key, reference)
+                except ValueError:
+                    continue
+                city_rows.append((city, day.isoformat()) + tuple(times.get(p) for p in PRAYERS))
+            first_date = min(row[1] for row in city_rows) if city_rows else None
+            last_date = max(row[1] for row in city_rows) if city_rows else None
+            bounds.append((city, last_updated, first_date, last_date))
+            rows.extend(city_rows)
+
+        with self.lock, self.conn:
+            self.conn.executemany(
+                f"INSERT OR REPLACE INTO prayer_times (city, date, {', '.join(COLUMNS)}) "
+                f"VALUES (?, ?, {', '.join('?' for _ in COLUMNS)})", rows)
+            # Widen the stored range bounds instead of rescanning the city's rows
+            self.conn.executemany(
+                'INSERT INTO cities (city, last_updated, first_date, last_date) VALUES (?, ?, ?, ?) '
+                'ON CONFLICT(city) DO UPDATE SET last_updated = excluded.last_updated, '
+                'first_date = MIN(COALESCE(first_date, excluded.first_date), COALESCE(excluded.first_date, first_date)), '
+                'last_date = MAX(COALESCE(last_date, excluded.last_date), COALESCE(excluded.last_date, last_date))',
+                bounds)
+            self.writes += 1
+        return len(rows)
+
+    def get_day(self, city, day):
+        """One day in the cache shape {'Date': 'dd/mm', 'Fajr': 'HH:MM', ...}, or None"""
+        with self.lock:
+            row = self.conn.execute(
+                f"SELECT date, {', '.join(COLUMNS)} FROM prayer_times WHERE city = ? AND date = ?",
+                (city, _iso(day))).fetchone()
+        return _to_times(row) if row else None
+
+    def get_range(self, city, start, end):
+        """{date: times} for start <= date < end"""
+        with self.lock:
+            rows = self.conn.execute(
+                f"SELECT date, {', '.join(COLUMNS)} FROM prayer_times "
+                "WHERE city = ? AND date >= ? AND date < ? ORDER BY date",
+                (city, _iso(start), _iso(end))).fetchall()
+        return {date_type.fromisoformat(row[0]): _to_times(row) for row in rows}
+
+    def get_cities_day(self, cities, day):
+        """{city: times} for several cities on one day"""
+        cities = list(cities)
+        if not cities:
+            return {}
+        with self.lock:
+            rows = self.conn.execute(
+                f"SELECT city, date, {', '.join(COLUMNS)} FROM prayer_times "
+                f"WHERE date = ? AND city IN ({', '.join('?' for _ in cities)})",
+                [_iso(day)] + cities).fetchall()
+        return {row[0]: _to_times(row[1:]) for row in rows}
+
+    def version(self):
+        """Changes whenever any connection, in this process or another, commits"""
+        with self.lock:
+            data_version = self.conn.execute('PRAGMA data_version').fetchone()[0]
+        # data_version does not move for this connection's own commits
+        return data_version, self.writes
+
+    def get_city(self, city):
+        """{date: times} for every cached day of a city"""
+        with self.lock:
+            rows = self.conn.execute(
+                f"SELECT date, {', '.join(COLUMNS)} FROM prayer_times WHERE city = ? ORDER BY date",
+                (city,)).fetchall()
+        return {date_type.fromisoformat(row[0]): _to_times(row) for row in rows}
+
+    def date_range(self, city):
+        """(first, last) cached dates for a city, or (None, None)"""
+        with self.lock:
+            row = self.conn.execute('SELECT first_date, last_date FROM cities WHERE city = ?', (city,)).fetchone()
+        if not row or not row[0]:
+            return None, None
+        return date_type.fromisoformat(row[0]), date_type.fromisoformat(row[1])
+
+    def last_date(self, city):
+        """Last cached date for a city, or None"""
+        return self.date_range(city)[1]
+
+    def days_remaining(self, city, today=None):
+        """Cached days left for a city, counting today"""
+        last_date = self.last_date(city)
+        if last_date is None:
+            return 0
+        today = today or date_type.today()
+        return max(0, (last_date - today).days + 1)
+
+    def has_city(self, city):
+        with self.lock:
+            row = self.conn.execute('SELECT 1 FROM cities WHERE city = ?', (city,)).fetchone()
+        return row is not None
+
+    def last_updated(self, city):
+        with self.lock:
+            row = self.conn.execute('SELECT last_updated FROM cities WHERE city = ?', (city,)).fetchone()
+        return row[0] if row else None
+
+    def import_json_cache(self, folder):
+        """Import every <city>.json file of the old cache, returning how many were read"""
+        imported = 0
+        for name in sorted(os.listdir(folder)):
+            if not name.endswith('.json') or name == 'validators.json':
+                continue
+            try:
+                with open(os.path.join(folder, name), 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                city = data['city']
+                last_updated = data.get('last_updated')
+                # dd/mm keys belong to the year around the time they were scraped
+                reference = datetime.fromisoformat(last_updated).date() if last_updated else None
+                self.upsert_city(city, data.get('prayer_times', {}), last_updated, reference)
+                imported += 1
+            except Exception as e:
+                print(f"Could not import {name}: {e}")
+        return imported
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+def _iso(day):
+    if isinstance(day, datetime):
+        day = day.date()
+    return day.isoformat() if isinstance(day, date_type) else day
+
+
+def _to_times(row):
+    day = date_type.fromisoformat(row[0])
+    times = {'Date': day.strftime('%d/%m')}
+    for prayer, value in zip(PRAYERS, row[1:]):
+        if value is not None:
+            times[prayer] = value
+    return times
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_store(path=DEFAULT_DB_PATH):
+    """Process-wide shared PrayerStore for path"""
+    with _stores_lock:
+        if path not in _stores:
+            _stores[path] = PrayerStore(path)
+        return _stores[path]
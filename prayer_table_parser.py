@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Streaming extractor for the yabiladi monthly prayer table.
+
+Only the first <table> of the page is read and parsing stops at its closing
+tag, so the rest of the page is never tokenized and no tree is built for it.
+lxml is used when it is installed, otherwise the stdlib html.parser.
+"""
+import re
+from html.parser import HTMLParser
+
+try:
+    from lxml import etree
+except ImportError:
+    etree = None
+
+TABLE_TAG = re.compile(r'<table', re.I)
+
+
+class _TableDone(Exception):
+    pass
+
+
+class TableExtractor(HTMLParser):
+    """Collect header and row cell texts of the first table, then stop"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.headers = []
+        self.rows = []
+        self.depth = 0        # nesting level of <table>
+        self.cell = None      # text parts of the open th/td
+        self.cell_tag = None
+        self.row = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'table':
+            self.depth += 1
+            return
+        if self.depth != 1:
+            return
+        if tag == 'tr':
+            self.close_cell()
+            self.close_row()
+            self.row = []
+        elif tag in ('th', 'td'):
+            self.close_cell()
+            self.cell = []
+            self.cell_tag = tag
+
+    def handle_endtag(self, tag):
+        if tag == 'table':
+            self.depth -= 1
+            if self.depth == 0:
+                self.close_cell()
+                self.close_row()
+                raise _TableDone()
+            return
+        if self.depth != 1:
+            return
+        if tag in ('th', 'td'):
+            self.close_cell()
+        elif tag == 'tr':
+            self.close_cell()
+            self.close_row()
+
+    def handle_data(self, data):
+        if self.cell is not None and self.depth >= 1:
+            self.cell.append(data)
+
+    def close_cell(self):
+        if self.cell is None:
+            return
+        text = ''.join(self.cell).strip()
+        if self.cell_tag == 'th':
+            self.headers.append(text)
+        if self.row is not None:
+            self.row.append((self.cell_tag, text))
+        self.cell = None
+        self.cell_tag = None
+
+    def close_row(self):
+        if self.row is not None:
+            self.rows.append(self.row)
+        self.row = None
+
+
+def _extract_stdlib(html):
+    parser = TableExtractor()
+    try:
+        parser.feed(html)
+        parser.close()
+    except _TableDone:
+        pass
+    return parser.headers, parser.rows
+
+
+def _extract_lxml(html, chunk_size=16384):
+    parser = etree.HTMLPullParser(events=('end',), tag='table')
+    table = None
+    for pos in range(0, len(html), chunk_size):
+        parser.feed(html[pos:pos + chunk_size])
+        table = _outer_table(parser.read_events())
+        if table is not None:
+            break
+    if table is None:
+        parser.close()
+        table = _outer_table(parser.read_events())
+    if table is None:
+        return [], []
+
+    def own(element):
+        # Skip cells and rows that belong to a nested table
+        return next(a for a in element.iterancestors() if a.tag == 'table') is table
+
+    headers = [''.join(th.itertext()).strip() for th in table.iter('th') if own(th)]
+    rows = []
+    for tr in table.iter('tr'):
+        if own(tr):
+            rows.append([(cell.tag, ''.join(cell.itertext()).strip())
+                         for cell in tr.iter('th', 'td') if own(cell)])
+    return headers, rows
+
+
+def _outer_table(events):
+    for _, element in events:
+        if not any(a.tag == 'table' for a in element.iterancestors()):
+            return element
+    return None
+
+
+def extract_table(html):
+    """Return (headers, rows) for the first table in html.
+
+    rows holds one list of (tag, text) cells per <tr>, in document order.
+    """
+    # Cheap reject; the parsers still start at the top of the page so that
+    # markup quoted inside <script> or comments is not mistaken for the table
+    if not TABLE_TAG.search(html):
+        return [], []
+    if etree is not None:
+        return _extract_lxml(html)
+    return _extract_stdlib(html)
+
+
+def parse_prayer_table(html):
+    """Parse the monthly table into {date: {header: value}}.
+
+    Mirrors the BeautifulSoup path: rows after the first one with at least
+    one <td> are zipped against the <th> headers, keyed by their first cell.
+    """
+    headers, rows = extract_table(html)
+    if not headers and not rows:
+        return None
+
+    all_prayer_times = {}
+    for row in rows[1:]:
+        columns = [text for tag, text in row if tag == 'td']
+        if columns:
+            all_prayer_times[columns[0]] = dict(zip(headers, columns))
+    return all_prayer_times
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Adaptive refresh rate for countdown displays.
+
+A countdown only needs to change once a minute while the next adhan or
+iqama is far away, so ticks are aligned to the minute boundary and second
+ticks are used only inside a window before the next event (or while the
+caller forces them, e.g. when a menu is open). This keeps an idle tray at
+about 60 wakeups an hour instead of 3600.
+"""
+import time
+from datetime import datetime
+
+from PyQt5.QtCore import QObject, Qt, QTimer
+
+from day_timeline import DAY_SECONDS
+
+DEFAULT_SECONDS_WINDOW = 600
+# Land just after the boundary so the display shows the new second/minute
+MARGIN_MS = 5
+
+
+def seconds_to_next_event(timeline, now):
+    """Seconds from now until the next adhan or iqama, None without prayer times"""
+    if not timeline:
+        return None
+    now_secs = now.hour * 3600 + now.minute * 60 + now.second + now.microsecond / 1e6
+    event = timeline.next_event(int(now_secs))
+    event_secs = event[0] if event else DAY_SECONDS + timeline.times[0]
+    return event_secs - now_secs
+
+
+def next_tick(timeline, now, window=DEFAULT_SECONDS_WINDOW):
+    """(delay in ms, second_ticks) for the tick after now"""
+    to_next_second = 1000 - now.microsecond // 1000 + MARGIN_MS
+    until = seconds_to_next_event(timeline, now)
+    if until is not None and until <= window:
+        return to_next_second, True
+    to_next_minute = (59 - now.second) * 1000 + to_next_second
+    if until is not None:
+        # Wake up when the window opens even if that is mid-minute
+        to_next_minute = min(to_next_minute, int((until - window) * 1000) + MARGIN_MS)
+    return to_next_minute, False
+
+
+class RefreshTicker(QObject):
+    """Single-shot timer calling callback at the rate chosen by policy().
+
+    policy() returns (delay_ms, second_ticks) as next_tick() does. The mode
+    of the current tick is in second_ticks when the callback runs.
+    """
+
+    def __init__(self, callback, policy, parent=None):
+        super().__init__(parent)
+        self.callback = callback
+        self.policy = policy
+        self.second_ticks = False
+        self.forced = False
+        self.wakeups = 0
+        self.started = None
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setTimerType(Qt.PreciseTimer)
+        self.timer.timeout.connect(self.on_timeout)
+
+    def start(self):
+        """Refresh now and keep refreshing"""
+        if self.started is None:
+            self.started = time.monotonic()
+        self.tick()
+
+    def stop(self):
+        self.timer.stop()
+
+    def is_active(self):
+        return self.timer.isActive()
+
+    def force_seconds(self, enabled):
+        """Tick every second regardless of the policy (e.g. while a menu is shown)"""
+        self.forced = enabled
+        if self.timer.isActive():
+            self.tick()
+
+    def on_timeout(self):
+        self.wakeups += 1
+        self.tick()
+
+    def tick(self):
+        delay, self.second_ticks = self.policy()
+        if self.forced and not self.second_ticks:
+            self.second_ticks = True
+            delay = 1000 - datetime.now().microsecond // 1000 + MARGIN_MS
+        try:
+            self.callback()
+        finally:
+            self.timer.start(max(0, delay))
+
+    def wakeups_per_hour(self):
+        if self.started is None:
+            return 0.0
+        hours = (time.monotonic() - self.started) / 3600
+        return self.wakeups / hours if hours > 0 else 0.0
@@ -1,37 +1,59 @@
 #!/usr/bin/env python3
 import sys
 import os
-import json
 import subprocess
 from datetime import datetime, timedelta
 from PyQt5.QtWidgets import *
 from PyQt5.QtCore import *
 from PyQt5.QtGui import *
 from ultra_modern_salah import PrayerTimeWorker, CITIES, TRANSLATIONS
+from prayer_store import get_store
+from config_service import get_config
+from timetable import TIMETABLE_FOLDER, open_timetable, timetable_path
+from file_watch import DebouncedWatcher
+from prayer_scheduler import Event, PrayerScheduler, plan_day
+from scheduler_journal import SchedulerJournal
+from clock_monitor import ClockMonitor
+from tray_icon import TrayIconCache
+from notifier import get_notifier
+from audio_service import get_audio
+from prayer_alarm import PrayerAlarmDialog
+from refresh_policy import DEFAULT_SECONDS_WINDOW, RefreshTicker, next_tick
+from day_timeline import DayTimeline, format_hhmm, format_hms, seconds_since_midnight
 import os
 
 class SalahTrayIndicator(QSystemTrayIcon):
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, journal=None, clock=datetime.now):
         super().__init__(parent)
+        self.clock = clock
         
         # Load config
-        self.config_dir = os.path.join(os.path.expanduser('~'), '.salah_times', 'tray')
-        self.config_file = os.path.join(os.path.expanduser('~'), '.salah_times', 'config', 'app_config.json')
-        self.iqama_config_file = os.path.join(os.path.expanduser('~'), '.salah_times', 'config', 'iqama_times.json')
-        self.notifications_config_file = os.path.join(os.path.expanduser('~'), '.salah_times', 'config', 'notifications.json')
-        self.tray_config_file = os.path.join(self.config_dir, 'tray_config.json')
-        os.makedirs(self.config_dir, exist_ok=True)
-        self.ensure_iqama_config_exists()
-        self.ensure_notifications_config_exists()
+        self.config = get_config()
+        self.config.ensure_defaults('iqama', 'notifications')
         self.current_language = self.load_main_config('language', 'en')
         self.current_city = self.load_main_config('city', 'Tangier')
         
         # Prayer data
         self.prayer_times = {}
-        self.last_notification = None
+        self.timeline = None
         self.iqama_notification_sent = False
-        self.notification_counts = {}  # Track notification repeats
-        self.snoozed_prayers = {}  # Track snoozed prayers
+        
+        # Notification state (repeat counts, stopped prayers, snoozes),
+        # restored from the journal so a restart carries on where it was
+        self.journal = journal or SchedulerJournal()
+        self.restore_journal()
+        
+        # Rendered icons by countdown text; icon_text is the one shown
+        self.icon_cache = TrayIconCache()
+        self.icon_text = None
+        
+        # Desktop notifications over D-Bus, external commands off-thread
+        self.notifier = get_notifier()
+        self.notifier.action_invoked.connect(self.on_notification_action)
+        self.audio = get_audio()
+        # Alarm window, built hidden by the warm-up event before each adhan
+        self.alarm_dialog = None
+        self.alarm_prayer = None
         
         # Setup tray
         self.setup_tray()
@@ -41,40 +63,18 @@ class SalahTrayIndicator(QSystemTrayIcon):
         
     def load_main_config(self, key, default):
         """Load from main app config"""
-        if os.path.exists(self.config_file):
-            try:
-                with open(self.config_file, 'r') as f:
-                    config = json.load(f)
-                    return config.get(key, default)
-            except:
-                pass
-        return default
+        return self.config.value('app', key, default)
     
     def save_tray_config(self, key, value):
         """Save tray-specific configuration"""
         try:
-            config = {}
-            if os.path.exists(self.tray_config_file):
-                with open(self.tray_config_file, 'r') as f:
-                    config = json.load(f)
-            
-            config[key] = value
-            
-            with open(self.tray_config_file, 'w') as f:
-                json.dump(config, f, indent=2)
+            self.config.update('tray', {key: value})
         except Exception as e:
             print(f"Could not save tray config: {e}")
     
     def load_tray_config(self, key, default):
         """Load tray-specific configuration"""
-        try:
-            if os.path.exists(self.tray_config_file):
-                with open(self.tray_config_file, 'r') as f:
-                    config = json.load(f)
-                    return config.get(key, default)
-        except Exception as e:
-            print(f"Could not load tray config: {e}")
-        return default
+        return self.config.value('tray', key, default)
     
     def setup_tray(self):
         # Create tray icon
@@ -188,65 +188,141 @@ class SalahTrayIndicator(QSystemTrayIcon):
         self.update_tooltip()
     
     def create_icon(self, countdown_text=None):
-        pixmap = QPixmap(64, 64)
-        pixmap.fill(Qt.transparent)
-
-        painter = QPainter(pixmap)
-        painter.setRenderHint(QPainter.Antialiasing)
-
-        # Background circle
-        painter.setPen(Qt.NoPen)
-        painter.setBrush(QBrush(QColor(30, 80, 30)))
-        painter.drawEllipse(0, 0, 64, 64)
-
-        if countdown_text:
-            # Show countdown HH:MM or MM:SS
-            painter.setPen(QPen(QColor(255, 255, 255)))
-            font = QFont("Monospace", 13, QFont.Bold)
-            painter.setFont(font)
-            painter.drawText(QRect(0, 0, 64, 64), Qt.AlignCenter, countdown_text)
-        else:
-            # Mosque silhouette
-            painter.setPen(QPen(QColor(255, 255, 255), 2))
-            painter.setBrush(QBrush(QColor(255, 255, 255)))
-            painter.drawEllipse(16, 14, 32, 20)
-            painter.drawRect(8, 24, 8, 28)
-            painter.drawRect(48, 24, 8, 28)
-            painter.drawRect(12, 36, 40, 16)
-
-        painter.end()
-        return QIcon(pixmap)
+        return self.icon_cache.get(countdown_text)
     
     def setup_timer(self):
-        self.timer = QTimer()
-        self.timer.timeout.connect(self.check_notifications)
-        self.timer.start(60000)
+        # Notifications are driven by one timer armed for the next event
+        self.scheduler = PrayerScheduler(clock=self.clock, parent=self)
+        self.scheduler.fired.connect(self.on_scheduled_event)
 
-        self.update_timer = QTimer()
-        self.update_timer.timeout.connect(self.update_display)
-        self.update_timer.start(1000)
-        
-        self.cache_timer = QTimer()
-        self.cache_timer.timeout.connect(self.load_prayer_times)
-        self.cache_timer.start(300000)
+        # Minute ticks while the next adhan/iqama is far, second ticks
+        # close to it or while the menu is open
+        self.refresh = RefreshTicker(self.update_display, self.refresh_policy, parent=self)
+        self.menu.aboutToShow.connect(lambda: self.refresh.force_seconds(True))
+        self.menu.aboutToHide.connect(lambda: self.refresh.force_seconds(False))
+        self.refresh.start()
+        
+        # Cache changes are picked up by the file watcher, only the date
+        # rollover needs a timer
+        self.day_timer = QTimer()
+        self.day_timer.setSingleShot(True)
+        self.day_timer.timeout.connect(self.on_new_day)
+        self.schedule_day_rollover()
+        
+        # Timers stop while the machine sleeps; re-arm them on resume and
+        # on clock or time zone changes
+        self.clock_monitor = ClockMonitor(parent=self)
+        self.clock_monitor.clock_jumped.connect(self.on_clock_jumped)
+        self.clock_monitor.listen_for_sleep()
+        self.clock_monitor.start()
+    
+    def refresh_policy(self):
+        timeline = self.get_timeline() if self.prayer_times else None
+        window = self.load_main_config('second_ticks_window', DEFAULT_SECONDS_WINDOW)
+        return next_tick(timeline, self.clock(), window)
+    
+    def trim_countdown(self, text):
+        """HH:MM:SS countdown trimmed to HH:MM while ticking once a minute"""
+        return text if self.refresh.second_ticks else text[:5]
+    
+    def restore_journal(self):
+        """Replay today's journal; running it again gives the same state"""
+        today = self.clock().date()
+        state = self.journal.replay(today)
+        self.journal_day = today
+        self.fired_events = state.fired  # (kind, prayer, count) already shown today
+        self.notification_counts = state.counts  # Track notification repeats
+        self.stopped_prayers = {prayer: today for prayer in state.stopped}
+        self.snooze_events = state.snoozes  # prayer -> pending snooze Event
+    
+    def schedule_day_rollover(self):
+        """Arm day_timer for just after the next midnight"""
+        now = self.clock()
+        midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+        self.day_timer.start(int((midnight - now).total_seconds() * 1000) + 1000)
+    
+    def on_new_day(self):
+        self.journal.compact(self.clock().date())
+        self.restore_journal()
+        self.load_prayer_times()
+        self.schedule_day_rollover()
+    
+    def on_clock_jumped(self, reason, seconds):
+        """Re-arm every timer after a resume, clock step or time zone change"""
+        print(f"Tray: clock {reason} ({seconds:+.0f} s), re-arming timers")
+        now = self.clock()
+        if now.date() != self.journal_day:
+            self.on_new_day()
+        else:
+            self.timeline = None
+            self.reschedule_notifications()
+            self.schedule_day_rollover()
+            self.refresh.start()
+        if seconds > 0 and self.load_notification_settings().get('missed_prayer_notice', True):
+            self.notify_missed_prayers(now - timedelta(seconds=seconds), now)
+    
+    def missed_prayers(self, since, now):
+        """Today's enabled adhans between since and the catch-up window that never fired"""
+        if not self.prayer_times:
+            return []
+        cutoff = now - self.scheduler.grace
+        events = plan_day(self.get_timeline(), now.date(), self.load_notification_settings())
+        return [event for event in events
+                if event.kind == 'adhan' and since < event.when <= cutoff
+                and ('adhan', event.prayer, 1) not in self.fired_events]
+    
+    def notify_missed_prayers(self, since, now):
+        """One notice for all adhans missed while asleep (later ones still fire)"""
+        missed = self.missed_prayers(since, now)
+        if not missed:
+            return
+        names = ", ".join(f"{self.tr_prayer(event.prayer)} ({event.when:%H:%M})" for event in missed)
+        self.notifier.notify(
+            f"🕌 Missed prayer time{'s' if len(missed) > 1 else ''}",
+            f"While the computer was asleep: {names}",
+            tag='missed'
+        )
+        for event in missed:
+            self.fired_events.add(('adhan', event.prayer, 1))
     
     def setup_config_watcher(self):
-        # Timer to check for config file changes
-        self.config_watcher = QTimer()
-        self.config_watcher.timeout.connect(self.check_config_changes)
-        self.config_watcher.start(2000)  # Check every 2 seconds
-        self.last_config_mtime = self.get_config_mtime()
-    
-    def get_config_mtime(self):
-        try:
-            return os.path.getmtime(self.config_file) if os.path.exists(self.config_file) else 0
-        except:
-            return 0
+        """Watch config files and the prayer time cache instead of polling them"""
+        self.config_paths = {self.config.path(section) for section in ('app', 'iqama', 'notifications')}
+        self.config_paths.add(os.path.dirname(self.config.path('app')))
+        
+        # add_file() also watches the parent folder, which is what notices
+        # a file being replaced by an atomic rename
+        self.file_watcher = DebouncedWatcher(parent=self)
+        for section in ('app', 'iqama', 'notifications'):
+            self.file_watcher.add_file(self.config.path(section))
+        store_path = get_store().path
+        self.file_watcher.add_file(store_path)
+        self.file_watcher.add_file(store_path + '-wal')
+        self.file_watcher.add_directory(TIMETABLE_FOLDER)
+        self.file_watcher.add_file(timetable_path(self.current_city))
+        self.file_watcher.changed.connect(self.on_files_changed)
+    
+    def on_files_changed(self, paths):
+        """Called once per burst of changes to the watched files"""
+        city = self.current_city
+        self.check_config_changes()
+        if self.current_city != city:
+            self.file_watcher.remove_file(timetable_path(city))
+            self.file_watcher.add_file(timetable_path(self.current_city))
+            return  # check_config_changes already reloaded
+        if any(path not in self.config_paths for path in paths):
+            self.load_prayer_times()
     
     def check_config_changes(self):
-        current_mtime = self.get_config_mtime()
-        if current_mtime != self.last_config_mtime:
-            self.last_config_mtime = current_mtime
+        changed = self.config.reload_changed()
+        if 'iqama' in changed:
+            self.timeline = None
+            self.refresh.start()
+        if changed & {'iqama', 'notifications'}:
+            self.reschedule_notifications()
+        if 'notifications' in changed:
+            self.audio.configure(self.load_notification_settings())
+        if 'app' in changed:
             new_language = self.load_main_config('language', 'en')
             new_city = self.load_main_config('city', 'Tangier')
             
@@ -258,27 +334,32 @@ class SalahTrayIndicator(QSystemTrayIcon):
     def load_prayer_times(self):
         """Load prayer times from main app's cache only"""
         try:
-            # Load from main app's cities cache ONLY
-            cities_folder = os.path.join(os.path.expanduser('~'), '.salah_times', 'cities')
-            city_file = os.path.join(cities_folder, f'{self.current_city.lower()}.json')
-            
-            if os.path.exists(city_file):
-                with open(city_file, 'r', encoding='utf-8') as f:
-                    city_data = json.load(f)
-                    today = datetime.now().strftime('%d/%m')
-                    if today in city_data['prayer_times']:
-                        self.prayer_times = city_data['prayer_times'][today]
-                        print(f"Tray: Loaded cached prayer times for {self.current_city}")
-                        self.on_prayer_times_loaded(self.prayer_times)
-                        return
+            # Read today's row from the main app's cache ONLY: the mmap
+            # timetable when the binary format is enabled, else the store
+            today = self.clock().date()
+            today_times = None
+            if self.load_main_config('cache_format', 'sqlite') == 'binary':
+                timetable = open_timetable(self.current_city)
+                if timetable is not None:
+                    today_times = timetable.times(today)
+            if today_times is None:
+                today_times = get_store().get_day(self.current_city, today)
+            if today_times:
+                self.prayer_times = today_times
+                print(f"Tray: Loaded cached prayer times for {self.current_city}")
+                self.on_prayer_times_loaded(self.prayer_times)
+                return
             
             # No cache available - use empty times (don't fetch)
             print(f"Tray: No cached data for {self.current_city}, waiting for main app")
             self.prayer_times = {}
+            self.timeline = None
+            self.scheduler.clear()
             
         except Exception as e:
             print(f"Tray: Error loading prayer times: {e}")
             self.prayer_times = {}
+            self.timeline = None
     
     def refresh_prayer_times(self):
         """Refresh prayer times without closing the menu"""
@@ -303,17 +384,10 @@ class SalahTrayIndicator(QSystemTrayIcon):
     
     def on_prayer_times_loaded(self, prayer_times, days_remaining=None):
         self.prayer_times = prayer_times
+        self.timeline = None
         self.update_prayer_menu()
-        self.update_display()
-        # Reset notification flags when new data is loaded
-        self.notification_counts = {}
-        # Cancel all pending timers
-        if hasattr(self, 'prayer_timers'):
-            for prayer, timers in self.prayer_timers.items():
-                for timer in timers:
-                    if timer.isActive():
-                        timer.stop()
-            self.prayer_timers = {}
+        self.refresh.start()
+        self.reschedule_notifications()
     
     def on_error(self, error):
         self.setToolTip(f"Salah Times - Error: {error}")
@@ -351,14 +425,10 @@ class SalahTrayIndicator(QSystemTrayIcon):
         if next_prayer:
             prayer_name = self.tr_prayer(next_prayer)
             prayer_time = self.prayer_times[next_prayer]
-            countdown = self.get_live_countdown_to_prayer(next_prayer)
+            countdown = self.trim_countdown(self.get_live_countdown_to_prayer(next_prayer))
             
             # Check if it's tomorrow's prayer
-            now = datetime.now()
-            current_time = now.hour * 60 + now.minute
-            prayer_time_minutes = self.parse_time(prayer_time)
-            
-            if prayer_time_minutes <= current_time:
+            if self.is_next_prayer_tomorrow():
                 tooltip += f"Next: {prayer_name} ({self.tr('tomorrow')}) at {prayer_time}\n"
             else:
                 tooltip += f"Next: {prayer_name} at {prayer_time}\n"
@@ -367,7 +437,7 @@ class SalahTrayIndicator(QSystemTrayIcon):
         
         # Add current prayer Iqama info if applicable
         if current_prayer and self.is_iqama_time(current_prayer):
-            iqama_countdown = self.get_live_iqama_countdown(current_prayer)
+            iqama_countdown = self.trim_countdown(self.get_live_iqama_countdown(current_prayer))
             tooltip += f"\n⏰ Iqama {self.tr_prayer(current_prayer)}: {iqama_countdown}"
         
         self.setToolTip(tooltip)
@@ -381,7 +451,7 @@ class SalahTrayIndicator(QSystemTrayIcon):
         self.title_action.setText(f"🕌 {self.tr('app_title')} - {city_name}")
         
         # Update date
-        now = datetime.now()
+        now = self.clock()
         date_str = now.strftime("%A, %B %d, %Y")
         self.date_action.setText(f"📅 {date_str}")
         
@@ -432,14 +502,16 @@ class SalahTrayIndicator(QSystemTrayIcon):
 
     def update_tray_icon(self):
         next_prayer = self.get_next_prayer()
+        icon_text = None
         if next_prayer and self.prayer_times:
             countdown = self.get_live_countdown_to_prayer(next_prayer)
             # Show HH:MM in icon (fits better)
             parts = countdown.split(':')
             icon_text = f"{parts[0]}:{parts[1]}" if len(parts) >= 2 else countdown
+        # setIcon re-sends the image to the panel, only do it on a change
+        if icon_text != self.icon_text:
+            self.icon_text = icon_text
             self.setIcon(self.create_icon(icon_text))
-        else:
-            self.setIcon(self.create_icon())
     
     def update_countdown_display(self):
         if not self.prayer_times:
@@ -452,11 +524,7 @@ class SalahTrayIndicator(QSystemTrayIcon):
             prayer_time = self.prayer_times[next_prayer]
             
             # Check if it's tomorrow's prayer
-            now = datetime.now()
-            current_time = now.hour * 60 + now.minute
-            prayer_time_minutes = self.parse_time(prayer_time)
-            
-            if prayer_time_minutes <= current_time:
+            if self.is_next_prayer_tomorrow():
                 prayer_display = f"{prayer_name} ({self.tr('tomorrow')})"
             else:
                 prayer_display = prayer_name
@@ -464,7 +532,7 @@ class SalahTrayIndicator(QSystemTrayIcon):
             self.next_prayer_action.setText(f"{prayer_display} - {prayer_time}")
             
             # Update countdown
-            countdown = self.get_live_countdown_to_prayer(next_prayer)
+            countdown = self.trim_countdown(self.get_live_countdown_to_prayer(next_prayer))
             self.countdown_action.setText(f"⏰ {countdown} ⏰")
         else:
             self.next_prayer_action.setText("No prayer data")
@@ -473,7 +541,7 @@ class SalahTrayIndicator(QSystemTrayIcon):
         # Update Iqama countdown
         current_prayer = self.get_current_prayer()
         if current_prayer and self.is_iqama_time(current_prayer):
-            iqama_countdown = self.get_live_iqama_countdown(current_prayer)
+            iqama_countdown = self.trim_countdown(self.get_live_iqama_countdown(current_prayer))
             iqama_time = self.get_iqama_time(current_prayer)
             prayer_name = self.tr_prayer(current_prayer)
             self.iqama_action.setText(f"⏰ Iqama {prayer_name} at {iqama_time}: {iqama_countdown}")
@@ -482,87 +550,103 @@ class SalahTrayIndicator(QSystemTrayIcon):
             self.iqama_action.setText("")
             self.iqama_action.setVisible(False)
     
-    def check_notifications(self):
+    def reschedule_notifications(self):
+        """Plan today's remaining notification events from the prayer times and settings"""
         if not self.prayer_times:
+            self.scheduler.clear()
             return
-        
-        now = datetime.now()
-        current_time = now.hour * 60 + now.minute
-        current_minute_key = f"{now.hour:02d}:{now.minute:02d}"
-        
-        prayers = [name for name in self.prayer_times.keys() if name != 'Date']
-        notification_settings = self.load_notification_settings()
-        
-        for prayer in prayers:
-            if prayer in self.prayer_times:
-                prayer_time_str = self.prayer_times[prayer]
-                prayer_time = self.parse_time(prayer_time_str)
-                
-                # Check if notifications are enabled for this prayer
-                prayer_config = notification_settings.get(prayer, {'enabled': True, 'repeat_count': 3})
-                if not prayer_config.get('enabled', True):
-                    continue
-                
-                # Prayer time notification - trigger only once per minute
-                if current_time == prayer_time:
-                    if prayer not in self.notification_counts:
-                        max_repeats = prayer_config.get('repeat_count', 3)
-                        self.notification_counts[prayer] = 1
-                        self.send_prayer_notification_immediate(prayer)
-                        
-                        # Schedule repeats if configured
-                        if max_repeats > 1:
-                            self.schedule_repeat_notifications(prayer, max_repeats)
-                
-                # Reset notification count after prayer time window
-                elif current_time > prayer_time + 5:  # 5 minutes after prayer
-                    if prayer in self.notification_counts:
-                        del self.notification_counts[prayer]
-                        # Cancel any pending timers for this prayer
-                        self.cancel_prayer_timers(prayer)
-    
-    def schedule_repeat_notifications(self, prayer, max_repeats):
-        """Schedule repeat notifications for a prayer"""
-        notification_settings = self.load_notification_settings()
-        interval_minutes = notification_settings.get('notification_interval', 2)
-        interval_ms = interval_minutes * 60 * 1000
-        
-        # Store timers to allow cancellation
-        if not hasattr(self, 'prayer_timers'):
-            self.prayer_timers = {}
-        
-        self.prayer_timers[prayer] = []
-        
-        for repeat_num in range(2, max_repeats + 1):  # Start from 2nd notification
-            timer = QTimer()
-            timer.setSingleShot(True)
-            timer.timeout.connect(lambda p=prayer, n=repeat_num: self.send_repeat_notification(p, n))
-            timer.start((repeat_num - 1) * interval_ms)
-            self.prayer_timers[prayer].append(timer)
-    
-    def send_repeat_notification(self, prayer, repeat_num):
-        """Send a repeat notification"""
-        if prayer in self.notification_counts:  # Only if not cancelled
-            notification_settings = self.load_notification_settings()
-            prayer_config = notification_settings.get(prayer, {'repeat_count': 3})
-            max_repeats = prayer_config.get('repeat_count', 3)
-            
-            # Only send if we haven't exceeded the configured repeat count
-            if repeat_num <= max_repeats:
-                self.notification_counts[prayer] = repeat_num
+        today = self.clock().date()
+        events = plan_day(self.get_timeline(), today, self.load_notification_settings(),
+                          iqama_prayers=set(self.load_iqama_times()))
+        # Leave out events already shown and repeats the user stopped today;
+        # events missed within the grace period (e.g. during a restart) still fire
+        events = [event for event in events
+                  if (event.kind, event.prayer, event.count) not in self.fired_events
+                  and not (event.kind == 'repeat' and self.stopped_prayers.get(event.prayer) == today)]
+        events.extend(self.snooze_events.values())
+        self.scheduler.schedule(events, catch_up=True)
+        next_event = self.scheduler.next_event()
+        if next_event:
+            print(f"Tray: {len(self.scheduler.heap)} notifications scheduled, next {next_event.kind} "
+                  f"{next_event.prayer} at {next_event.when:%H:%M:%S}")
+    
+    def describe_schedule(self):
+        """Pending notification events, one per line (for debugging)"""
+        return "\n".join(f"{event.when:%Y-%m-%d %H:%M:%S}  {event.kind:<9} {event.prayer}"
+                         f"{f' #{event.count}' if event.kind == 'repeat' else ''}"
+                         for event in self.scheduler.upcoming())
+    
+    def on_scheduled_event(self, event):
+        """Handle an adhan, repeat, iqama, pre-alert, warm-up or snooze event from the scheduler"""
+        try:
+            prayer = event.prayer
+            self.fired_events.add((event.kind, prayer, event.count))
+            self.journal.record_fired(event)
+            if event.kind == 'warmup':
+                self.prepare_alarm(prayer)
+            elif event.kind == 'snooze':
+                self.snooze_events.pop(prayer, None)
+                self.show_alarm(prayer, snoozed=True)
+            elif event.kind == 'adhan':
+                self.notification_counts[prayer] = 1
                 self.send_prayer_notification_immediate(prayer)
-            else:
-                # Clean up if we've reached the limit
-                del self.notification_counts[prayer]
-                self.cancel_prayer_timers(prayer)
-    
-    def cancel_prayer_timers(self, prayer):
-        """Cancel all pending timers for a prayer"""
-        if hasattr(self, 'prayer_timers') and prayer in self.prayer_timers:
-            for timer in self.prayer_timers[prayer]:
-                if timer.isActive():
-                    timer.stop()
-            del self.prayer_timers[prayer]
+                if self.load_notification_settings().get('alarm_dialog', False):
+                    self.show_alarm(prayer)
+            elif event.kind == 'repeat':
+                if prayer in self.notification_counts:  # Only if not stopped
+                    self.notification_counts[prayer] = event.count
+                    self.send_prayer_notification_immediate(prayer)
+            elif event.kind == 'iqama':
+                self.notification_counts.pop(prayer, None)
+                self.showMessage(
+                    f"🕌 Iqama {self.tr_prayer(prayer)}",
+                    f"Iqama for {self.tr_prayer(prayer)} is now ({self.get_iqama_time(prayer)})",
+                    QSystemTrayIcon.Information,
+                    8000
+                )
+            elif event.kind == 'pre_alert':
+                minutes = self.load_notification_settings().get('pre_alert_minutes', 0)
+                self.showMessage(
+                    f"🕌 {self.tr_prayer(prayer)} in {minutes} minutes",
+                    f"{self.tr_prayer(prayer)} at {self.prayer_times.get(prayer, '--:--')}",
+                    QSystemTrayIcon.Information,
+                    8000
+                )
+        except Exception as e:
+            print(f"Could not handle {event.kind} notification for {event.prayer}: {e}")
+    
+    def prepare_alarm(self, prayer):
+        """Build (once) and set up the hidden alarm window for the coming adhan"""
+        if self.alarm_dialog is None:
+            self.alarm_dialog = PrayerAlarmDialog(prayer, self.prayer_times.get(prayer, '--:--'),
+                                                  self.current_language, show_now=False)
+            self.alarm_dialog.stopped.connect(self.on_alarm_stopped)
+            self.alarm_dialog.snooze_started.connect(self.on_alarm_snoozed)
+        self.alarm_dialog.prepare(prayer, self.prayer_times.get(prayer, '--:--'))
+        self.alarm_prayer = prayer
+    
+    def show_alarm(self, prayer, snoozed=False):
+        """Show the alarm window; at the adhan the notification plays the sound"""
+        if self.alarm_dialog is None or self.alarm_prayer != prayer:
+            self.prepare_alarm(prayer)  # No warm-up (e.g. tray started just now)
+        if snoozed:
+            self.alarm_dialog.show_snoozed_alarm()
+        else:
+            self.alarm_dialog.present(play_sound=False)
+    
+    def on_alarm_stopped(self):
+        if self.alarm_prayer:
+            self.stop_all_notifications(self.alarm_prayer)
+    
+    def on_alarm_snoozed(self, until):
+        """Let the scheduler bring the alarm back, so the snooze survives a restart"""
+        prayer = self.alarm_prayer
+        self.alarm_dialog.snooze_timer.stop()
+        count = 1 + sum(1 for kind, name, _ in self.fired_events if kind == 'snooze' and name == prayer)
+        event = Event(until, 'snooze', prayer, count)
+        self.snooze_events[prayer] = event
+        self.journal.record_snoozed(event, self.clock().date())
+        self.scheduler.add(event)
     
     def send_prayer_notification_immediate(self, prayer):
         """Send immediate system notification with sound"""
@@ -583,16 +667,16 @@ class SalahTrayIndicator(QSystemTrayIcon):
             # Play sound immediately BEFORE notification
             self.play_system_sound()
             
-            # Send system notification with actions
-            subprocess.run([
-                'notify-send',
+            # Send system notification with actions; repeats replace the
+            # prayer's previous notification
+            self.notifier.notify(
                 f'🕌 {prayer_name} Prayer Time{repeat_info}',
                 f'It\'s time for {prayer_name} prayer\nIqama at {iqama_time} (in {iqama_delay} minutes)',
-                '--urgency=critical',
-                '--expire-time=0',  # Don't auto-expire
-                '--icon=appointment-soon',
-                '--action=stop=⏹️ Stop All'
-            ], check=False, timeout=2)
+                tag=prayer,
+                urgency='critical',
+                expire_ms=0,  # Don't auto-expire
+                actions=[('stop', '⏹️ Stop All')]
+            )
             
         except Exception as e:
             print(f"Could not send system notification: {e}")
@@ -625,27 +709,25 @@ class SalahTrayIndicator(QSystemTrayIcon):
         """Stop all notifications for a prayer"""
         if prayer in self.notification_counts:
             del self.notification_counts[prayer]
-        self.cancel_prayer_timers(prayer)
+        today = self.clock().date()
+        self.stopped_prayers[prayer] = today
+        self.snooze_events.pop(prayer, None)
+        self.scheduler.cancel(prayer, kinds=('repeat', 'snooze'))
+        self.journal.record_stopped(prayer, today)
+        self.audio.stop_all()
         print(f"Stopped all notifications for {prayer}")
     
     def play_system_sound(self):
-        """Play system sound if enabled"""
+        """Play the preloaded adhan/alarm sound if enabled"""
         notification_settings = self.load_notification_settings()
         if not notification_settings.get('sound_enabled', True):
             return
-            
-        try:
-            # Try alarm sound first
-            subprocess.run(['paplay', '/usr/share/sounds/freedesktop/stereo/alarm-clock-elapsed.oga'], 
-                         check=False, timeout=3)
-        except:
-            try:
-                # Fallback to message sound
-                subprocess.run(['paplay', '/usr/share/sounds/freedesktop/stereo/message-new-instant.oga'], 
-                             check=False, timeout=3)
-            except:
-                # Final fallback: system beep
-                print('\a')
+        self.audio.play()
+    
+    def on_notification_action(self, tag, action):
+        """Action button clicked in a prayer notification"""
+        if action == 'stop' and tag in self.prayer_times:
+            self.stop_all_notifications(tag)
     
     def on_prayer_clicked(self, prayer):
         if prayer not in self.prayer_times:
@@ -670,204 +752,80 @@ class SalahTrayIndicator(QSystemTrayIcon):
         except Exception as e:
             self.showMessage("Error", f"Could not open main app: {e}", QSystemTrayIcon.Critical)
     
+    def get_timeline(self):
+        """Today's DayTimeline, rebuilt when the day, prayer times or Iqama config change"""
+        today = self.clock().date()
+        if self.timeline is None or self.timeline.day != today:
+            self.timeline = DayTimeline(self.prayer_times, self.load_iqama_times(), day=today)
+        return self.timeline
+    
+    def now_seconds(self):
+        return seconds_since_midnight(self.clock())
+    
     def get_next_prayer(self):
         if not self.prayer_times:
             return None
-        
-        now = datetime.now()
-        current_time = now.hour * 60 + now.minute
-        
-        prayers = [name for name in self.prayer_times.keys() if name != 'Date']
-        
-        for prayer in prayers:
-            if prayer in self.prayer_times:
-                prayer_time = self.parse_time(self.prayer_times[prayer])
-                if prayer_time > current_time:
-                    return prayer
-        
-        # If no prayer today, return first prayer (Fajr) for tomorrow
-        return prayers[0] if prayers else None
+        prayer, _, _ = self.get_timeline().next(self.now_seconds())
+        return prayer
+    
+    def is_next_prayer_tomorrow(self):
+        _, _, is_tomorrow = self.get_timeline().next(self.now_seconds())
+        return is_tomorrow
     
     def get_current_prayer(self):
         if not self.prayer_times:
             return None
-        
-        now = datetime.now()
-        current_time = now.hour * 60 + now.minute
-        
-        prayers = [name for name in self.prayer_times.keys() if name != 'Date']
-        
-        for i, prayer in enumerate(prayers):
-            if prayer in self.prayer_times:
-                prayer_time = self.parse_time(self.prayer_times[prayer])
-                next_prayer_time = None
-                
-                if i < len(prayers) - 1:
-                    next_prayer = prayers[i + 1]
-                    if next_prayer in self.prayer_times:
-                        next_prayer_time = self.parse_time(self.prayer_times[next_prayer])
-                else:
-                    next_prayer_time = 24 * 60
-                
-                if next_prayer_time and prayer_time <= current_time < next_prayer_time:
-                    return prayer
-        
-        return None
+        return self.get_timeline().current(self.now_seconds())
     
     def get_countdown_to_prayer(self, prayer):
-        if not prayer or prayer not in self.prayer_times:
+        if not prayer or prayer not in self.get_timeline().texts:
             return "00:00:00"
-        
-        now = datetime.now()
-        current_time = now.hour * 60 + now.minute
-        prayer_time = self.parse_time(self.prayer_times[prayer])
-        
-        if prayer_time > current_time:
-            remaining = prayer_time - current_time
-        else:
-            # Tomorrow's prayer
-            remaining = (24 * 60) - current_time + prayer_time
-        
-        hours = remaining // 60
-        minutes = remaining % 60
-        
-        return f"{hours:02d}:{minutes:02d}"
+        # Whole minutes, rounded down like the HH:MM display
+        remaining = self.get_timeline().seconds_until(prayer, self.now_seconds() // 60 * 60)
+        return format_hms(remaining)[:5]
     
     def get_live_countdown_to_prayer(self, prayer):
-        if not prayer or prayer not in self.prayer_times:
+        if not prayer or prayer not in self.get_timeline().texts:
             return "00:00:00"
-
-        now = datetime.now()
-        now_seconds = now.hour * 3600 + now.minute * 60 + now.second
-        prayer_minutes = self.parse_time(self.prayer_times[prayer])
-        prayer_seconds = prayer_minutes * 60
-
-        remaining = prayer_seconds - now_seconds
-        if remaining <= 0:
-            remaining += 24 * 3600  # tomorrow
-
-        h = remaining // 3600
-        m = (remaining % 3600) // 60
-        s = remaining % 60
-        return f"{h:02d}:{m:02d}:{s:02d}"
+        return format_hms(self.get_timeline().seconds_until(prayer, self.now_seconds()))
     
     def get_iqama_countdown(self, prayer):
-        if not prayer or prayer not in self.prayer_times:
+        if not prayer or prayer not in self.get_timeline().texts:
             return "00:00:00"
-        
-        now = datetime.now()
-        current_time = now.hour * 60 + now.minute
-        prayer_time = self.parse_time(self.prayer_times[prayer])
-        iqama_delay = self.get_iqama_delay(prayer)
-        iqama_end_time = prayer_time + iqama_delay
-        
-        remaining = iqama_end_time - current_time
-        
+        remaining = self.get_timeline().seconds_until_iqama(prayer, self.now_seconds() // 60 * 60)
         if remaining <= 0:
             return "00:00:00"
-        
-        hours = remaining // 60
-        minutes = remaining % 60
-        
-        return f"{hours:02d}:{minutes:02d}"
+        return format_hms(remaining)[:5]
     
     def get_live_iqama_countdown(self, prayer):
-        if not prayer or prayer not in self.prayer_times:
+        if not prayer or prayer not in self.get_timeline().texts:
             return "00:00:00"
-
-        now = datetime.now()
-        now_seconds = now.hour * 3600 + now.minute * 60 + now.second
-        prayer_minutes = self.parse_time(self.prayer_times[prayer])
-        iqama_seconds = (prayer_minutes + self.get_iqama_delay(prayer)) * 60
-
-        remaining = iqama_seconds - now_seconds
+        remaining = self.get_timeline().seconds_until_iqama(prayer, self.now_seconds())
         if remaining <= 0:
             return "00:00:00"
-
-        h = remaining // 3600
-        m = (remaining % 3600) // 60
-        s = remaining % 60
-        return f"{h:02d}:{m:02d}:{s:02d}"
+        return format_hms(remaining)
     
     def is_iqama_time(self, prayer):
-        if not prayer or prayer not in self.prayer_times:
+        if not prayer or not self.prayer_times:
             return False
-        
-        now = datetime.now()
-        current_time = now.hour * 60 + now.minute
-        prayer_time = self.parse_time(self.prayer_times[prayer])
-        iqama_delay = self.get_iqama_delay(prayer)
-        
-        return prayer_time <= current_time < prayer_time + iqama_delay
-    
-    def ensure_iqama_config_exists(self):
-        """Create Iqama config with defaults if it doesn't exist"""
-        if not os.path.exists(self.iqama_config_file):
-            try:
-                config_dir = os.path.dirname(self.iqama_config_file)
-                os.makedirs(config_dir, exist_ok=True)
-                default_iqama = {'Fajr': 20, 'Dohr': 15, 'Asr': 15, 'Maghreb': 10, 'Isha': 15}
-                with open(self.iqama_config_file, 'w') as f:
-                    json.dump(default_iqama, f, indent=2)
-            except Exception as e:
-                print(f"Could not create default Iqama config: {e}")
+        return self.get_timeline().in_iqama_window(prayer, self.now_seconds())
     
     def load_iqama_times(self):
         """Load Iqama times from config"""
-        try:
-            with open(self.iqama_config_file, 'r') as f:
-                return json.load(f)
-        except Exception as e:
-            print(f"Could not load Iqama times: {e}")
-            return {'Fajr': 20, 'Dohr': 15, 'Asr': 15, 'Maghreb': 10, 'Isha': 15}
-    
-    def ensure_notifications_config_exists(self):
-        """Create notifications config with defaults if it doesn't exist"""
-        if not os.path.exists(self.notifications_config_file):
-            try:
-                config_dir = os.path.dirname(self.notifications_config_file)
-                os.makedirs(config_dir, exist_ok=True)
-                default_notifications = {
-                    'sound_enabled': True,
-                    'snooze_duration': 5,
-                    'notification_interval': 2,
-                    'Fajr': {'enabled': True, 'repeat_count': 3},
-                    'Dohr': {'enabled': True, 'repeat_count': 3},
-                    'Asr': {'enabled': True, 'repeat_count': 3},
-                    'Maghreb': {'enabled': True, 'repeat_count': 3},
-                    'Isha': {'enabled': True, 'repeat_count': 3}
-                }
-                with open(self.notifications_config_file, 'w') as f:
-                    json.dump(default_notifications, f, indent=2)
-            except Exception as e:
-                print(f"Could not create default notifications config: {e}")
+        return self.config.iqama_delays()
     
     def load_notification_settings(self):
-        """Load notification settings from config"""
-        try:
-            with open(self.notifications_config_file, 'r') as f:
-                return json.load(f)
-        except Exception as e:
-            print(f"Could not load notification settings: {e}")
-            return {'sound_enabled': True, 'snooze_duration': 5, 'notification_interval': 2}
+        """Notification settings, served from memory by the config service"""
+        return self.config.notification_settings()
     
     def get_iqama_delay(self, prayer):
         """Get Iqama delay from config"""
-        iqama_times = self.load_iqama_times()
-        return iqama_times.get(prayer, 15)
+        return self.config.iqama_delay(prayer)
     
     def get_iqama_time(self, prayer):
-        if not prayer or prayer not in self.prayer_times:
+        if not prayer or prayer not in self.get_timeline().texts:
             return "00:00"
-        
-        prayer_time = self.parse_time(self.prayer_times[prayer])
-        iqama_delay = self.get_iqama_delay(prayer)
-        iqama_time_minutes = prayer_time + iqama_delay
-        
-        hours = iqama_time_minutes // 60
-        minutes = iqama_time_minutes % 60
-        
-        return f"{hours:02d}:{minutes:02d}"
+        return format_hhmm(self.get_timeline().iqama_time(prayer))
     
     def parse_time(self, time_str):
         try:
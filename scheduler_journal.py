@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Append-only journal of the tray's fired and acknowledged notification events.
+
+Each line is one JSON record: an event that fired, a prayer whose repeats
+were stopped, or a snoozed alarm. At startup the tray replays today's
+records to restore repeat counts, stopped prayers and pending snoozes, and
+to leave out events it already showed, so a restart neither loses nor
+repeats alerts. The file is compacted to the current day at midnight, which
+keeps a replay O(events today).
+"""
+import json
+import os
+from datetime import datetime
+
+from atomic_file import atomic_write
+from config_service import SALAH_DIR
+from prayer_scheduler import Event
+
+JOURNAL_PATH = os.path.join(SALAH_DIR, 'tray', 'scheduler_journal.jsonl')
+
+
+class DayState:
+    """One day's notification state, rebuilt from journal records"""
+
+    def __init__(self):
+        self.fired = set()    # (kind, prayer, count) of every event shown
+        self.counts = {}      # prayer -> last adhan/repeat number shown
+        self.stopped = set()  # prayers whose repeats were stopped
+        self.snoozes = {}     # prayer -> pending 'snooze' Event
+
+    def apply(self, record):
+        record_type, prayer = record['type'], record['prayer']
+        if record_type == 'fired':
+            kind, count = record['kind'], record.get('count', 0)
+            self.fired.add((kind, prayer, count))
+            if kind in ('adhan', 'repeat') and prayer not in self.stopped:
+                self.counts[prayer] = max(self.counts.get(prayer, 0), count)
+            elif kind == 'iqama':
+                self.counts.pop(prayer, None)
+            elif kind == 'snooze':
+                self.snoozes.pop(prayer, None)
+        elif record_type == 'stopped':
+            self.stopped.add(prayer)
+            self.counts.pop(prayer, None)
+            self.snoozes.pop(prayer, None)
+        elif record_type == 'snoozed':
+            self.snoozes[prayer] = Event(datetime.fromisoformat(record['until']), 'snooze',
+                                         prayer, record.get('count', 1))
+
+
+class SchedulerJournal:
+    """The tray's journal file"""
+
+    def __init__(self, path=JOURNAL_PATH):
+        self.path = path
+
+    def append(self, record_type, prayer, day, **fields):
+        record = dict(day=day.isoformat(), type=record_type, prayer=prayer, **fields)
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record, separators=(',', ':')) + '\n')
+        except OSError as e:
+            print(f"Could not write scheduler journal: {e}")
+
+    def record_fired(self, event):
+        self.append('fired', event.prayer, event.when.date(), kind=event.kind,
+                    count=event.count, when=event.when.isoformat(timespec='seconds'))
+
+    def record_stopped(self, prayer, day):
+        self.append('stopped', prayer, day)
+
+    def record_snoozed(self, event, day):
+        self.append('snoozed', event.prayer, day, count=event.count,
+                    until=event.when.isoformat(timespec='seconds'))
+
+    def read(self):
+        """Every readable record; a line torn by a crash is skipped"""
+        records = []
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        records.append(json.loads(line))
+                    except ValueError:
+                        continue
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            print(f"Could not read scheduler journal: {e}")
+        return records
+
+    def replay(self, day):
+        """DayState for day; records of earlier days are compacted away"""
+        records = self.read()
+        state = DayState()
+        for record in records:
+            if record.get('day') == day.isoformat():
+                state.apply(record)
+        if any(record.get('day', '') < day.isoformat() for record in records):
+            self.write([record for record in records if record.get('day', '') >= day.isoformat()])
+        return state
+
+    def compact(self, day):
+        """Drop records of days before day (run at midnight)"""
+        records = self.read()
+        kept = [record for record in records if record.get('day', '') >= day.isoformat()]
+        if len(kept) < len(records):
+            self.write(kept)
+        return len(records) - len(kept)
+
+    def write(self, records):
+        try:
+            atomic_write(self.path, ''.join(json.dumps(record, separators=(',', ':')) + '\n'
+                                            for record in records))
+        except OSError as e:
+            print(f"Could not compact scheduler journal: {e}")
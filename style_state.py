@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+"""
+Switch widget looks through dynamic properties instead of new stylesheets.
+
+Stylesheets are set once at the top level with rules such as
+.prayer_card[current="true"]; changing the property and re-polishing the
+affected widgets restyles them without parsing any QSS again.
+"""
+from PyQt5.QtWidgets import QWidget
+
+
+def set_style_state(widget, name, value, descendants=False):
+    """Set a boolean style property and re-polish if it changed.
+
+    With descendants=True the widget's children are re-polished too, for
+    rules like .prayer_card[current="true"] QLabel. Returns True on a change.
+    """
+    value = bool(value)
+    if widget.property(name) == value:
+        return False
+    widget.setProperty(name, value)
+    widgets = [widget] + (widget.findChildren(QWidget) if descendants else [])
+    style = widget.style()
+    for w in widgets:
+        style.unpolish(w)
+        style.polish(w)
+    widget.update()
+    return True
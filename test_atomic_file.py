@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Check that cache and config writes replace files atomically
+"""
+
+import json
+import os
+import stat
+import sys
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from atomic_file import atomic_write, write_json
+
+
+def test_write_json():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'config', 'iqama_times.json')
+        write_json(path, {'Fajr': 20, 'Dohr': 15}, indent=2, fsync=True)
+        with open(path) as f:
+            assert json.load(f) == {'Fajr': 20, 'Dohr': 15}
+
+        machine = os.path.join(tmp, 'validators.json')
+        write_json(machine, {'Tangier': {'etag': 'abc'}})
+        with open(machine) as f:
+            assert f.read() == '{"Tangier":{"etag":"abc"}}'
+        assert sorted(os.listdir(tmp)) == ['config', 'validators.json']
+    print("✅ JSON written with and without indentation")
+
+
+def test_failed_write_keeps_old_file():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'app_config.json')
+        write_json(path, {'city': 'Tangier'})
+        try:
+            write_json(path, {'city': object()})
+            assert False, "expected a TypeError"
+        except TypeError:
+            pass
+        with open(path) as f:
+            assert json.load(f) == {'city': 'Tangier'}
+        assert os.listdir(tmp) == ['app_config.json']
+    print("✅ A failed write leaves the old file and no temp file")
+
+
+def test_file_mode_kept():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'app_config.json')
+        umask = os.umask(0o022)
+        try:
+            write_json(path, {'city': 'Tangier'})
+            assert stat.S_IMODE(os.stat(path).st_mode) == 0o644  # not mkstemp's 0600
+            os.chmod(path, 0o640)
+            write_json(path, {'city': 'Rabat'})
+            assert stat.S_IMODE(os.stat(path).st_mode) == 0o640
+        finally:
+            os.umask(umask)
+    print("✅ Replaced files keep their mode, new ones follow the umask")
+
+
+def test_readers_never_see_partial_files():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'last_update.json')
+        big = {'stats': list(range(20000))}
+        write_json(path, big)
+        errors = []
+        done = threading.Event()
+
+        def reader():
+            while not done.is_set():
+                with open(path) as f:
+                    try:
+                        json.load(f)
+                    except ValueError as e:
+                        errors.append(e)
+
+        thread = threading.Thread(target=reader)
+        thread.start()
+        for i in range(50):
+            atomic_write(path, json.dumps(dict(big, run=i)))
+        done.set()
+        thread.join()
+        assert not errors, errors[:1]
+    print("✅ Concurrent readers only see complete files")
+
+
+if __name__ == "__main__":
+    test_write_json()
+    test_failed_write_keeps_old_file()
+    test_file_mode_kept()
+    test_readers_never_see_partial_files()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Check that the alert sound is resolved and loaded once, replayed without
+touching the disk, faded in and stopped
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from PyQt5.QtWidgets import QApplication
+
+import audio_service
+from audio_service import AudioService, CommandSound, ramp_volume
+
+app = QApplication.instance() or QApplication([])
+
+
+class FakeSound:
+    can_ramp = True
+
+    def __init__(self, path):
+        self.path = path
+        self.volumes = []
+        self.playing = False
+
+    def play(self, volume):
+        self.volumes = [volume]
+        self.playing = True
+
+    def set_volume(self, volume):
+        self.volumes.append(volume)
+
+    def stop(self):
+        self.playing = False
+
+    def is_playing(self):
+        return self.playing
+
+
+class FakeProcess:
+    def __init__(self, command, **kwargs):
+        self.command = command
+        self.terminated = False
+
+    def poll(self):
+        return 0 if self.terminated else None
+
+    def terminate(self):
+        self.terminated = True
+
+
+def test_preloaded_once():
+    with tempfile.TemporaryDirectory() as tmp:
+        system = os.path.join(tmp, 'alarm.oga')
+        adhan = os.path.join(tmp, 'adhan.mp3')
+        for path in (system, adhan):
+            open(path, 'w').close()
+        saved = audio_service.SYSTEM_SOUNDS
+        audio_service.SYSTEM_SOUNDS = [os.path.join(tmp, 'missing.oga'), system]
+        loaded = []
+        checks = []
+        isfile = os.path.isfile
+        os.path.isfile = lambda path: checks.append(path) or isfile(path)
+        try:
+            service = AudioService({'adhan_file': adhan}, load=lambda path: loaded.append(path) or FakeSound(path))
+            checks_after_load = len(checks)
+            for _ in range(5):
+                assert service.play()
+            # Same settings again (e.g. another config reload): nothing reloaded
+            service.configure({'adhan_file': adhan})
+            assert loaded == [adhan] and service.plays == 5
+            assert len(checks) == checks_after_load + 1  # only configure() checks the file
+
+            # A missing custom file falls back to the installed system sound
+            service.configure({'adhan_file': os.path.join(tmp, 'gone.mp3')})
+            assert loaded == [adhan, system] and service.path == system
+        finally:
+            os.path.isfile = isfile
+            audio_service.SYSTEM_SOUNDS = saved
+
+        audio_service.SYSTEM_SOUNDS = []
+        try:
+            service = AudioService({}, load=FakeSound)
+            assert service.sound is None and not service.play()
+        finally:
+            audio_service.SYSTEM_SOUNDS = saved
+    print("✅ Alert sound resolved and loaded once, custom file preferred")
+
+
+def test_volume_ramp_and_stop():
+    assert ramp_volume(0, 3000, 0.8) == 0.8 * audio_service.RAMP_START
+    assert abs(ramp_volume(1500, 3000, 0.8) - 0.8 * 0.55) < 1e-9
+    assert ramp_volume(3000, 3000, 0.8) == ramp_volume(10, 0, 0.8) == 0.8
+
+    with tempfile.NamedTemporaryFile(suffix='.wav') as f:
+        service = AudioService({'adhan_file': f.name, 'sound_volume': 80}, load=FakeSound)
+        service.ramp_ms = 400
+        service.play()
+        deadline = time.monotonic() + 3
+        while service.ramp_timer.isActive() and time.monotonic() < deadline:
+            app.processEvents()
+            time.sleep(0.01)
+        volumes = service.sound.volumes
+        assert not service.ramp_timer.isActive()
+        assert volumes[0] < volumes[1] and volumes == sorted(volumes) and volumes[-1] == 0.8
+
+        service.play()
+        assert service.ramp_timer.isActive() and service.is_playing()
+        service.stop_all()
+        assert not service.ramp_timer.isActive() and not service.is_playing()
+    print("✅ Sound fades in to the set volume and stop_all silences it")
+
+
+def test_command_fallback():
+    sound = CommandSound('/tmp/adhan.oga', popen=FakeProcess)
+    sound.play(0.5)
+    sound.play(1.0)
+    first, second = sound.processes
+    assert first.command == ['paplay', '--volume=32768', '/tmp/adhan.oga']
+    assert sound.is_playing()
+    sound.stop()
+    assert first.terminated and second.terminated and not sound.is_playing()
+    print("✅ paplay fallback honours the volume and can be stopped")
+
+
+if __name__ == "__main__":
+    test_preloaded_once()
+    test_volume_ramp_and_stop()
+    test_command_fallback()
+    print("\n🎉 All audio service tests passed!")
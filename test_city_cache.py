@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Check the shared city data cache: warm hits, LRU eviction and invalidation
+when the store is written by this or another connection
+"""
+
+import os
+import sys
+import tempfile
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from city_cache import CityDataCache
+from prayer_calc import compute_range
+from prayer_store import PrayerStore
+
+START = date(2026, 10, 1)
+
+
+def make_store(tmp):
+    store = PrayerStore(os.path.join(tmp, 'prayer_times.db'), legacy_folder=None)
+    store.upsert_cities({
+        'Tangier': compute_range(35.76, -5.83, START, 31),
+        'Rabat': compute_range(34.02, -6.84, START, 31),
+        'Fes': compute_range(34.03, -5.00, START, 31),
+    })
+    return store
+
+
+def test_warm_navigation():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = make_store(tmp)
+        cache = CityDataCache(store)
+        week = cache.get_range('Tangier', date(2026, 10, 5), date(2026, 10, 12))
+        assert week == store.get_range('Tangier', date(2026, 10, 5), date(2026, 10, 12))
+        for _ in range(5):
+            cache.get_range('Tangier', date(2026, 10, 12), date(2026, 10, 19))
+        assert (cache.hits, cache.misses) == (5, 1)
+
+        day = cache.get_cities_day(['Tangier', 'Rabat', 'Oujda'], date(2026, 10, 18))
+        assert sorted(day) == ['Rabat', 'Tangier']
+        assert day['Rabat'] == store.get_day('Rabat', date(2026, 10, 18))
+        store.close()
+    print("✅ Warm cities are served from memory")
+
+
+def test_lru_eviction():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = make_store(tmp)
+        cache = CityDataCache(store, max_cities=2)
+        cache.get_city('Tangier')
+        cache.get_city('Rabat')
+        cache.get_city('Tangier')
+        cache.get_city('Fes')
+        assert list(cache.entries) == ['Tangier', 'Fes']
+        store.close()
+    print("✅ Least recently used city is evicted")
+
+
+def test_invalidation_on_writes():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = make_store(tmp)
+        cache = CityDataCache(store)
+        assert cache.get_day('Fes', date(2026, 10, 2))['Fajr'] != '04:00'
+
+        # A write through the same store
+        store.upsert_city('Fes', {'2026-10-02': {'Fajr': '04:00'}})
+        assert cache.get_day('Fes', date(2026, 10, 2))['Fajr'] == '04:00'
+
+        # A write from another connection, as the main app does for the tray
+        other = PrayerStore(store.path, legacy_folder=None)
+        other.upsert_city('Fes', {'2026-10-02': {'Fajr': '04:30'}})
+        assert cache.get_day('Fes', date(2026, 10, 2))['Fajr'] == '04:30'
+        other.close()
+        store.close()
+    print("✅ Writes by any connection invalidate the cache")
+
+
+if __name__ == "__main__":
+    test_warm_navigation()
+    test_lru_eviction()
+    test_invalidation_on_writes()
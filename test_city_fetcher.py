@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Check the city fetcher with a fake session and a fake clock: the token
+bucket's rate limit, the max_workers cap and per-city error collection
+"""
+
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import requests
+
+from city_fetcher import CityFetcher, TokenBucket
+
+
+class FakeClock:
+    """monotonic() that only moves when sleep() is called"""
+
+    def __init__(self):
+        self.now = 100.0
+        self.slept = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+class FakeResponse:
+    def __init__(self, url, status_code=200):
+        self.url = url
+        self.status_code = status_code
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} for {self.url}")
+
+
+class FakeSession:
+    """Records how many requests run at once; some URLs fail"""
+
+    def __init__(self, delay=0.02):
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.active = 0
+        self.max_active = 0
+        self.calls = []
+
+    def get(self, url, headers=None, timeout=None):
+        with self.lock:
+            self.calls.append((url, headers))
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            time.sleep(self.delay)
+            if 'down' in url:
+                raise requests.ConnectionError(f"cannot reach {url}")
+            return FakeResponse(url, 404 if 'missing' in url else 200)
+        finally:
+            with self.lock:
+                self.active -= 1
+
+    def close(self):
+        pass
+
+
+def test_token_bucket_rate():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2, burst=4, clock=clock, sleep=clock.sleep)
+    start = clock.now
+    for _ in range(4):
+        bucket.acquire()
+    assert clock.slept == []  # the burst is free
+    for _ in range(6):
+        bucket.acquire()
+    # Six more tokens at 2 per second
+    assert abs((clock.now - start) - 3.0) < 1e-9
+    assert all(abs(wait - 0.5) < 1e-9 for wait in clock.slept)
+
+    # rate <= 0 means unlimited
+    unlimited = TokenBucket(rate=0, clock=clock, sleep=clock.sleep)
+    for _ in range(100):
+        unlimited.acquire()
+    assert len(clock.slept) == 6
+    print("✅ Token bucket allows the burst, then the configured rate")
+
+
+def test_max_workers_and_errors():
+    fetcher = CityFetcher(max_workers=3, rate_per_second=0)
+    fetcher.session = FakeSession()
+    urls = {f'city{i}': f'https://example.test/{i}' for i in range(12)}
+    urls['Down'] = 'https://example.test/down'
+    urls['Missing'] = ('https://example.test/missing', {'If-None-Match': '"abc"'})
+
+    seen = []
+    caller = threading.current_thread()
+    results = fetcher.fetch_all(urls, on_result=lambda key, result: seen.append(
+        (key, threading.current_thread() is caller)))
+
+    assert fetcher.session.max_active == 3
+    assert set(results) == set(urls)
+    assert isinstance(results['Down'], requests.ConnectionError)
+    assert isinstance(results['Missing'], requests.HTTPError)
+    assert all(isinstance(results[f'city{i}'], FakeResponse) for i in range(12))
+    assert ('https://example.test/missing', {'If-None-Match': '"abc"'}) in fetcher.session.calls
+    # on_result ran once per city, in the caller's thread
+    assert sorted(key for key, _ in seen) == sorted(urls) and all(same for _, same in seen)
+    print("✅ At most max_workers fetches at once, per-city errors collected")
+
+
+def test_on_result_errors_do_not_stop_fetch():
+    fetcher = CityFetcher(max_workers=2, rate_per_second=0)
+    fetcher.session = FakeSession(delay=0)
+
+    def on_result(key, result):
+        if key == 'b':
+            raise ValueError("bad page")
+
+    results = fetcher.fetch_all({'a': 'https://example.test/a', 'b': 'https://example.test/b',
+                                 'c': 'https://example.test/c'}, on_result=on_result)
+    assert sorted(results) == ['a', 'b', 'c']
+    print("✅ A failing result handler does not stop the other cities")
+
+
+if __name__ == "__main__":
+    test_token_bucket_rate()
+    test_max_workers_and_errors()
+    test_on_result_errors_do_not_stop_fetch()
+    print("\n🎉 All city fetcher tests passed!")
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Check the clock monitor with a virtual clock: suspend/resume, wall clock
+steps and time zone changes are told apart, logind's PrepareForSleep
+triggers a check, and a schedule re-armed on resume catches up
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from PyQt5.QtDBus import QDBusConnection, QDBusMessage
+from PyQt5.QtWidgets import QApplication
+
+from clock_monitor import LOGIND_MANAGER, LOGIND_PATH, LOGIND_SERVICE, ClockMonitor
+from day_timeline import DayTimeline
+from prayer_scheduler import PrayerScheduler, plan_day
+from test_prayer_scheduler import DAY, IQAMA, SETTINGS, TIMES, at
+
+app = QApplication.instance() or QApplication([])
+
+
+class VirtualClock:
+    """Monotonic, boot and wall clocks moved by hand"""
+
+    def __init__(self, wall, has_boottime=True):
+        self.mono = 1000.0
+        self.boot = 1000.0
+        self.wall = wall.timestamp()
+        self.offset = 3600
+        self.has_boottime = has_boottime
+
+    def monotonic(self):
+        return self.mono
+
+    def boottime(self):
+        return self.boot if self.has_boottime else self.mono
+
+    def time(self):
+        return self.wall
+
+    def utc_offset(self):
+        return self.offset
+
+    def now(self):
+        return datetime.fromtimestamp(self.wall)
+
+    def advance(self, seconds):
+        self.mono += seconds
+        self.boot += seconds
+        self.wall += seconds
+
+    def suspend(self, seconds):
+        self.boot += seconds
+        self.wall += seconds
+
+
+def test_jumps_told_apart():
+    clock = VirtualClock(at('18:50'))
+    monitor = ClockMonitor(clock=clock)
+    jumps = []
+    monitor.clock_jumped.connect(lambda reason, seconds: jumps.append((reason, round(seconds))))
+
+    clock.advance(60)
+    clock.wall += 0.5  # NTP slewing and timer latency stay below the threshold
+    assert monitor.check() is None
+    clock.advance(30)
+    clock.suspend(3 * 3600)
+    monitor.check()
+    clock.advance(60)
+    clock.wall -= 600  # clock set back ten minutes
+    monitor.check()
+    clock.advance(60)
+    clock.offset = 0  # time zone changed
+    monitor.check()
+    assert jumps == [('resume', 10800), ('clock', -600), ('timezone', -3600)]
+    assert monitor.jumps == 3
+
+    # Without CLOCK_BOOTTIME a suspend still shows as a wall clock jump
+    clock = VirtualClock(at('18:50'), has_boottime=False)
+    monitor = ClockMonitor(clock=clock)
+    clock.suspend(1200)
+    assert monitor.check() == ('clock', 1200)
+    print("✅ Resume, clock steps and time zone changes told apart")
+
+
+def test_prepare_for_sleep():
+    if shutil.which('dbus-daemon') is None:
+        print("⚠️ dbus-daemon not installed, logind test skipped")
+        return
+    daemon = subprocess.Popen(['dbus-daemon', '--session', '--nofork', '--print-address=1'],
+                              stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    address = daemon.stdout.readline().strip()
+    try:
+        logind_bus = QDBusConnection.connectToBus(address, 'fake-logind')
+        assert logind_bus.registerService(LOGIND_SERVICE)
+        clock = VirtualClock(at('18:50'))
+        monitor = ClockMonitor(clock=clock)
+        assert monitor.listen_for_sleep(QDBusConnection.connectToBus(address, 'salah-monitor'))
+        events = []
+        monitor.suspending.connect(lambda: events.append('suspending'))
+        monitor.clock_jumped.connect(lambda reason, seconds: events.append(reason))
+
+        def prepare_for_sleep(start):
+            signal = QDBusMessage.createSignal(LOGIND_PATH, LOGIND_MANAGER, 'PrepareForSleep')
+            signal.setArguments([start])
+            logind_bus.send(signal)
+
+        prepare_for_sleep(True)
+        clock.suspend(1800)
+        prepare_for_sleep(False)
+        deadline = time.monotonic() + 3
+        while len(events) < 2 and time.monotonic() < deadline:
+            app.processEvents()
+            time.sleep(0.005)
+        # Reported on the resume signal, without waiting for the check timer
+        assert events == ['suspending', 'resume']
+    finally:
+        QDBusConnection.disconnectFromBus('fake-logind')
+        QDBusConnection.disconnectFromBus('salah-monitor')
+        daemon.terminate()
+        daemon.wait()
+    print("✅ logind PrepareForSleep triggers an immediate check")
+
+
+def test_resume_rearms_schedule():
+    clock = VirtualClock(at('18:50'))
+    monitor = ClockMonitor(clock=clock)
+    scheduler = PrayerScheduler(clock=clock.now)
+    fired = []
+    scheduler.fired.connect(fired.append)
+    settings = dict(SETTINGS, Maghreb={'enabled': True, 'repeat_count': 3})
+    events = plan_day(DayTimeline(TIMES, IQAMA, day=DAY), DAY, settings, iqama_prayers=set(IQAMA))
+    scheduler.schedule(events)
+    assert scheduler.next_event().prayer == 'Maghreb'
+
+    # Re-arm as the tray does: events already handled are left out
+    def rearm(reason, seconds):
+        handled = {(e.kind, e.prayer, e.count) for e in fired}
+        scheduler.schedule([e for e in events if (e.kind, e.prayer, e.count) not in handled],
+                           catch_up=True)
+        scheduler.run_due()
+
+    monitor.clock_jumped.connect(rearm)
+    # Asleep from 18:50 to 19:08: the 19:05 adhan and 19:07 repeat are
+    # within the grace period and fire at once on resume
+    clock.suspend(18 * 60)
+    monitor.check()
+    assert [(e.kind, e.prayer, e.count) for e in fired] == [('adhan', 'Maghreb', 1), ('repeat', 'Maghreb', 2)]
+    assert scheduler.next_event().when == at('19:09')
+    assert scheduler.timer.remainingTime() <= 60 * 1000 + 1
+    print("✅ Schedule re-armed on resume, recent events caught up")
+
+
+if __name__ == "__main__":
+    test_jumps_told_apart()
+    test_prepare_for_sleep()
+    test_resume_rearms_schedule()
+    print("\n🎉 All clock monitor tests passed!")
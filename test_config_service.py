@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Check the config service: typed defaults, in-memory reads, batched atomic
+writes and pickup of changes made by another process
+"""
+
+import json
+import os
+import sys
+import tempfile
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config_service import ConfigService, DEFAULT_IQAMA
+
+
+def write(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(data, f)
+
+
+def test_typed_defaults():
+    with tempfile.TemporaryDirectory() as tmp:
+        config = ConfigService(tmp)
+        assert config.value('app', 'city') == 'Tangier'
+        assert config.iqama_delays() == DEFAULT_IQAMA
+
+        write(config.path('app'), {'city': 'Fes', 'fetch_concurrency': '4', 'fetch_rate': 'fast'})
+        write(config.path('notifications'), {'sound_enabled': 0, 'Fajr': {'repeat_count': 5}})
+        config.invalidate()
+        app = config.get('app')
+        assert (app['city'], app['language'], app['fetch_concurrency'], app['fetch_rate']) == ('Fes', 'en', 4, 8.0)
+        assert config.value('notifications', 'sound_enabled') is True
+        assert config.prayer_notification('Fajr') == {'enabled': True, 'repeat_count': 5}
+        assert config.prayer_notification('Chorok') == {'enabled': True, 'repeat_count': 3}
+    print("✅ Missing and mistyped values fall back to typed defaults")
+
+
+def test_reads_are_served_from_memory():
+    with tempfile.TemporaryDirectory() as tmp:
+        config = ConfigService(tmp)
+        config.ensure_defaults('iqama', 'notifications')
+        config.notification_settings()
+        with mock.patch('builtins.open', side_effect=AssertionError("file read")), \
+                mock.patch('os.stat', side_effect=AssertionError("file stat")):
+            for _ in range(100):
+                config.notification_settings()
+                config.prayer_notification('Isha')
+                config.iqama_delay('Maghreb')
+    print("✅ The notification path does no file I/O")
+
+
+def test_batched_writes_keep_other_keys():
+    with tempfile.TemporaryDirectory() as tmp:
+        config = ConfigService(tmp)
+        write(config.path('app'), {'city': 'Tangier', 'language': 'en', 'cache_format': 'binary'})
+        with mock.patch('config_service.write_json', wraps=__import__('atomic_file').write_json) as writer:
+            with config.batch():
+                config.update('app', {'city': 'Rabat'})
+                config.update('app', {'language': 'fr'})
+                config.replace('iqama', {'Fajr': 25})
+            assert writer.call_count == 2
+        with open(config.path('app')) as f:
+            assert json.load(f) == {'city': 'Rabat', 'language': 'fr', 'cache_format': 'binary'}
+        assert config.iqama_delay('Fajr') == 25 and config.iqama_delay('Dohr') == 15
+
+        # A failing batch writes nothing
+        try:
+            with config.batch():
+                config.update('app', {'city': 'Fes'})
+                raise RuntimeError()
+        except RuntimeError:
+            pass
+        assert config.value('app', 'city') == 'Rabat'
+    print("✅ Batches write each file once and keep unknown keys")
+
+
+def test_reload_changed():
+    with tempfile.TemporaryDirectory() as tmp:
+        config = ConfigService(tmp)
+        config.update('app', {'city': 'Tangier'})
+        config.iqama_delays()
+        assert config.reload_changed() == set()
+
+        other = ConfigService(tmp)
+        other.update('app', {'city': 'Oujda'})
+        assert config.reload_changed() == {'app'}
+        assert config.value('app', 'city') == 'Oujda'
+    print("✅ Changes from another process are picked up")
+
+
+if __name__ == "__main__":
+    test_typed_defaults()
+    test_reads_are_served_from_memory()
+    test_batched_writes_keep_other_keys()
+    test_reload_changed()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Check next/current prayer and Iqama lookups on the precomputed day timeline
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from day_timeline import DayTimeline, format_hhmm, format_hms, parse_hhmm
+
+TIMES = {'Date': '18/10', 'Fajr': '06:12', 'Chorok': '07:37', 'Dohr': '13:26',
+         'Asr': '16:43', 'Maghreb': '19:11', 'Isha': '20:28'}
+IQAMA = {'Fajr': 20, 'Dohr': 15, 'Asr': 15, 'Maghreb': 10, 'Isha': 15}
+
+
+def at(hhmm, seconds=0):
+    return parse_hhmm(hhmm) * 60 + seconds
+
+
+def test_current_and_next():
+    timeline = DayTimeline(TIMES, IQAMA)
+    assert timeline.names == ('Fajr', 'Chorok', 'Dohr', 'Asr', 'Maghreb', 'Isha')
+
+    assert timeline.current(at('05:00')) is None
+    assert timeline.current(at('06:12')) == 'Fajr'
+    assert timeline.current(at('14:00')) == 'Dohr'
+    assert timeline.current(at('23:59')) == 'Isha'
+
+    assert timeline.next(at('13:25', 30)) == ('Dohr', 30, False)
+    assert timeline.next(at('13:26')) == ('Asr', at('16:43') - at('13:26'), False)
+    name, remaining, tomorrow = timeline.next(at('21:00'))
+    assert (name, tomorrow) == ('Fajr', True)
+    assert remaining == 24 * 3600 - at('21:00') + at('06:12')
+    print("✅ Current and next prayer")
+
+
+def test_iqama():
+    timeline = DayTimeline(TIMES, IQAMA)
+    assert format_hhmm(timeline.iqama_time('Fajr')) == '06:32'
+    # Prayers missing from the config fall back to the default delay
+    assert format_hhmm(timeline.iqama_time('Chorok')) == '07:52'
+
+    assert timeline.in_iqama_window('Maghreb', at('19:15'))
+    assert not timeline.in_iqama_window('Maghreb', at('19:21'))
+    assert not timeline.in_iqama_window('Unknown', at('19:15'))
+    assert format_hms(timeline.seconds_until_iqama('Maghreb', at('19:15', 5))) == '00:05:55'
+
+    assert timeline.next_event(at('19:11')) == (at('19:21'), 'iqama', 'Maghreb')
+    assert timeline.next_event(at('23:00')) is None
+    assert [e[2] for e in timeline.events_between(at('06:00'), at('07:40'))] == ['Fajr', 'Fajr', 'Chorok']
+    print("✅ Iqama windows and events")
+
+
+def test_bad_input():
+    timeline = DayTimeline({'Date': '18/10', 'Fajr': '--:--'})
+    assert not timeline
+    assert timeline.next(0) == (None, 0, False)
+    assert timeline.current(0) is None
+    assert timeline.text('Fajr') == '--:--'
+    # A prayer that is exactly now counts down to tomorrow's
+    assert DayTimeline(TIMES).seconds_until('Dohr', at('13:26')) == 24 * 3600
+    print("✅ Unparseable times are skipped")
+
+
+if __name__ == "__main__":
+    test_current_and_next()
+    test_iqama()
+    test_bad_input()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Check the debounced file watcher: atomic rename replacements are noticed,
+bursts produce one signal, and files created later are picked up
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from PyQt5.QtWidgets import QApplication
+
+from atomic_file import atomic_write, write_json
+from file_watch import DebouncedWatcher
+
+app = QApplication.instance() or QApplication([])
+
+
+def wait_for(batches, count=1, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while len(batches) < count and time.monotonic() < deadline:
+        app.processEvents()
+        time.sleep(0.01)
+    # Give a stray second signal the chance to show up
+    settle = time.monotonic() + 0.3
+    while time.monotonic() < settle:
+        app.processEvents()
+        time.sleep(0.01)
+
+
+def make_watcher(delay_ms=100):
+    watcher = DebouncedWatcher(delay_ms)
+    batches = []
+    watcher.changed.connect(batches.append)
+    return watcher, batches
+
+
+def test_atomic_replace():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'app_config.json')
+        write_json(path, {'city': 'Tangier'})
+        watcher, batches = make_watcher()
+        watcher.add_file(path)
+
+        write_json(path, {'city': 'Rabat'})
+        wait_for(batches)
+        assert len(batches) == 1, batches
+        assert path in batches[0] or tmp in batches[0]
+
+        # The watch must survive the rename for the next replacement
+        assert path in watcher.watcher.files()
+        write_json(path, {'city': 'Fes'})
+        wait_for(batches, 2)
+        assert len(batches) == 2
+    print("✅ Atomic replacements detected repeatedly")
+
+
+def test_burst_debounced():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'prayer_times.db')
+        atomic_write(path, b'0')
+        watcher, batches = make_watcher()
+        watcher.add_file(path)
+
+        for i in range(20):
+            with open(path, 'ab') as f:
+                f.write(b'x')
+        wait_for(batches)
+        assert len(batches) == 1, batches
+        assert path in batches[0]
+    print("✅ Burst of writes coalesced into one change")
+
+
+def test_file_created_later():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'tangier.bin')
+        watcher, batches = make_watcher()
+        watcher.add_file(path)
+        assert path not in watcher.watcher.files()
+
+        atomic_write(path, b'data')
+        wait_for(batches)
+        assert len(batches) == 1
+        assert path in watcher.watcher.files()
+    print("✅ Missing file watched once it is created")
+
+
+if __name__ == "__main__":
+    test_atomic_replace()
+    test_burst_debounced()
+    test_file_created_later()
+    print("\n🎉 All file watcher tests passed!")
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Check the notification dispatcher against a stand-in notification daemon
+on a private D-Bus session bus, and the command queue fallback
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from PyQt5.QtCore import QMetaType, QObject, Q_CLASSINFO, pyqtSlot
+from PyQt5.QtDBus import QDBusArgument, QDBusConnection, QDBusMessage
+from PyQt5.QtWidgets import QApplication
+
+from notifier import INTERFACE, PATH, SERVICE, CommandQueue, NotificationDispatcher
+
+app = QApplication.instance() or QApplication([])
+
+
+class FakeNotifications(QObject):
+    """Minimal org.freedesktop.Notifications server"""
+
+    Q_CLASSINFO("D-Bus Interface", "org.freedesktop.Notifications")
+
+    def __init__(self):
+        super().__init__()
+        self.calls = []
+        self.next_id = 0
+
+    @pyqtSlot(QDBusMessage, result='uint')
+    def Notify(self, message):
+        assert message.signature() == 'susssasa{sv}i', message.signature()
+        self.calls.append(message.arguments())
+        replaces_id = message.arguments()[1]
+        if replaces_id:
+            return replaces_id
+        self.next_id += 1
+        return self.next_id
+
+
+def start_bus():
+    daemon = subprocess.Popen(['dbus-daemon', '--session', '--nofork', '--print-address=1'],
+                              stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    return daemon, daemon.stdout.readline().strip()
+
+
+def process_until(condition, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        app.processEvents()
+        time.sleep(0.005)
+    return condition()
+
+
+def test_dbus_notifications():
+    if shutil.which('dbus-daemon') is None:
+        print("⚠️ dbus-daemon not installed, D-Bus test skipped")
+        return
+    daemon, address = start_bus()
+    try:
+        server_bus = QDBusConnection.connectToBus(address, 'fake-notifications')
+        server = FakeNotifications()
+        assert server_bus.registerService(SERVICE)
+        assert server_bus.registerObject(PATH, server, QDBusConnection.ExportAllSlots)
+
+        client_bus = QDBusConnection.connectToBus(address, 'salah-client')
+        dispatcher = NotificationDispatcher(bus=client_bus)
+        dispatcher.notify("🕌 Fajr Prayer Time", "It's time", tag='Fajr', urgency='critical',
+                          expire_ms=0, actions=[('stop', 'Stop All')])
+        # notify() returns before the daemon has answered
+        assert server.calls == [] and len(dispatcher.pending) == 1
+        assert process_until(lambda: 'Fajr' in dispatcher.ids)
+        app_name, replaces_id, icon, summary, body, actions, hints, expire = server.calls[0]
+        assert (summary, replaces_id, actions, expire) == ("🕌 Fajr Prayer Time", 0, ['stop', 'Stop All'], 0)
+        assert hints['urgency'] == b'\x02'
+
+        # A repeat for the same tag replaces the first notification
+        dispatcher.notify("🕌 Fajr Prayer Time (2/3)", tag='Fajr')
+        assert process_until(lambda: len(server.calls) == 2 and not dispatcher.pending)
+        assert server.calls[1][1] == dispatcher.ids['Fajr'] == 1
+
+        # Clicking an action on the daemon side comes back as action_invoked
+        invoked = []
+        dispatcher.action_invoked.connect(lambda tag, action: invoked.append((tag, action)))
+        signal = QDBusMessage.createSignal(PATH, INTERFACE, 'ActionInvoked')
+        signal.setArguments([QDBusArgument(1, QMetaType.UInt), 'stop'])
+        server_bus.send(signal)
+        assert process_until(lambda: invoked)
+        assert invoked == [('Fajr', 'stop')]
+        assert len(dispatcher.reply_ms) == 2 and dispatcher.fallbacks == 0
+        print(f"   {dispatcher.latency_summary()}")
+    finally:
+        QDBusConnection.disconnectFromBus('fake-notifications')
+        QDBusConnection.disconnectFromBus('salah-client')
+        daemon.terminate()
+        daemon.wait()
+    print("✅ Notifications sent over D-Bus without blocking, actions reported")
+
+
+def test_command_queue_fallback():
+    with tempfile.TemporaryDirectory() as tmp:
+        out = os.path.join(tmp, 'out.txt')
+        commands = CommandQueue(max_pending=2)
+        start = time.perf_counter()
+        assert commands.submit(['no-such-program-xyz'], ['sh', '-c', f'sleep 0.2; echo first >> {out}'])
+        assert commands.submit(['sh', '-c', f'echo second >> {out}'])
+        # Returns immediately even though the first job takes 200 ms
+        assert time.perf_counter() - start < 0.1
+        # Bounded: with the worker busy and two jobs queued, extra jobs are dropped
+        accepted = [commands.submit(['true']) for _ in range(3)]
+        assert accepted.count(False) >= 1 and commands.dropped >= 1
+        commands.wait()
+        with open(out) as f:
+            assert f.read().split() == ['first', 'second']
+    print("✅ Command queue runs jobs in order off the caller's thread, bounded")
+
+
+if __name__ == "__main__":
+    test_dbus_notifications()
+    test_command_queue_fallback()
+    print("\n🎉 All notifier tests passed!")
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Check that the alarm window can be built ahead of time, shown instantly,
+and shown again after a snooze without creating another dialog
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from PyQt5.QtWidgets import QApplication
+
+from prayer_alarm import PrayerAlarmDialog
+
+app = QApplication.instance() or QApplication([])
+
+
+def alarm_dialogs():
+    return [w for w in app.topLevelWidgets() if isinstance(w, PrayerAlarmDialog)]
+
+
+def process_until(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        app.processEvents()
+        time.sleep(0.005)
+    return condition()
+
+
+def test_prewarmed_present():
+    start = time.perf_counter()
+    cold = PrayerAlarmDialog('Fajr', '05:30')
+    cold.show()
+    app.processEvents()
+    cold_ms = (time.perf_counter() - start) * 1000
+    cold.stop_timers()
+    cold.hide()
+
+    alarm = PrayerAlarmDialog('Fajr', '05:30', show_now=False)
+    assert not alarm.isVisible() and not alarm.flash_timer.isActive()
+    alarm.prepare('Asr', '15:42')
+    assert alarm.prayer_label.text() == "🕌 Asr Prayer Time" and alarm.time_label.text() == '15:42'
+
+    start = time.perf_counter()
+    alarm.present(play_sound=False)
+    app.processEvents()
+    warm_ms = (time.perf_counter() - start) * 1000
+    assert alarm.isVisible() and alarm.flash_timer.isActive() and alarm.auto_close_timer.isActive()
+    alarm.stop_alarm()
+    assert not alarm.isVisible() and not alarm.flash_timer.isActive()
+    print(f"   cold build+show {cold_ms:.1f} ms, pre-warmed present {warm_ms:.1f} ms")
+    print("✅ Pre-built alarm window is prepared hidden and shown on demand")
+
+
+def test_snooze_reuses_dialog():
+    alarm = PrayerAlarmDialog('Isha', '20:45', show_now=False)
+    alarm.prepare('Isha', '20:45')
+    alarm.present(play_sound=False)
+    dialogs = len(alarm_dialogs())
+    stopped = []
+    alarm.stopped.connect(lambda: stopped.append(True))
+
+    alarm.snooze_alarm()
+    assert not alarm.isVisible() and alarm.snooze_timer.isActive()
+    alarm.snooze_timer.start(10)
+    assert process_until(alarm.isVisible)
+    assert alarm.snoozed and "(Snoozed)" in alarm.windowTitle()
+    assert len(alarm_dialogs()) == dialogs  # the same instance came back
+
+    # Preparing for the next prayer clears the snooze state
+    alarm.snooze_alarm()
+    alarm.prepare('Fajr', '05:30')
+    assert not alarm.snooze_timer.isActive() and not alarm.snoozed
+    assert "(Snoozed)" not in alarm.windowTitle()
+
+    alarm.present(play_sound=False)
+    alarm.stop_alarm()
+    assert stopped == [True] and not alarm.snooze_timer.isActive()
+    print("✅ Snooze shows the same dialog again instead of a nested one")
+
+
+if __name__ == "__main__":
+    test_prewarmed_present()
+    test_snooze_reuses_dialog()
+    print("\n🎉 All prayer alarm tests passed!")
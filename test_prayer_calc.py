@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Check the offline prayer time engine against reference solar events
+"""
+
+import math
+import os
+import sys
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import prayer_calc
+from prayer_calc import (HABOUS, PRAYERS, compute_hours, compute_minutes,
+                         compute_prayer_times, compute_range, compute_table,
+                         compare_with_cache, julian_day, sun_position)
+
+from prayer_table_parser import parse_prayer_table
+
+NO_OFFSETS = dict(HABOUS, offsets={})
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'yabiladi_city_101.html')
+
+# Most minutes the engine may differ from the scraped Tangier table for
+# March. The table keeps Dohr at 13:30 and moves the other times by a
+# minute a day, and its Maghreb/Isha sit about 20 minutes before the sun's.
+DRIFT_TOLERANCE = {'Fajr': 10, 'Sunrise': 15, 'Dohr': 12, 'Asr': 15, 'Maghreb': 25, 'Isha': 25}
+
+# Solar events (UTC+1) from an independent almanac: dawn at 19°, sunrise,
+# solar noon, sunset, dusk at 17°
+REFERENCE = [
+    ('Casablanca', 33.5731, -7.5898, date(2025, 6, 21), ['04:29:54', '06:20:57', '13:32:07', '20:43:30', '22:20:46']),
+    ('Tangier', 35.7595, -5.8340, date(2025, 12, 21), ['06:52:34', '08:29:45', '13:21:17', '18:13:19', '19:40:14']),
+    ('Dakhla', 23.6848, -15.9570, date(2025, 3, 20), ['06:47:59', '08:07:51', '14:11:20', '20:14:50', '21:25:59']),
+]
+
+
+def to_minutes(text):
+    h, m, s = map(int, text.split(':'))
+    return h * 60 + m + s / 60.0
+
+
+def test_solar_events():
+    for city, lat, lon, day, expected in REFERENCE:
+        hours = compute_hours(lat, lon, day, method=NO_OFFSETS)
+        computed = [hours[p] * 60 for p in ['Fajr', 'Sunrise', 'Dohr', 'Maghreb', 'Isha']]
+        for value, reference in zip(computed, expected):
+            assert abs(value - to_minutes(reference)) < 1.0, f"{city} {day}: {value:.1f} vs {reference}"
+        print(f"✅ {city} {day} within a minute of the reference")
+
+
+def test_asr_shadow():
+    # At Asr the shadow equals the object's length plus its noon shadow
+    lat, lon, day = 34.0209, -6.8416, date(2025, 9, 1)
+    hours = compute_hours(lat, lon, day, method=NO_OFFSETS)
+    jd = julian_day(day.year, day.month, day.day) + (hours['Asr'] - 1) / 24.0
+    decl, eqt = sun_position(jd)
+    hour_angle = (hours['Asr'] - 1 + lon / 15.0 - (12 - eqt)) * 15 * math.pi / 180
+    lat_r, decl_r = math.radians(lat), math.radians(decl)
+    altitude = math.asin(math.sin(lat_r) * math.sin(decl_r) +
+                         math.cos(lat_r) * math.cos(decl_r) * math.cos(hour_angle))
+    shadow = 1 / math.tan(altitude)
+    assert abs(shadow - (1 + math.tan(abs(lat_r - decl_r)))) < 0.01
+    print("✅ Asr matches the Shafi'i shadow length")
+
+
+def test_habous_offsets_and_format():
+    lat, lon, day = 33.5731, -7.5898, date(2025, 6, 21)
+    plain = compute_minutes(lat, lon, day, method=NO_OFFSETS)
+    habous = compute_minutes(lat, lon, day)
+    assert habous[PRAYERS.index('Dohr')] - plain[PRAYERS.index('Dohr')] == 5
+    assert habous[PRAYERS.index('Maghreb')] - plain[PRAYERS.index('Maghreb')] == 5
+
+    times = compute_prayer_times(lat, lon, day)
+    assert times['Date'] == '21/06'
+    assert list(times) == ['Date'] + PRAYERS
+    assert all(len(times[p]) == 5 and times[p][2] == ':' for p in PRAYERS)
+    assert times['Fajr'] < times['Sunrise'] < times['Dohr'] < times['Asr'] < times['Maghreb'] < times['Isha']
+    print(f"✅ Habous times: {times}")
+
+
+def test_year_speed():
+    start = time.perf_counter()
+    year = compute_range(34.0209, -6.8416, date(2025, 1, 1), 365)
+    elapsed = (time.perf_counter() - start) * 1000
+    assert len(year) == 365
+    print(f"✅ One year for Rabat computed in {elapsed:.1f} ms")
+
+
+def test_drift_against_scraped_table():
+    with open(FIXTURE, 'r', encoding='utf-8') as f:
+        scraped = parse_prayer_table(f.read())
+    report = compare_with_cache(35.7595, -5.8340, scraped, 2025)
+    assert set(report) == set(PRAYERS)
+    for prayer, r in report.items():
+        assert r['days'] == 31, f"{prayer}: compared {r['days']} days"
+        assert r['max'] <= DRIFT_TOLERANCE[prayer], f"{prayer} drifts {r['max']} min"
+        print(f"✅ {prayer}: mean {r['mean']:.1f} min, max {r['max']} min "
+              f"(tolerance {DRIFT_TOLERANCE[prayer]})")
+
+
+def test_batch_table_matches_scalar():
+    coordinates = [(35.7595, -5.8340), (33.5731, -7.5898), (20.9331, -17.0439)]
+    start = date(2025, 12, 20)
+    table = compute_table(coordinates, start, 20)
+    for c, (lat, lon) in enumerate(coordinates):
+        for d in range(20):
+            day = date.fromordinal(start.toordinal() + d)
+            assert list(table[c][d]) == compute_minutes(lat, lon, day), f"{lat},{lon} {day}"
+    if prayer_calc.np is not None:
+        assert table.shape == (3, 20, 6) and table.dtype == prayer_calc.np.int16
+    print("✅ Batch table matches the scalar engine")
+
+
+if __name__ == "__main__":
+    test_solar_events()
+    test_asr_shadow()
+    test_habous_offsets_and_format()
+    test_year_speed()
+    test_drift_against_scraped_table()
+    test_batch_table_matches_scalar()
+    print("\n🎉 Prayer engine tests passed")
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Check the prayer grid pushes only changed text and states to its labels
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from PyQt5.QtWidgets import QApplication
+
+from prayer_grid import GRID_PRAYERS, PrayerGrid
+
+app = QApplication.instance() or QApplication([])
+
+TIMES = {'Date': '18/10', 'Fajr': '06:10', 'Chorok': '07:35', 'Dohr': '13:20',
+         'Asr': '16:35', 'Maghreb': '19:05', 'Isha': '20:25'}
+
+
+def test_only_changes_pushed():
+    grid = PrayerGrid(lambda prayer: prayer.upper())
+    assert list(grid.cards) == GRID_PRAYERS
+    assert grid.cards['Fajr'].name_label.text() == 'FAJR'
+
+    grid.show_times(TIMES, current='Dohr')
+    assert grid.cards['Isha'].time_label.text() == '20:25'
+    assert grid.cards['Dohr'].widget.property('current') is True
+    first = grid.pushes()
+    assert first == len(GRID_PRAYERS) + 1  # six times, one current card
+
+    # Same refresh again: nothing to push
+    grid.show_times(TIMES, current='Dohr')
+    assert grid.pushes() == first
+
+    # The current prayer moves on: two cards restyled, no text touched
+    grid.show_times(TIMES, current='Asr')
+    assert grid.pushes() == first + 2
+    assert grid.cards['Dohr'].widget.property('current') is False
+    print("✅ Refreshes only push changed labels and states")
+
+
+def test_placeholder_and_error():
+    grid = PrayerGrid(str)
+    grid.show_placeholder("Error", error=True)
+    card = grid.cards['Asr']
+    assert card.time_label.text() == 'Error' and card.time_label.property('error') is True
+    grid.show_times(TIMES)
+    assert card.time_label.text() == '16:35' and card.time_label.property('error') is False
+    print("✅ Loading/error placeholders and recovery")
+
+
+if __name__ == "__main__":
+    test_only_changes_pushed()
+    test_placeholder_and_error()
+    print("\n🎉 All prayer grid tests passed!")
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Check the notification scheduler: the day plan, one timer armed for the
+next event, re-arming after each firing, cancellation and late events
+"""
+
+import os
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from PyQt5.QtWidgets import QApplication
+
+from day_timeline import DayTimeline
+from prayer_scheduler import Event, PrayerScheduler, plan_day
+
+app = QApplication.instance() or QApplication([])
+
+DAY = date(2026, 10, 18)
+TIMES = {'Date': '18/10', 'Fajr': '06:10', 'Sunrise': '07:35', 'Dohr': '13:20',
+         'Asr': '16:35', 'Maghreb': '19:05', 'Isha': '20:25'}
+IQAMA = {'Fajr': 20, 'Dohr': 15, 'Asr': 15, 'Maghreb': 10, 'Isha': 15}
+SETTINGS = {'notification_interval': 2, 'pre_alert_minutes': 0,
+            'Fajr': {'enabled': True, 'repeat_count': 3},
+            'Dohr': {'enabled': False, 'repeat_count': 3},
+            'Asr': {'enabled': True, 'repeat_count': 1}}
+
+
+class Clock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def at(hhmm, seconds=0):
+    hours, minutes = map(int, hhmm.split(':'))
+    return datetime(DAY.year, DAY.month, DAY.day, hours, minutes, seconds)
+
+
+def test_plan_day():
+    timeline = DayTimeline(TIMES, IQAMA, day=DAY)
+    events = plan_day(timeline, DAY, SETTINGS, iqama_prayers=set(IQAMA))
+    fajr = [(e.when, e.kind, e.count) for e in events if e.prayer == 'Fajr']
+    assert fajr == [(at('06:10'), 'adhan', 1), (at('06:12'), 'repeat', 2),
+                    (at('06:14'), 'repeat', 3), (at('06:30'), 'iqama', 0)]
+    # Disabled prayer keeps its iqama, Sunrise gets no iqama
+    assert [e.kind for e in events if e.prayer == 'Dohr'] == ['iqama']
+    assert [e.kind for e in events if e.prayer == 'Sunrise'] == ['adhan', 'repeat', 'repeat']
+    assert [e.kind for e in events if e.prayer == 'Asr'] == ['adhan', 'iqama']
+    assert events == sorted(events)
+
+    with_alert = plan_day(timeline, DAY, dict(SETTINGS, pre_alert_minutes=10), iqama_prayers=set(IQAMA))
+    assert Event(at('06:00'), 'pre_alert', 'Fajr', 0) in with_alert
+    with_alarm = plan_day(timeline, DAY, dict(SETTINGS, alarm_dialog=True), iqama_prayers=set(IQAMA))
+    assert Event(at('06:09'), 'warmup', 'Fajr', 0) in with_alarm
+    assert not any(e.kind == 'warmup' for e in events)
+    print("✅ Day plan covers pre-alert, alarm warm-up, adhan, repeats and iqama")
+
+
+def test_single_timer_rearms():
+    clock = Clock(at('06:09', 59))
+    scheduler = PrayerScheduler(clock=clock)
+    fired = []
+    scheduler.fired.connect(fired.append)
+    timeline = DayTimeline(TIMES, IQAMA, day=DAY)
+    scheduler.schedule(plan_day(timeline, DAY, SETTINGS, iqama_prayers=set(IQAMA)))
+
+    assert scheduler.timer.isActive() and scheduler.timer.isSingleShot()
+    assert 900 <= scheduler.timer.remainingTime() <= 1001
+    assert scheduler.next_event() == Event(at('06:10'), 'adhan', 'Fajr', 1)
+
+    # Run the due events by hand as the clock advances
+    clock.now = at('06:10')
+    scheduler.run_due()
+    clock.now = at('06:12', 30)
+    scheduler.run_due()
+    assert [(e.kind, e.count) for e in fired] == [('adhan', 1), ('repeat', 2)]
+    assert scheduler.next_event().when == at('06:14')
+    assert 89900 <= scheduler.timer.remainingTime() <= 90001
+    print("✅ One timer re-armed for the next event after each firing")
+
+
+def test_cancel_and_upcoming():
+    clock = Clock(at('06:11'))
+    scheduler = PrayerScheduler(clock=clock)
+    timeline = DayTimeline(TIMES, IQAMA, day=DAY)
+    scheduler.schedule(plan_day(timeline, DAY, SETTINGS, iqama_prayers=set(IQAMA)))
+    # Past events are not queued
+    assert all(e.when > clock.now for e in scheduler.upcoming())
+
+    scheduler.cancel('Fajr', kinds=('repeat',))
+    upcoming = scheduler.upcoming(3)
+    assert [(e.kind, e.prayer) for e in upcoming] == [('iqama', 'Fajr'), ('adhan', 'Sunrise'), ('repeat', 'Sunrise')]
+    scheduler.clear()
+    assert not scheduler.timer.isActive() and scheduler.upcoming() == []
+    print("✅ Cancellation and queue inspection")
+
+
+def test_late_events_skipped():
+    clock = Clock(at('06:00'))
+    scheduler = PrayerScheduler(clock=clock)
+    fired = []
+    scheduler.fired.connect(fired.append)
+    scheduler.schedule([Event(at('06:10'), 'adhan', 'Fajr', 1), Event(at('06:30'), 'iqama', 'Fajr', 0)])
+    # Event loop stalled (or machine asleep) well past the adhan
+    clock.now = at('06:31')
+    scheduler.run_due()
+    assert [e.kind for e in fired] == ['iqama']
+    print("✅ Events past the grace period are dropped")
+
+
+def test_fires_from_event_loop():
+    scheduler = PrayerScheduler()
+    fired = []
+    scheduler.fired.connect(fired.append)
+    now = datetime.now()
+    scheduler.schedule([Event(now + timedelta(milliseconds=50), 'adhan', 'Asr', 1),
+                        Event(now + timedelta(milliseconds=120), 'repeat', 'Asr', 2)])
+    deadline = time.monotonic() + 2
+    while len(fired) < 2 and time.monotonic() < deadline:
+        app.processEvents()
+        time.sleep(0.005)
+    assert [e.kind for e in fired] == ['adhan', 'repeat']
+    assert not scheduler.timer.isActive()
+    print("✅ Events fire from the Qt event loop in order")
+
+
+if __name__ == "__main__":
+    test_plan_day()
+    test_single_timer_rearms()
+    test_cancel_and_upcoming()
+    test_late_events_skipped()
+    test_fires_from_event_loop()
+    print("\n🎉 All scheduler tests passed!")
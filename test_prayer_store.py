@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Check the SQLite prayer time store: upserts, day and range lookups, and the
+one-time import of the old per-city JSON cache
+"""
+
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from prayer_calc import compute_range
+from prayer_store import PrayerStore, resolve_date
+from prayer_table_parser import parse_prayer_table
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'yabiladi_city_101.html')
+
+
+def load_scraped():
+    with open(FIXTURE, 'r', encoding='utf-8') as f:
+        return parse_prayer_table(f.read())
+
+
+def test_resolve_date():
+    assert resolve_date('05/01', date(2025, 12, 28)) == date(2026, 1, 5)
+    assert resolve_date('28/12', date(2026, 1, 3)) == date(2025, 12, 28)
+    assert resolve_date('15/03', date(2026, 3, 1)) == date(2026, 3, 15)
+    assert resolve_date('29/02', date(2028, 2, 20)) == date(2028, 2, 29)
+    assert resolve_date('2026-10-18') == date(2026, 10, 18)
+    print("✅ dd/mm keys resolve to the nearest year")
+
+
+def test_upsert_and_lookup():
+    scraped = load_scraped()
+    with tempfile.TemporaryDirectory() as tmp:
+        store = PrayerStore(os.path.join(tmp, 'prayer_times.db'), legacy_folder=None)
+        assert store.upsert_city('Tangier', scraped, reference=date(2026, 3, 1)) == len(scraped)
+
+        assert store.get_day('Tangier', date(2026, 3, 2)) == scraped['02/03']
+        assert store.get_day('Tangier', date(2026, 4, 2)) is None
+        assert store.get_day('Rabat', date(2026, 3, 2)) is None
+
+        week = store.get_range('Tangier', date(2026, 3, 9), date(2026, 3, 16))
+        assert list(week) == [date(2026, 3, d) for d in range(9, 16)]
+        assert store.last_date('Tangier') == date(2026, 3, 31)
+        assert store.has_city('Tangier') and not store.has_city('Rabat')
+
+        # A refresh replaces rows instead of duplicating them
+        changed = dict(scraped)
+        changed['02/03'] = dict(scraped['02/03'], Fajr='06:00')
+        store.upsert_city('Tangier', changed, reference=date(2026, 3, 1))
+        assert store.get_day('Tangier', date(2026, 3, 2))['Fajr'] == '06:00'
+        assert len(store.get_range('Tangier', date(2026, 1, 1), date(2027, 1, 1))) == len(scraped)
+
+        store.upsert_cities({'Rabat': scraped, 'Fes': {}}, reference=date(2026, 3, 1))
+        both = store.get_cities_day(['Tangier', 'Rabat', 'Fes'], date(2026, 3, 2))
+        assert sorted(both) == ['Rabat', 'Tangier']
+        assert store.date_range('Fes') == (None, None)
+        store.close()
+    print("✅ Upserts, day and range lookups")
+
+
+def test_json_import():
+    scraped = load_scraped()
+    with tempfile.TemporaryDirectory() as tmp:
+        cities = os.path.join(tmp, 'cities')
+        os.makedirs(cities)
+        with open(os.path.join(cities, 'tangier.json'), 'w', encoding='utf-8') as f:
+            json.dump({'city': 'Tangier', 'last_updated': '2026-03-01T08:00:00', 'prayer_times': scraped}, f)
+        with open(os.path.join(cities, 'validators.json'), 'w') as f:
+            json.dump({}, f)
+
+        db_path = os.path.join(tmp, 'prayer_times.db')
+        store = PrayerStore(db_path, legacy_folder=cities)
+        assert store.get_day('Tangier', date(2026, 3, 31)) == scraped['31/03']
+        assert store.last_updated('Tangier') == '2026-03-01T08:00:00'
+        store.close()
+
+        # The import only runs on the first open of a database
+        os.remove(os.path.join(cities, 'tangier.json'))
+        with open(os.path.join(cities, 'rabat.json'), 'w', encoding='utf-8') as f:
+            json.dump({'city': 'Rabat', 'last_updated': '2026-03-01T08:00:00', 'prayer_times': scraped}, f)
+        store = PrayerStore(db_path, legacy_folder=cities)
+        assert store.has_city('Tangier') and not store.has_city('Rabat')
+        store.close()
+    print("✅ Old JSON cache imported once")
+
+
+def test_new_year_range():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = PrayerStore(os.path.join(tmp, 'prayer_times.db'), legacy_folder=None)
+        # Last December and this December no longer share keys
+        store.upsert_city('Rabat', compute_range(34.02, -6.84, date(2025, 12, 1), 31))
+        store.upsert_city('Rabat', compute_range(34.02, -6.84, date(2026, 12, 20), 21))
+        assert store.get_day('Rabat', date(2025, 12, 25)) != store.get_day('Rabat', date(2026, 12, 25))
+
+        assert store.date_range('Rabat') == (date(2025, 12, 1), date(2027, 1, 9))
+        assert store.days_remaining('Rabat', date(2026, 12, 30)) == 11
+        assert store.days_remaining('Rabat', date(2027, 2, 1)) == 0
+        assert store.days_remaining('Fes') == 0
+
+        week = store.get_range('Rabat', date(2026, 12, 28), date(2027, 1, 4))
+        assert [d.day for d in week] == [28, 29, 30, 31, 1, 2, 3]
+        store.close()
+    print("✅ Ranges and days remaining across New Year")
+
+
+def test_migration_from_v1():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'prayer_times.db')
+        conn = sqlite3.connect(db_path)
+        conn.executescript(
+            "CREATE TABLE prayer_times (city TEXT NOT NULL, date TEXT NOT NULL, fajr TEXT, sunrise TEXT, "
+            "dohr TEXT, asr TEXT, maghreb TEXT, isha TEXT, PRIMARY KEY (city, date)) WITHOUT ROWID;"
+            "CREATE TABLE cities (city TEXT PRIMARY KEY, last_updated TEXT);"
+            "INSERT INTO prayer_times (city, date, fajr) VALUES ('Fes', '2026-03-01', '06:10'), ('Fes', '2026-03-31', '05:30');"
+            "INSERT INTO cities VALUES ('Fes', '2026-03-01T08:00:00');"
+            "PRAGMA user_version=1;")
+        conn.close()
+
+        store = PrayerStore(db_path, legacy_folder=None)
+        assert store.date_range('Fes') == (date(2026, 3, 1), date(2026, 3, 31))
+        assert store.get_day('Fes', date(2026, 3, 31))['Fajr'] == '05:30'
+        store.close()
+    print("✅ Version 1 databases gain stored range bounds")
+
+
+if __name__ == "__main__":
+    test_resolve_date()
+    test_upsert_and_lookup()
+    test_json_import()
+    test_new_year_range()
+    test_migration_from_v1()
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Check PrayerTimeWorker with stub responses and a temporary store: page
+revalidation (304, same body hash, new data), the refresh stats, and the
+selected city being fetched, stored and shown before the backfill starts
+"""
+
+import hashlib
+import json
+import os
+import sys
+import tempfile
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from PyQt5.QtWidgets import QApplication
+
+from prayer_store import PrayerStore
+from ultra_modern_salah import PrayerTimeWorker
+
+app = QApplication.instance() or QApplication([])
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'yabiladi_city_101.html')
+
+
+def city_page(day=None):
+    """The fixture page, with its first row moved to day (default: today)"""
+    day = day or date.today()
+    with open(FIXTURE, 'r', encoding='utf-8') as f:
+        html = f.read()
+    return html.replace('<strong>01/03</strong>', f'<strong>{day:%d/%m}</strong>', 1)
+
+
+class StubResponse:
+    def __init__(self, status_code=200, text='', headers=None):
+        self.status_code = status_code
+        self.text = text
+        self.content = text.encode('utf-8')
+        self.headers = headers or {}
+
+
+class StubFetcher:
+    """fetch()/fetch_all() answered from {city or url: response or exception}"""
+
+    def __init__(self, responses=None, default=None):
+        self.responses = responses or {}
+        self.default = default
+        self.requests = []
+        self.max_workers = 1
+        self.last_elapsed = 0.0
+
+    def answer(self, key):
+        result = self.responses.get(key, self.default)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def fetch(self, url, headers=None):
+        self.requests.append((url, headers))
+        return self.answer(url)
+
+    def fetch_all(self, urls, on_result=None):
+        results = {}
+        for key, (url, headers) in urls.items():
+            self.requests.append((url, headers))
+            try:
+                result = self.answer(key)
+            except Exception as e:
+                result = e
+            results[key] = result
+            on_result(key, result)
+        return results
+
+    def close(self):
+        pass
+
+
+def make_worker(tmp, city_name='Tangier'):
+    worker = PrayerTimeWorker(101, city_name)
+    worker.data_folder = tmp
+    worker.validators_file = os.path.join(tmp, 'validators.json')
+    worker.store = PrayerStore(os.path.join(tmp, 'prayer_times.db'), legacy_folder=None)
+    worker.cache_format = 'sqlite'
+    return worker
+
+
+def test_conditional_request():
+    with tempfile.TemporaryDirectory() as tmp:
+        worker = make_worker(tmp)
+        validators = {'Tangier': {'etag': '"v1"', 'last_modified': 'Sat, 01 Mar 2025 00:00:00 GMT'}}
+        # Validators are only sent once the city is in the store
+        url, headers = worker.get_conditional_request('Tangier', validators)
+        assert url.endswith('/101/city.html') and headers == {}
+        worker.store.upsert_city('Tangier', {'01/03': {'Fajr': '06:15'}})
+        _, headers = worker.get_conditional_request('Tangier', validators)
+        assert headers == {'If-None-Match': '"v1"', 'If-Modified-Since': 'Sat, 01 Mar 2025 00:00:00 GMT'}
+    print("✅ Conditional headers sent only for cached cities")
+
+
+def test_process_city_response():
+    with tempfile.TemporaryDirectory() as tmp:
+        worker = make_worker(tmp)
+        page = city_page(date(2025, 3, 1))
+        validators = {}
+
+        # New data: parsed, stored, validators recorded
+        assert worker.process_city_response('Tangier', StubResponse(200, page, {'ETag': '"v1"'}), validators) == 'parsed'
+        assert worker.store.has_city('Tangier')
+        first = dict(validators['Tangier'])
+        assert first['etag'] == '"v1"' and len(first['body_hash']) == 64
+        version = worker.store.version()
+
+        # 304: nothing parsed or written, validators kept
+        assert worker.process_city_response('Tangier', StubResponse(304), validators) == 'not_modified'
+        assert validators['Tangier'] == first and worker.store.version() == version
+
+        # 200 with the same body: not parsed or written, new ETag remembered
+        def fail_parse(html):
+            raise AssertionError("an unchanged page was parsed")
+        worker.parse_city_page = fail_parse
+        assert worker.process_city_response('Tangier', StubResponse(200, page, {'ETag': '"v2"'}), validators) == 'unchanged'
+        assert validators['Tangier']['etag'] == '"v2"' and worker.store.version() == version
+        del worker.parse_city_page
+
+        # With a pending dict the parsed times are staged, not written
+        pending = {}
+        assert worker.process_city_response('Rabat', StubResponse(200, page), validators, pending) == 'parsed'
+        assert list(pending) == ['Rabat'] and not worker.store.has_city('Rabat')
+
+        # Unparseable page: failure, validators untouched
+        assert worker.process_city_response('Fes', StubResponse(200, '<html></html>'), validators) is None
+        assert 'Fes' not in validators
+    print("✅ 304, same-hash and new pages handled as revalidated, unchanged or parsed")
+
+
+def test_refresh_stats():
+    with tempfile.TemporaryDirectory() as tmp:
+        worker = make_worker(tmp)
+        page = city_page(date(2025, 3, 1))
+        worker.store.upsert_cities({'Tangier': {'01/03': {'Fajr': '06:15'}},
+                                    'Casablanca': {'01/03': {'Fajr': '06:15'}}})
+        same_hash = {'etag': None, 'last_modified': None,
+                     'body_hash': hashlib.sha256(page.encode('utf-8')).hexdigest()}
+        worker.save_validators({'Tangier': {'etag': '"t1"'}, 'Casablanca': same_hash})
+
+        fetcher = StubFetcher({'Tangier': StubResponse(304), 'Casablanca': StubResponse(200, page),
+                               'Rabat': StubResponse(200, page, {'ETag': '"r1"'})},
+                              default=OSError("unreachable"))
+        worker.create_fetcher = lambda max_workers=None: fetcher
+        updated = []
+        worker.city_updated.connect(updated.append)
+        worker.update_all_cities_data()
+
+        assert worker.last_refresh_stats == {'not_modified': 1, 'unchanged': 1, 'parsed': 1}
+        assert updated == ['Rabat'] and worker.store.has_city('Rabat')
+        assert ('https://www.yabiladi.com/prieres/details/101/city.html', {'If-None-Match': '"t1"'}) in fetcher.requests
+        with open(worker.validators_file) as f:
+            saved = json.load(f)
+        assert saved['Rabat']['etag'] == '"r1"' and saved['Tangier'] == {'etag': '"t1"'}
+    print("✅ Refresh stats count not-modified, same-hash and parsed cities")
+
+
+def test_selected_city_before_backfill():
+    with tempfile.TemporaryDirectory() as tmp:
+        worker = make_worker(tmp)
+        fetcher = StubFetcher(default=StubResponse(200, city_page()))
+        worker.create_fetcher = lambda max_workers=None: fetcher
+        steps = []
+        worker.city_updated.connect(lambda city: steps.append(('city_updated', city)))
+        worker.data_received.connect(lambda times: steps.append(('data_received', times['Fajr'])))
+        worker.error_occurred.connect(lambda message: steps.append(('error', message)))
+
+        def backfill(skip=(), max_workers=None):
+            # By now the selected city is stored and already on screen
+            assert worker.store.has_city('Tangier')
+            steps.append(('backfill', tuple(skip), max_workers))
+
+        worker.update_all_cities_data = backfill
+        worker.save_update_timestamp = lambda: None
+        worker.force_update_data()
+
+        assert steps == [('city_updated', 'Tangier'), ('data_received', '06:15'),
+                         ('backfill', ('Tangier',), PrayerTimeWorker.BACKFILL_WORKERS)]
+        assert len(fetcher.requests) == 1 and fetcher.requests[0][1] == {}
+    print("✅ Selected city fetched, stored and shown before the backfill")
+
+
+def test_fetch_failure_skips_backfill():
+    with tempfile.TemporaryDirectory() as tmp:
+        worker = make_worker(tmp)
+        worker.create_fetcher = lambda max_workers=None: StubFetcher(default=OSError("offline"))
+        steps = []
+        worker.offline_data_loaded.connect(lambda times, days: steps.append('offline'))
+        worker.error_occurred.connect(lambda message: steps.append('error'))
+        worker.update_all_cities_data = lambda **kwargs: steps.append('backfill')
+        worker.force_update_data()
+        assert steps in (['offline'], ['error']) and 'backfill' not in steps
+    print("✅ Failed fetch falls back to the offline calculation, no backfill")
+
+
+if __name__ == "__main__":
+    test_conditional_request()
+    test_process_city_response()
+    test_refresh_stats()
+    test_selected_city_before_backfill()
+    test_fetch_failure_skips_backfill()
+    print("\n🎉 All prayer worker tests passed!")
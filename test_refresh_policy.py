@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Check the adaptive countdown refresh: minute-aligned ticks far from an
+event, second ticks inside the window, and the wakeups saved over a day
+"""
+
+import os
+import sys
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from day_timeline import DayTimeline
+from refresh_policy import next_tick
+
+DAY = date(2026, 10, 18)
+TIMES = {'Date': '18/10', 'Fajr': '06:10', 'Sunrise': '07:35', 'Dohr': '13:20',
+         'Asr': '16:35', 'Maghreb': '19:05', 'Isha': '20:25'}
+IQAMA = {'Fajr': 20, 'Dohr': 15, 'Asr': 15, 'Maghreb': 10, 'Isha': 15}
+
+
+def at(hhmm, seconds=0, microseconds=0):
+    hours, minutes = map(int, hhmm.split(':'))
+    return datetime(DAY.year, DAY.month, DAY.day, hours, minutes, seconds, microseconds)
+
+
+def simulate(timeline, start, hours, window):
+    """Ticks the policy asks for over a span of virtual time"""
+    now, end, ticks = start, start + timedelta(hours=hours), 0
+    while now < end:
+        delay, _ = next_tick(timeline, now, window)
+        now += timedelta(milliseconds=delay)
+        ticks += 1
+    return ticks
+
+
+def test_minute_aligned_far_from_events():
+    timeline = DayTimeline(TIMES, IQAMA, day=DAY)
+    delay, seconds = next_tick(timeline, at('10:00', 12, 250000), 600)
+    assert not seconds
+    # Lands just after 10:01:00
+    assert 47750 <= delay <= 47760
+    delay, seconds = next_tick(None, at('10:00', 59, 999000), 600)
+    assert not seconds and delay <= 10
+    print("✅ Minute-aligned ticks while the next event is far away")
+
+
+def test_second_ticks_in_window():
+    timeline = DayTimeline(TIMES, IQAMA, day=DAY)
+    # Ten minutes before Dohr's adhan and before its iqama
+    for now in (at('13:10', 0, 400000), at('13:25', 30)):
+        delay, seconds = next_tick(timeline, now, 600)
+        assert seconds and delay <= 1005, (now, delay)
+    # Just before the window opens the tick lands on its start
+    delay, seconds = next_tick(timeline, at('13:09', 50), 600)
+    assert not seconds and 10000 <= delay <= 10010
+    # After Isha's iqama the next event is tomorrow's Fajr
+    delay, seconds = next_tick(timeline, at('23:00'), 600)
+    assert not seconds
+    delay, seconds = next_tick(timeline, at('06:05'), 600)
+    assert seconds
+    print("✅ Second ticks only inside the window before adhan/iqama")
+
+
+def test_wakeups_per_hour():
+    timeline = DayTimeline(TIMES, IQAMA, day=DAY)
+    start = at('00:00')
+    before = 24 * 3600  # one tick per second
+    after = simulate(timeline, start, 24, 600)
+    quiet = simulate(timeline, at('09:00'), 1, 600)
+    print(f"   wakeups/hour over a day: {before / 24:.0f} -> {after / 24:.0f}, "
+          f"quiet hour (09:00-10:00): {quiet}")
+    assert quiet <= 61
+    # 11 events with a 10 minute second-tick window each, the rest minute ticks
+    assert after < before / 4
+    print("✅ Adaptive refresh cuts wakeups")
+
+
+if __name__ == "__main__":
+    test_minute_aligned_far_from_events()
+    test_second_ticks_in_window()
+    test_wakeups_per_hour()
+    print("\n🎉 All refresh policy tests passed!")
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Check the scheduler journal: replaying a day restores the notification
+state, replays are idempotent, torn lines are skipped, old days compacted,
+and a restart neither re-fires nor loses events
+"""
+
+import os
+import sys
+import tempfile
+from datetime import timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from PyQt5.QtWidgets import QApplication, QSystemTrayIcon
+
+from prayer_scheduler import Event, PrayerScheduler
+from salah_tray_indicator import SalahTrayIndicator
+from scheduler_journal import SchedulerJournal
+from test_prayer_scheduler import DAY, IQAMA, SETTINGS, TIMES, Clock, at
+
+app = QApplication.instance() or QApplication([])
+
+
+def state_tuple(state):
+    return state.fired, state.counts, state.stopped, state.snoozes
+
+
+def test_replay_restores_state():
+    with tempfile.TemporaryDirectory() as tmp:
+        journal = SchedulerJournal(os.path.join(tmp, 'tray', 'journal.jsonl'))
+        journal.record_fired(Event(at('06:10'), 'adhan', 'Fajr', 1))
+        journal.record_fired(Event(at('06:12'), 'repeat', 'Fajr', 2))
+        journal.record_fired(Event(at('16:35'), 'adhan', 'Asr', 1))
+        journal.record_stopped('Asr', DAY)
+        journal.record_snoozed(Event(at('16:40'), 'snooze', 'Asr', 1), DAY)
+        journal.record_fired(Event(at('13:20'), 'adhan', 'Isha', 1))
+        journal.record_fired(Event(at('13:35'), 'iqama', 'Isha', 0))
+        journal.record_snoozed(Event(at('19:10'), 'snooze', 'Maghreb', 1), DAY)
+        with open(journal.path, 'a') as f:
+            f.write('{"day":"2026-10-18","type":"fi')  # torn by a crash
+
+        state = journal.replay(DAY)
+        assert state.counts == {'Fajr': 2}  # Asr stopped, Isha past its iqama
+        assert state.stopped == {'Asr'}
+        assert ('adhan', 'Fajr', 1) in state.fired and ('repeat', 'Fajr', 2) in state.fired
+        # Asr was snoozed after its repeats were stopped, so that snooze is pending
+        assert state.snoozes == {'Asr': Event(at('16:40'), 'snooze', 'Asr', 1),
+                                 'Maghreb': Event(at('19:10'), 'snooze', 'Maghreb', 1)}
+        assert state_tuple(journal.replay(DAY)) == state_tuple(state)
+    print("✅ Journal replay restores counts, stops and snoozes, idempotently")
+
+
+def test_compaction():
+    with tempfile.TemporaryDirectory() as tmp:
+        journal = SchedulerJournal(os.path.join(tmp, 'journal.jsonl'))
+        for day_offset in (-2, -1, 0):
+            journal.record_fired(Event(at('06:10') + timedelta(days=day_offset), 'adhan', 'Fajr', 1))
+        assert journal.replay(DAY).counts == {'Fajr': 1}
+        # Replay dropped the older days while reading them
+        assert [r['day'] for r in journal.read()] == [DAY.isoformat()]
+        assert journal.compact(DAY + timedelta(days=1)) == 1 and journal.read() == []
+    print("✅ Old days compacted away, replay stays O(events today)")
+
+
+class HeadlessTray(SalahTrayIndicator):
+    """The real tray's journal and scheduling methods, without its window,
+    settings files, D-Bus notifier or audio"""
+
+    def __init__(self, journal, clock):
+        QSystemTrayIcon.__init__(self)
+        self.clock = clock
+        self.journal = journal
+        self.prayer_times = TIMES
+        self.timeline = None
+        self.shown = []
+
+    def load_notification_settings(self):
+        return SETTINGS
+
+    def load_iqama_times(self):
+        return IQAMA
+
+    def send_prayer_notification_immediate(self, prayer):
+        self.shown.append((prayer, self.notification_counts[prayer]))
+
+    def showMessage(self, *args):
+        pass
+
+
+def start_tray(journal, clock):
+    """Start the tray's scheduling the way it does at startup"""
+    tray = HeadlessTray(journal, clock)
+    tray.restore_journal()
+    tray.scheduler = PrayerScheduler(clock=tray.clock, parent=tray)
+    tray.scheduler.fired.connect(tray.on_scheduled_event)
+    tray.reschedule_notifications()
+    return tray
+
+
+def test_restart_is_idempotent():
+    with tempfile.TemporaryDirectory() as tmp:
+        journal = SchedulerJournal(os.path.join(tmp, 'journal.jsonl'))
+        clock = Clock(at('06:09'))
+        tray = start_tray(journal, clock)
+        clock.now = at('06:10', 1)
+        tray.scheduler.run_due()
+        assert tray.shown == [('Fajr', 1)]
+
+        # Restarted a minute after the adhan: the adhan is not shown again,
+        # the repeat count is restored and the next repeat still fires
+        clock.now = at('06:11')
+        for _ in range(2):  # and a second restart changes nothing
+            tray = start_tray(journal, clock)
+            assert tray.notification_counts == {'Fajr': 1}
+            assert tray.scheduler.next_event() == Event(at('06:12'), 'repeat', 'Fajr', 2)
+        clock.now = at('06:12')
+        tray.scheduler.run_due()
+        assert tray.shown == [('Fajr', 2)]
+
+        # Down during the second repeat: caught up within the grace period
+        clock.now = at('06:16')
+        tray = start_tray(journal, clock)
+        tray.scheduler.run_due()
+        assert tray.shown == [('Fajr', 3)]
+        assert journal.replay(DAY).counts == {'Fajr': 3}
+
+    # Repeats stopped before a restart stay stopped, the iqama still comes
+    with tempfile.TemporaryDirectory() as tmp:
+        journal = SchedulerJournal(os.path.join(tmp, 'journal.jsonl'))
+        journal.record_fired(Event(at('06:10'), 'adhan', 'Fajr', 1))
+        journal.record_stopped('Fajr', DAY)
+        tray = start_tray(journal, Clock(at('06:11')))
+        assert tray.stopped_prayers == {'Fajr': DAY} and tray.notification_counts == {}
+        assert tray.scheduler.next_event() == Event(at('06:30'), 'iqama', 'Fajr', 0)
+    print("✅ Restarts neither repeat nor lose notifications")
+
+
+if __name__ == "__main__":
+    test_replay_restores_state()
+    test_compaction()
+    test_restart_is_idempotent()
+    print("\n🎉 All scheduler journal tests passed!")
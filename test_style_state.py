@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Check that style states switch through dynamic properties and re-polish
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from PyQt5.QtWidgets import QApplication, QLabel, QVBoxLayout, QWidget
+
+from style_state import set_style_state
+
+app = QApplication.instance() or QApplication([])
+
+QSS = """
+    .card QLabel { color: #2c3e50; }
+    .card[current="true"] QLabel { color: #ffffff; }
+"""
+
+
+def test_state_restyles_descendants():
+    root = QWidget()
+    root.setStyleSheet(QSS)
+    card = QWidget(root)
+    card.setProperty("class", "card")
+    card.setProperty("current", False)
+    label = QLabel("Fajr", card)
+    QVBoxLayout(card).addWidget(label)
+    root.show()
+    app.processEvents()
+    assert label.palette().color(label.foregroundRole()).name() == '#2c3e50'
+
+    assert set_style_state(card, "current", True, descendants=True)
+    assert label.palette().color(label.foregroundRole()).name() == '#ffffff'
+    # Same state again: nothing to re-polish
+    assert not set_style_state(card, "current", True, descendants=True)
+    assert set_style_state(card, "current", False, descendants=True)
+    assert label.palette().color(label.foregroundRole()).name() == '#2c3e50'
+    root.close()
+    print("✅ Dynamic property states restyle without a new stylesheet")
+
+
+if __name__ == "__main__":
+    test_state_restyles_descendants()
+    print("\n🎉 All style state tests passed!")
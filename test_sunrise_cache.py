@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Check that OfflineSunriseCalculator computes each (city, day) once, drops
+earlier days after midnight and forgets entries on invalidate()
+"""
+
+import os
+import sys
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from PyQt5.QtWidgets import QApplication
+
+from ultra_modern_salah import OfflineSunriseCalculator
+
+app = QApplication.instance() or QApplication([])
+
+
+class CountingCalculator:
+    """Swap in a calculate_all_prayer_times that counts its calls"""
+
+    def __enter__(self):
+        self.calls = []
+        self.saved = OfflineSunriseCalculator.calculate_all_prayer_times
+        compute = self.saved
+
+        def counting(city_name, day):
+            self.calls.append((city_name, day))
+            return compute(city_name, day)
+
+        OfflineSunriseCalculator.calculate_all_prayer_times = staticmethod(counting)
+        OfflineSunriseCalculator.invalidate()
+        OfflineSunriseCalculator._solar_cache_day = None
+        return self
+
+    def __exit__(self, *exc):
+        OfflineSunriseCalculator.calculate_all_prayer_times = staticmethod(self.saved)
+        OfflineSunriseCalculator.invalidate()
+
+
+def test_repeat_calls_hit_cache():
+    today = date.today()
+    with CountingCalculator() as counter:
+        first = OfflineSunriseCalculator.get_solar_events('Tangier', today)
+        for _ in range(5):
+            assert OfflineSunriseCalculator.get_solar_events('Tangier', today) is first
+        # A datetime on the same day shares the entry
+        assert OfflineSunriseCalculator.get_solar_events('Tangier', datetime.now()) is first
+        assert OfflineSunriseCalculator.calculate_sunrise('Tangier', today) == first['Sunrise']
+        assert counter.calls == [('Tangier', today)]
+
+        OfflineSunriseCalculator.get_solar_events('Rabat', today)
+        OfflineSunriseCalculator.get_solar_events('Tangier', today + timedelta(days=1))
+        assert len(counter.calls) == 3
+    print("✅ Repeat lookups for a city and day come from the cache")
+
+
+def test_old_days_pruned():
+    today = date.today()
+    yesterday = today - timedelta(days=1)
+    with CountingCalculator():
+        OfflineSunriseCalculator.get_solar_events('Tangier', yesterday)
+        OfflineSunriseCalculator.get_solar_events('Rabat', yesterday)
+        # As if the cache was last pruned before midnight
+        OfflineSunriseCalculator._solar_cache_day = yesterday
+        OfflineSunriseCalculator.get_solar_events('Tangier', today)
+        assert set(OfflineSunriseCalculator._solar_cache) == {('Tangier', today)}
+        assert OfflineSunriseCalculator._solar_cache_day == today
+    print("✅ Earlier days are dropped at the first lookup of a new day")
+
+
+def test_invalidate():
+    today = date.today()
+    with CountingCalculator() as counter:
+        for city in ('Tangier', 'Rabat'):
+            OfflineSunriseCalculator.get_solar_events(city, today)
+        OfflineSunriseCalculator.invalidate('Tangier')
+        assert set(OfflineSunriseCalculator._solar_cache) == {('Rabat', today)}
+        OfflineSunriseCalculator.get_solar_events('Tangier', today)
+        assert len(counter.calls) == 3
+
+        OfflineSunriseCalculator.invalidate()
+        assert OfflineSunriseCalculator._solar_cache == {}
+        OfflineSunriseCalculator.get_solar_events('Rabat', today)
+        assert len(counter.calls) == 4
+    print("✅ invalidate() clears one city or the whole cache")
+
+
+if __name__ == "__main__":
+    test_repeat_calls_hit_cache()
+    test_old_days_pruned()
+    test_invalidate()
+    print("\n🎉 All sunrise cache tests passed!")
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Check that the streaming table parser matches the BeautifulSoup path
+"""
+
+import importlib.util
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import prayer_table_parser
+from prayer_table_parser import parse_prayer_table
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+FIXTURES = ['yabiladi_city_101.html', 'yabiladi_edge_cases.html']
+
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURES_DIR, name), 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def parse_with_bs4(html):
+    """The original BeautifulSoup implementation, kept as the reference"""
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, 'html.parser')
+    prayer_table = soup.find('table')
+    if not prayer_table:
+        return None
+
+    headers = [header.text.strip() for header in prayer_table.find_all('th')]
+    rows = prayer_table.find_all('tr')[1:]
+
+    all_prayer_times = {}
+    for row in rows:
+        columns = row.find_all('td')
+        if columns:
+            date = columns[0].text.strip()
+            prayer_data = {}
+            for header, col in zip(headers, columns):
+                prayer_data[header] = col.text.strip()
+            all_prayer_times[date] = prayer_data
+    return all_prayer_times
+
+
+def parse_with_backend(html, use_lxml):
+    saved = prayer_table_parser.etree
+    if not use_lxml:
+        prayer_table_parser.etree = None
+    try:
+        return parse_prayer_table(html)
+    finally:
+        prayer_table_parser.etree = saved
+
+
+def test_matches_bs4():
+    if importlib.util.find_spec('bs4') is None:
+        print("⚠️ beautifulsoup4 not installed, skipping comparison")
+        return
+
+    backends = [False]
+    if prayer_table_parser.etree is not None:
+        backends.append(True)
+
+    for name in FIXTURES:
+        html = load_fixture(name)
+        expected = parse_with_bs4(html)
+        for use_lxml in backends:
+            result = parse_with_backend(html, use_lxml)
+            assert result == expected, f"{name} differs ({'lxml' if use_lxml else 'html.parser'})"
+            print(f"✅ {name}: {len(result)} days identical ({'lxml' if use_lxml else 'html.parser'})")
+
+
+def test_fixture_content():
+    result = parse_with_backend(load_fixture('yabiladi_city_101.html'), False)
+    assert len(result) == 31
+    assert result['06/03'] == {
+        'Date': '06/03', 'Fajr': '06:10', 'Sunrise': '07:35', 'Dohr': '13:30',
+        'Asr': '16:41', 'Maghreb': '19:05', 'Isha': '20:20'
+    }
+    print("✅ Tangier fixture parsed")
+
+    edge = parse_with_backend(load_fixture('yabiladi_edge_cases.html'), False)
+    assert edge['01/01']['Dohr'] == '13:35'
+    assert edge['02/01']['Fajr'] == '06:51'
+    print("✅ Edge cases parsed")
+
+
+def test_no_table():
+    assert parse_prayer_table("<html><body><p>Maintenance</p></body></html>") is None
+    print("✅ Page without a table returns None")
+
+
+if __name__ == "__main__":
+    test_matches_bs4()
+    test_fixture_content()
+    test_no_table()
+    print("\n🎉 Table parser tests passed")
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Check the mmap binary timetable against the prayer time store it is exported from
+"""
+
+import os
+import sys
+import tempfile
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from prayer_calc import compute_range
+from prayer_store import PrayerStore
+from timetable import HEADER, ROW, MISSING, Timetable, export_city, open_timetable, timetable_path, write_timetable
+
+
+def test_roundtrip_through_store():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = PrayerStore(os.path.join(tmp, 'prayer_times.db'), legacy_folder=None)
+        store.upsert_city('Rabat', compute_range(34.02, -6.84, date(2026, 12, 20), 30))
+        folder = os.path.join(tmp, 'timetables')
+        assert export_city(store, 'Rabat', folder)
+        assert not export_city(store, 'Fes', folder)
+
+        path = timetable_path('Rabat', folder)
+        assert os.path.getsize(path) == HEADER.size + 30 * ROW.size
+
+        timetable = Timetable(path)
+        assert (timetable.first, timetable.last) == (date(2026, 12, 20), date(2027, 1, 18))
+        for i in range(30):
+            day = date(2026, 12, 20) + timedelta(days=i)
+            assert timetable.times(day) == store.get_day('Rabat', day)
+        assert timetable.times(date(2026, 12, 19)) is None
+        assert timetable.times(date(2027, 1, 19)) is None
+        assert timetable.days_remaining(date(2027, 1, 10)) == 9
+        timetable.close()
+        store.close()
+    print("✅ Timetable rows match the store")
+
+
+def test_gaps_and_replacement():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'fes.bin')
+        days = {date(2026, 3, 1): {'Fajr': '06:10', 'Sunrise': '--:--', 'Dohr': '13:30'},
+                date(2026, 3, 3): {'Fajr': '06:07'}}
+        write_timetable(path, days)
+        timetable = open_timetable('Fes', tmp)
+        assert timetable.minutes(date(2026, 3, 1)) == (370, MISSING, 810, MISSING, MISSING, MISSING)
+        assert timetable.times(date(2026, 3, 1)) == {'Date': '01/03', 'Fajr': '06:10', 'Dohr': '13:30'}
+        assert timetable.times(date(2026, 3, 2)) is None
+        assert open_timetable('Fes', tmp) is timetable
+
+        # A refresh renames a new file into place; the next open remaps it
+        write_timetable(path, {date(2026, 4, 1): {'Fajr': '05:30'}})
+        assert timetable.times(date(2026, 3, 3))['Fajr'] == '06:07'
+        reopened = open_timetable('Fes', tmp)
+        assert reopened is not timetable
+        assert reopened.times(date(2026, 4, 1))['Fajr'] == '05:30'
+        assert open_timetable('Tangier', tmp) is None
+    print("✅ Gaps, missing times and file replacement")
+
+
+if __name__ == "__main__":
+    test_roundtrip_through_store()
+    test_gaps_and_replacement()
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Check the tray icon cache: icons reused by text and the LRU bound
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from PyQt5.QtWidgets import QApplication
+
+from tray_icon import TrayIconCache, render_tray_icon
+
+app = QApplication.instance() or QApplication([])
+
+
+def test_reuse_and_bound():
+    rendered = []
+
+    def render(text):
+        rendered.append(text)
+        return render_tray_icon(text)
+
+    cache = TrayIconCache(max_size=3, render=render)
+    first = cache.get('04:42')
+    assert cache.get('04:42') is first
+    assert not first.isNull()
+    for text in ('04:41', None, '04:40'):
+        cache.get(text)
+    # '04:42' was least recently used and has been dropped
+    assert list(cache.icons) == ['04:41', None, '04:40']
+    cache.get('04:42')
+    assert rendered == ['04:42', '04:41', None, '04:40', '04:42']
+    assert (cache.hits, cache.misses) == (1, 5)
+    print("✅ Icons reused by text within the LRU bound")
+
+
+if __name__ == "__main__":
+    test_reuse_and_bound()
+    print("\n🎉 All tray icon tests passed!")
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Compact binary timetable, one file per city, read through mmap.
+
+Layout (little-endian): a 16-byte header
+
+    magic 'SALAHTT1' | version u16 | prayers u16 | first day ordinal u32
+
+followed by one row of six uint16 minutes-since-midnight per day (PRAYERS
+order, 0xFFFF where a time is missing). Day n of the range starts at
+16 + n * 12, so reading a day is one struct.unpack_from on the mapping.
+"""
+import mmap
+import os
+import struct
+from datetime import date as date_type, datetime, timedelta
+
+from atomic_file import atomic_write
+from prayer_calc import PRAYERS, format_minutes
+
+MAGIC = b'SALAHTT1'
+VERSION = 1
+HEADER = struct.Struct('<8sHHI')
+ROW = struct.Struct('<' + 'H' * len(PRAYERS))
+MISSING = 0xFFFF
+
+TIMETABLE_FOLDER = os.path.join(os.path.expanduser('~'), '.salah_times', 'timetables')
+
+
+def timetable_path(city, folder=TIMETABLE_FOLDER):
+    return os.path.join(folder, f'{city.lower()}.bin')
+
+
+def encode_row(times):
+    row = []
+    for prayer in PRAYERS:
+        try:
+            hours, minutes = map(int, times[prayer].split(':'))
+            row.append(hours * 60 + minutes)
+        except (KeyError, AttributeError, ValueError):
+            row.append(MISSING)
+    return row
+
+
+def write_timetable(path, days):
+    """Write {date: times} as a timetable covering first..last date.
+
+    Days missing inside the range are stored as all-MISSING rows. The file
+    is written next to path and renamed into place, so a reader that has the
+    old file mapped keeps a consistent view.
+    """
+    if not days:
+        return False
+    first = min(days)
+    count = (max(days) - first).days + 1
+    blank = [MISSING] * len(PRAYERS)
+
+    rows = [HEADER.pack(MAGIC, VERSION, len(PRAYERS), first.toordinal())]
+    for i in range(count):
+        times = days.get(first + timedelta(days=i))
+        rows.append(ROW.pack(*(encode_row(times) if times else blank)))
+    atomic_write(path, b''.join(rows))
+    return True
+
+
+def export_city(store, city, folder=TIMETABLE_FOLDER):
+    """Write a city's cached range from the prayer time store as a timetable"""
+    first, last = store.date_range(city)
+    if first is None:
+        return False
+    return write_timetable(timetable_path(city, folder), store.get_range(city, first, last + timedelta(days=1)))
+
+
+class Timetable:
+    """Read-only mmap view of one city's timetable file"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            stat = os.fstat(f.fileno())
+            self.key = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, prayers, first_ordinal = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC or version != VERSION or prayers != len(PRAYERS):
+            self.map.close()
+            raise ValueError(f"Not a version {VERSION} timetable: {path}")
+        self.first = date_type.fromordinal(first_ordinal)
+        self.days = (len(self.map) - HEADER.size) // ROW.size
+
+    @property
+    def last(self):
+        return self.first + timedelta(days=self.days - 1)
+
+    def minutes(self, day):
+        """Six minutes-since-midnight values (MISSING for gaps), or None if the day is not covered"""
+        if isinstance(day, datetime):
+            day = day.date()
+        index = (day - self.first).days
+        if index < 0 or index >= self.days:
+            return None
+        row = ROW.unpack_from(self.map, HEADER.size + index * ROW.size)
+        if all(value == MISSING for value in row):
+            return None
+        return row
+
+    def times(self, day):
+        """One day in the cache shape {'Date': 'dd/mm', 'Fajr': 'HH:MM', ...}, or None"""
+        row = self.minutes(day)
+        if row is None:
+            return None
+        if isinstance(day, datetime):
+            day = day.date()
+        times = {'Date': day.strftime('%d/%m')}
+        for prayer, value in zip(PRAYERS, row):
+            if value != MISSING:
+                times[prayer] = format_minutes(value)
+        return times
+
+    def days_remaining(self, today=None):
+        today = today or date_type.today()
+        return max(0, (self.last - today).days + 1)
+
+    def close(self):
+        self.map.close()
+
+
+_open_timetables = {}
+
+
+def open_timetable(city, folder=TIMETABLE_FOLDER):
+    """Shared Timetable for a city, remapped when the file is replaced; None if missing"""
+    path = timetable_path(city, folder)
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    key = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+    timetable = _open_timetables.get(path)
+    if timetable is not None and timetable.key == key:
+        return timetable
+    try:
+        new_timetable = Timetable(path)
+    except (OSError, ValueError) as e:
+        print(f"Could not open timetable {path}: {e}")
+        return None
+    # The replaced mapping is left for the garbage collector, another
+    # thread may still be reading a row from it
+    _open_timetables[path] = new_timetable
+    return new_timetable
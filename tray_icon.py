@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Tray icon rendering with a small LRU of rendered icons.
+
+The tray icon only shows the HH:MM countdown, so the same few icons are
+drawn over and over; they are rendered once and reused by text.
+"""
+from collections import OrderedDict
+
+from PyQt5.QtCore import QRect, Qt
+from PyQt5.QtGui import QBrush, QColor, QFont, QIcon, QPainter, QPen, QPixmap
+
+ICON_SIZE = 64
+
+
+def render_tray_icon(countdown_text=None):
+    """Draw the icon: the countdown text, or the mosque silhouette without one"""
+    pixmap = QPixmap(ICON_SIZE, ICON_SIZE)
+    pixmap.fill(Qt.transparent)
+
+    painter = QPainter(pixmap)
+    painter.setRenderHint(QPainter.Antialiasing)
+
+    # Background circle
+    painter.setPen(Qt.NoPen)
+    painter.setBrush(QBrush(QColor(30, 80, 30)))
+    painter.drawEllipse(0, 0, 64, 64)
+
+    if countdown_text:
+        # Show countdown HH:MM or MM:SS
+        painter.setPen(QPen(QColor(255, 255, 255)))
+        font = QFont("Monospace", 13, QFont.Bold)
+        painter.setFont(font)
+        painter.drawText(QRect(0, 0, 64, 64), Qt.AlignCenter, countdown_text)
+    else:
+        # Mosque silhouette
+        painter.setPen(QPen(QColor(255, 255, 255), 2))
+        painter.setBrush(QBrush(QColor(255, 255, 255)))
+        painter.drawEllipse(16, 14, 32, 20)
+        painter.drawRect(8, 24, 8, 28)
+        painter.drawRect(48, 24, 8, 28)
+        painter.drawRect(12, 36, 40, 16)
+
+    painter.end()
+    return QIcon(pixmap)
+
+
+class TrayIconCache:
+    """Rendered icons by text, least recently used dropped beyond max_size"""
+
+    def __init__(self, max_size=8, render=render_tray_icon):
+        self.max_size = max_size
+        self.render = render
+        self.icons = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, countdown_text=None):
+        icon = self.icons.get(countdown_text)
+        if icon is not None:
+            self.icons.move_to_end(countdown_text)
+            self.hits += 1
+            return icon
+        self.misses += 1
+        icon = self.render(countdown_text)
+        self.icons[countdown_text] = icon
+        while len(self.icons) > self.max_size:
+            self.icons.popitem(last=False)
+        return icon
+
+    def clear(self):
+        self.icons.clear()
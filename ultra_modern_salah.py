@@ -1,7 +1,6 @@
 #!/usr/bin/env python3
 import sys
 import requests
-from bs4 import BeautifulSoup
 from datetime import datetime, timedelta
 from PyQt5.QtWidgets import *
 from PyQt5.QtCore import *
@@ -10,8 +9,22 @@ import threading
 import json
 import os
 import subprocess
-import math
 import signal
+import hashlib
+from city_fetcher import CityFetcher, YABILADI_CITY_URL
+from prayer_table_parser import parse_prayer_table
+from prayer_store import get_store
+from city_cache import get_city_cache
+from atomic_file import write_json
+from config_service import get_config
+from timetable import export_city, open_timetable
+import prayer_calc
+from day_timeline import DayTimeline, format_hms, seconds_since_midnight
+from notifier import get_notifier
+from audio_service import get_audio
+from prayer_grid import GRID_ICONS, GRID_PRAYERS, PrayerGrid
+from refresh_policy import DEFAULT_SECONDS_WINDOW, RefreshTicker, next_tick
+from clock_monitor import ClockMonitor
 
 # Import display features
 try:
@@ -192,10 +205,7 @@ class SettingsDialog(QDialog):
         self.current_city = current_city
         self.current_language = current_language
         self.cities = sorted(CITIES.keys())
-        self.config_dir = os.path.join(os.path.expanduser('~'), '.salah_times', 'config')
-        self.geometry_file = os.path.join(self.config_dir, 'settings_geometry.json')
-        self.iqama_config_file = os.path.join(self.config_dir, 'iqama_times.json')
-        self.notifications_config_file = os.path.join(self.config_dir, 'notifications.json')
+        self.config = get_config()
         self.iqama_times = self.load_iqama_times()
         self.notification_settings = self.load_notification_settings()
         self.init_ui()
@@ -751,6 +761,11 @@ class SettingsDialog(QDialog):
         self.sound_enabled.setChecked(self.notification_settings.get('sound_enabled', True))
         settings_layout.addWidget(self.sound_enabled)
         
+        # Alarm window at the adhan
+        self.alarm_dialog = QCheckBox("Alarm window")
+        self.alarm_dialog.setChecked(self.notification_settings.get('alarm_dialog', False))
+        settings_layout.addWidget(self.alarm_dialog)
+        
         # Snooze duration
         settings_layout.addWidget(QLabel("Snooze:"))
         self.snooze_duration = QSpinBox()
@@ -775,6 +790,45 @@ class SettingsDialog(QDialog):
         
         settings_layout.addStretch()
         sound_layout.addWidget(settings_row)
+        
+        # Adhan file, volume and fade-in
+        adhan_row = QWidget()
+        adhan_layout = QHBoxLayout(adhan_row)
+        adhan_layout.setSpacing(10)
+        
+        adhan_layout.addWidget(QLabel("Adhan:"))
+        self.adhan_file = QLineEdit(self.notification_settings.get('adhan_file', ''))
+        self.adhan_file.setPlaceholderText("System sound")
+        adhan_layout.addWidget(self.adhan_file)
+        
+        browse_btn = QPushButton("📂")
+        browse_btn.setProperty("class", "cancel_button")
+        browse_btn.setToolTip("Choose an adhan or alarm sound")
+        browse_btn.clicked.connect(self.choose_adhan_file)
+        browse_btn.setCursor(Qt.PointingHandCursor)
+        adhan_layout.addWidget(browse_btn)
+        
+        adhan_layout.addWidget(QLabel("Volume:"))
+        self.sound_volume = QSpinBox()
+        self.sound_volume.setProperty("class", "iqama_input")
+        self.sound_volume.setMinimum(0)
+        self.sound_volume.setMaximum(100)
+        self.sound_volume.setValue(self.notification_settings.get('sound_volume', 100))
+        self.sound_volume.setSuffix(" %")
+        self.sound_volume.setFixedWidth(100)
+        adhan_layout.addWidget(self.sound_volume)
+        
+        adhan_layout.addWidget(QLabel("Fade in:"))
+        self.volume_ramp = QSpinBox()
+        self.volume_ramp.setProperty("class", "iqama_input")
+        self.volume_ramp.setMinimum(0)
+        self.volume_ramp.setMaximum(60)
+        self.volume_ramp.setValue(self.notification_settings.get('volume_ramp_seconds', 0))
+        self.volume_ramp.setSuffix(" s")
+        self.volume_ramp.setFixedWidth(100)
+        adhan_layout.addWidget(self.volume_ramp)
+        
+        sound_layout.addWidget(adhan_row)
         layout.addWidget(sound_section)
         
         # Buttons section
@@ -806,25 +860,19 @@ class SettingsDialog(QDialog):
     
     def load_notification_settings(self):
         """Load saved notification settings"""
-        try:
-            if os.path.exists(self.notifications_config_file):
-                with open(self.notifications_config_file, 'r') as f:
-                    settings = json.load(f)
-                print(f"Loaded notification settings: {settings}")
-                return settings
-        except Exception as e:
-            print(f"Could not load notification settings: {e}")
-        print("Using default notification settings")
-        return {}
+        return self.config.notification_settings()
     
     def save_notification_settings(self):
         """Save notification settings to config"""
         try:
-            os.makedirs(self.config_dir, exist_ok=True)
             notification_data = {
                 'sound_enabled': self.sound_enabled.isChecked(),
                 'snooze_duration': self.snooze_duration.value(),
-                'notification_interval': self.notification_interval.value()
+                'notification_interval': self.notification_interval.value(),
+                'pre_alert_minutes': self.notification_settings.get('pre_alert_minutes', 0),
+                'alarm_dialog': self.alarm_dialog.isChecked(),
+                'missed_prayer_notice': self.notification_settings.get('missed_prayer_notice', True),
+                **self.sound_settings()
             }
             
             for prayer, inputs in self.notification_inputs.items():
@@ -833,10 +881,9 @@ class SettingsDialog(QDialog):
                     'repeat_count': inputs['repeat_count'].value()
                 }
             
-            with open(self.notifications_config_file, 'w') as f:
-                json.dump(notification_data, f, indent=2)
+            self.config.replace('notifications', notification_data)
             
-            print(f"Notification settings saved to: {self.notifications_config_file}")
+            print(f"Notification settings saved to: {self.config.path('notifications')}")
             print(f"Settings: {notification_data}")
         except Exception as e:
             print(f"Could not save notification settings: {e}")
@@ -850,62 +897,66 @@ class SettingsDialog(QDialog):
         
         # Reset sound settings
         self.sound_enabled.setChecked(True)
+        self.alarm_dialog.setChecked(False)
         self.snooze_duration.setValue(5)
         self.notification_interval.setValue(2)
+        self.adhan_file.clear()
+        self.sound_volume.setValue(100)
+        self.volume_ramp.setValue(0)
+    
+    def sound_settings(self):
+        """Sound settings as currently entered in the dialog"""
+        return {
+            'adhan_file': self.adhan_file.text().strip(),
+            'sound_volume': self.sound_volume.value(),
+            'volume_ramp_seconds': self.volume_ramp.value()
+        }
+    
+    def choose_adhan_file(self):
+        """Pick a custom adhan/alarm sound file"""
+        path, _ = QFileDialog.getOpenFileName(
+            self, "Choose Adhan Sound", os.path.expanduser('~'),
+            "Audio files (*.wav *.oga *.ogg *.mp3 *.flac);;All files (*)")
+        if path:
+            self.adhan_file.setText(path)
     
     def test_notification(self):
         """Test the notification system"""
         try:
-            import subprocess
             from datetime import datetime
             current_time = datetime.now().strftime("%H:%M")
+            notifier = get_notifier()
             
-            # Play sound FIRST if enabled
+            # Play sound FIRST if enabled, with the settings as entered
             if self.sound_enabled.isChecked():
-                try:
-                    subprocess.run(['paplay', '/usr/share/sounds/freedesktop/stereo/alarm-clock-elapsed.oga'], 
-                                 check=False, timeout=3)
-                except:
-                    try:
-                        subprocess.run(['paplay', '/usr/share/sounds/freedesktop/stereo/message-new-instant.oga'], 
-                                     check=False, timeout=3)
-                    except:
-                        print('\a')  # Fallback beep
+                audio = get_audio()
+                audio.configure(self.sound_settings())
+                audio.play()
             
             # Send test system notification with actions AFTER sound
-            subprocess.Popen([
-                'notify-send',
+            notifier.notify(
                 '🔔 Test Prayer Time',
                 f'This is a test notification\nTime: {current_time}\nSound: {"Enabled" if self.sound_enabled.isChecked() else "Disabled"}',
-                '--urgency=critical',
-                '--expire-time=0',  # Don't auto-expire for testing
-                '--icon=appointment-soon',
-                '--action=stop=⏹️ Stop'
-            ], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                urgency='critical',
+                expire_ms=0,  # Don't auto-expire for testing
+                actions=[('stop', '⏹️ Stop')]
+            )
             
         except Exception as e:
             QMessageBox.warning(self, "Test Failed", f"Could not test notification: {e}")
     
     def load_iqama_times(self):
         """Load saved Iqama times"""
-        try:
-            if os.path.exists(self.iqama_config_file):
-                with open(self.iqama_config_file, 'r') as f:
-                    return json.load(f)
-        except Exception as e:
-            print(f"Could not load Iqama times: {e}")
-        return {}
+        return self.config.iqama_delays()
     
     def save_iqama_times(self):
         """Save Iqama times to config"""
         try:
-            os.makedirs(self.config_dir, exist_ok=True)
             iqama_data = {}
             for prayer, input_widget in self.iqama_inputs.items():
                 iqama_data[prayer] = input_widget.value()
             
-            with open(self.iqama_config_file, 'w') as f:
-                json.dump(iqama_data, f, indent=2)
+            self.config.replace('iqama', iqama_data)
         except Exception as e:
             print(f"Could not save Iqama times: {e}")
     
@@ -922,9 +973,8 @@ class SettingsDialog(QDialog):
     def restore_geometry(self):
         """Restore window geometry from saved settings"""
         try:
-            if os.path.exists(self.geometry_file):
-                with open(self.geometry_file, 'r') as f:
-                    geometry = json.load(f)
+            geometry = self.config.get('settings_geometry')
+            if geometry:
                 self.resize(geometry.get('width', 450), geometry.get('height', 550))
                 if 'x' in geometry and 'y' in geometry:
                     self.move(geometry['x'], geometry['y'])
@@ -934,22 +984,21 @@ class SettingsDialog(QDialog):
     def save_geometry(self):
         """Save current window geometry"""
         try:
-            os.makedirs(self.config_dir, exist_ok=True)
             geometry = {
                 'width': self.width(),
                 'height': self.height(),
                 'x': self.x(),
                 'y': self.y()
             }
-            with open(self.geometry_file, 'w') as f:
-                json.dump(geometry, f)
+            self.config.replace('settings_geometry', geometry)
         except Exception as e:
             print(f"Could not save settings geometry: {e}")
     
     def accept(self):
         """Save settings when OK is clicked"""
-        self.save_iqama_times()
-        self.save_notification_settings()
+        with self.config.batch():
+            self.save_iqama_times()
+            self.save_notification_settings()
         super().accept()
     
     def closeEvent(self, event):
@@ -1224,101 +1273,74 @@ class CitySelectionDialog(QDialog):
         return 'Tangier'
 
 class OfflineSunriseCalculator:
+    # Solar events memoized per (city, date); entries from earlier days are
+    # dropped at the first lookup after midnight
+    _solar_cache = {}
+    _solar_cache_day = None
+    
+    @staticmethod
+    def get_solar_events(city_name, date):
+        """Cached offline prayer times for a city and date"""
+        day = date.date() if isinstance(date, datetime) else date
+        cache = OfflineSunriseCalculator._solar_cache
+        key = (city_name, day)
+        if key in cache:
+            return cache[key]
+        
+        today = datetime.now().date()
+        if OfflineSunriseCalculator._solar_cache_day != today:
+            for old_key in [k for k in cache if k[1] < today]:
+                del cache[old_key]
+            OfflineSunriseCalculator._solar_cache_day = today
+        
+        cache[key] = OfflineSunriseCalculator.calculate_all_prayer_times(city_name, day)
+        return cache[key]
+    
+    @staticmethod
+    def invalidate(city_name=None):
+        """Forget cached solar events (for one city, or all)"""
+        cache = OfflineSunriseCalculator._solar_cache
+        for key in [k for k in cache if city_name is None or k[0] == city_name]:
+            del cache[key]
+    
     @staticmethod
     def calculate_sunrise(city_name, date):
-        """Calculate sunrise time offline using astronomical formulas"""
-        try:
-            if city_name not in CITIES or 'lat' not in CITIES[city_name]:
-                print(f"Debug: City {city_name} not found or no coordinates")
-                return None
-            
-            lat = CITIES[city_name]['lat']
-            lon = CITIES[city_name]['lon']
-            print(f"Debug: Calculating for {city_name} at {lat}, {lon}")
-            
-            # Get day of year
-            day_of_year = date.timetuple().tm_yday
-            print(f"Debug: Day of year: {day_of_year}")
-            
-            # Calculate solar declination (δ)
-            declination = 23.44 * math.sin(math.radians(360 * (284 + day_of_year) / 365))
-            print(f"Debug: Declination: {declination}")
-            
-            # Convert latitude to radians
-            lat_rad = math.radians(lat)
-            decl_rad = math.radians(declination)
-            
-            # Calculate hour angle (ω) for sunrise
-            cos_hour_angle = -math.tan(lat_rad) * math.tan(decl_rad)
-            print(f"Debug: cos_hour_angle: {cos_hour_angle}")
-            
-            # Check if sun rises (polar regions might not have sunrise/sunset)
-            if cos_hour_angle < -1 or cos_hour_angle > 1:
-                print(f"Debug: No sunrise/sunset for this location and date")
-                return None
-                
-            hour_angle = math.degrees(math.acos(cos_hour_angle))
-            print(f"Debug: Hour angle: {hour_angle}")
-            
-            # Morocco timezone offset (UTC+1, no DST)
-            timezone_offset = 1
-            
-            # Compute solar noon
-            solar_noon = 12 - (lon / 15 - timezone_offset)
-            print(f"Debug: Solar noon: {solar_noon}")
-            
-            # Compute sunrise time
-            sunrise_time = solar_noon - (hour_angle / 15)
-            print(f"Debug: Sunrise time (decimal): {sunrise_time}")
-            
-            # Convert to hours and minutes
-            hours = int(sunrise_time)
-            minutes = int((sunrise_time - hours) * 60)
-            
-            # Handle negative hours (previous day)
-            if hours < 0:
-                hours += 24
-            
-            # Ensure valid time format
-            hours = hours % 24
-            minutes = max(0, min(59, minutes))
-            
-            result = f"{hours:02d}:{minutes:02d}"
-            result = f"{hours:02d}:{minutes:02d}"
-            print(f"Debug: Final sunrise time: {result}")
-            return result
-            
-        except Exception as e:
-            print(f"Debug: Error in calculation: {e}")
+        """Sunrise (Chorok) for a city and date, computed once per day"""
+        events = OfflineSunriseCalculator.get_solar_events(city_name, date)
+        if not events or events.get('Sunrise') == '--:--':
             return None
+        return events['Sunrise']
     
     @staticmethod
     def calculate_all_prayer_times(city_name, date):
-        """Calculate all prayer times for a city and date"""
-        sunrise = OfflineSunriseCalculator.calculate_sunrise(city_name, date)
-        if not sunrise:
+        """Calculate all prayer times for a city and date (Habous conventions)"""
+        if city_name not in CITIES or 'lat' not in CITIES[city_name]:
+            return None
+        city = CITIES[city_name]
+        try:
+            return prayer_calc.compute_prayer_times(city['lat'], city['lon'], date)
+        except Exception as e:
+            print(f"Error calculating prayer times for {city_name}: {e}")
             return None
-        
-        # For now, return sunrise as Chorok
-        # This can be extended to calculate other prayer times
-        return {
-            'Date': date.strftime('%d/%m'),
-            'Sunrise': sunrise,
-            # Other prayers would be calculated here
-            # For now, we'll still use web scraping for full prayer times
-        }
 
 class PrayerTimeWorker(QThread):
     data_received = pyqtSignal(dict)
     error_occurred = pyqtSignal(str)
     offline_data_loaded = pyqtSignal(dict, int)  # prayer_times, days_remaining
+    city_updated = pyqtSignal(str)  # city name, emitted once its new data is saved
+    
+    BACKFILL_WORKERS = 2
     
     def __init__(self, city_id=101, city_name="Tangier"):
         super().__init__()
         self.city_id = city_id
         self.city_name = city_name
         self.data_folder = os.path.join(os.path.expanduser('~'), '.salah_times', 'cities')
-        self.storage_file = os.path.join(self.data_folder, f'{city_name.lower()}.json')
+        self.validators_file = os.path.join(self.data_folder, 'validators.json')
+        self.store = get_store()
+        self.cache_format = self.get_cache_format()
+        self.last_refresh_seconds = None
+        self.last_refresh_stats = None
     
     def run(self):
         # Always load cached data first (fast)
@@ -1330,11 +1352,10 @@ class PrayerTimeWorker(QThread):
     
     def load_cached_data_immediately(self):
         """Load cached data instantly without waiting"""
-        today = datetime.now().strftime('%d/%m')
-        offline_data = self.load_offline_data()
+        today_times = self.load_offline_data()
         
-        if offline_data and today in offline_data['prayer_times']:
-            self.data_received.emit(offline_data['prayer_times'][today])
+        if today_times:
+            self.data_received.emit(today_times)
         else:
             # No cached data, force update
             self.force_update_data()
@@ -1342,14 +1363,10 @@ class PrayerTimeWorker(QThread):
     def should_update_data(self):
         """Check if data needs updating based on last scrape time"""
         try:
-            config_folder = os.path.join(os.path.expanduser('~'), '.salah_times', 'config')
-            update_file = os.path.join(config_folder, 'last_update.json')
-            if not os.path.exists(update_file):
+            update_info = get_config().get('last_update')
+            if 'last_update' not in update_info:
                 return True
             
-            with open(update_file, 'r') as f:
-                update_info = json.load(f)
-            
             last_update = datetime.fromisoformat(update_info['last_update'])
             now = datetime.now()
             
@@ -1368,25 +1385,35 @@ class PrayerTimeWorker(QThread):
                 print(f"Background update failed: {e}")
     
     def force_update_data(self):
-        """Force update when no cached data exists"""
-        if self.check_internet_connection():
+        """Force update when no cached data exists.
+
+        The selected city is fetched and emitted first; the other cities are
+        backfilled afterwards at low priority.
+        """
+        try:
+            fetcher = self.create_fetcher()
             try:
-                self.update_all_cities_data()
-                self.save_update_timestamp()
-                
-                # Load today's data
-                today = datetime.now().strftime('%d/%m')
-                offline_data = self.load_offline_data()
-                if offline_data and today in offline_data['prayer_times']:
-                    self.data_received.emit(offline_data['prayer_times'][today])
-                else:
-                    self.error_occurred.emit("No prayer times found for today")
-            except Exception as e:
-                # Fallback to offline calculation
-                self.try_offline_calculation()
-        else:
-            # No internet: try offline calculation
+                today_times = self.update_city_data(fetcher, self.city_name)
+            finally:
+                fetcher.close()
+        except Exception as e:
+            # No internet or fetch failed: fallback to offline calculation
+            print(f"Could not fetch {self.city_name}: {e}")
             self.try_offline_calculation()
+            return
+        
+        if today_times:
+            self.data_received.emit(today_times)
+        else:
+            self.error_occurred.emit("No prayer times found for today")
+        
+        # Backfill the remaining cities without competing with the UI
+        self.setPriority(QThread.LowPriority)
+        try:
+            self.update_all_cities_data(skip={self.city_name}, max_workers=self.BACKFILL_WORKERS)
+            self.save_update_timestamp()
+        except Exception as e:
+            print(f"Background backfill failed: {e}")
     
     def try_offline_calculation(self):
         """Try to calculate prayer times offline"""
@@ -1395,18 +1422,7 @@ class PrayerTimeWorker(QThread):
             calculated_times = OfflineSunriseCalculator.calculate_all_prayer_times(self.city_name, today)
             
             if calculated_times:
-                # For now, we only have sunrise calculation
-                # Show partial data with calculated sunrise
-                partial_times = {
-                    'Date': today.strftime('%d/%m'),
-                    'Fajr': '--:--',
-                    'Sunrise': calculated_times['Sunrise'],
-                    'Dohr': '--:--',
-                    'Asr': '--:--',
-                    'Maghreb': '--:--',
-                    'Isha': '--:--'
-                }
-                self.offline_data_loaded.emit(partial_times, 0)
+                self.offline_data_loaded.emit(calculated_times, 0)
             else:
                 self.error_occurred.emit("No internet connection and calculation failed")
         except Exception as e:
@@ -1415,17 +1431,16 @@ class PrayerTimeWorker(QThread):
     def save_update_timestamp(self):
         """Save when we last updated the data"""
         try:
-            config_folder = os.path.join(os.path.expanduser('~'), '.salah_times', 'config')
-            os.makedirs(config_folder, exist_ok=True)
-            update_file = os.path.join(config_folder, 'last_update.json')
-            
             update_info = {
                 'last_update': datetime.now().isoformat(),
                 'cities_updated': len(CITIES)
             }
+            if self.last_refresh_seconds is not None:
+                update_info['refresh_seconds'] = round(self.last_refresh_seconds, 2)
+            if self.last_refresh_stats is not None:
+                update_info['refresh_stats'] = self.last_refresh_stats
             
-            with open(update_file, 'w') as f:
-                json.dump(update_info, f, indent=2)
+            get_config().replace('last_update', update_info)
         except Exception as e:
             print(f"Could not save update timestamp: {e}")
     
@@ -1441,124 +1456,226 @@ class PrayerTimeWorker(QThread):
         except:
             return False
     
-    def update_all_cities_data(self):
-        """Update prayer times for all cities"""
+    def get_fetch_settings(self):
+        """Concurrency cap and request rate for the all-cities refresh"""
+        config = get_config().get('app')
+        return {'fetch_concurrency': config['fetch_concurrency'], 'fetch_rate': config['fetch_rate']}
+    
+    def get_cache_format(self):
+        """'sqlite' (default) or 'binary' to also keep mmap timetables for low-memory readers"""
+        return get_config().value('app', 'cache_format', 'sqlite')
+    
+    def get_timetable(self):
+        """This city's binary timetable, exported from the store if missing"""
+        timetable = open_timetable(self.city_name)
+        if timetable is None and export_city(self.store, self.city_name):
+            timetable = open_timetable(self.city_name)
+        return timetable
+    
+    def parse_city_page(self, html):
+        """Parse the yabiladi monthly table into {date: {header: value}}"""
+        return parse_prayer_table(html)
+    
+    def save_city_data(self, city_name, all_prayer_times):
+        """Upsert a city's scraped days into the prayer time store"""
+        self.save_cities_data({city_name: all_prayer_times})
+    
+    def save_cities_data(self, cities_data):
+        """Write {city: prayer times} to the store as one snapshot"""
+        self.store.upsert_cities(cities_data)
+        if self.cache_format == 'binary':
+            for city_name in cities_data:
+                export_city(self.store, city_name)
+    
+    def create_fetcher(self, max_workers=None):
+        settings = self.get_fetch_settings()
+        return CityFetcher(max_workers=max_workers or settings['fetch_concurrency'],
+                           rate_per_second=settings['fetch_rate'])
+    
+    def load_validators(self):
+        """Load per-city ETag / Last-Modified / body hash validators"""
+        try:
+            if os.path.exists(self.validators_file):
+                with open(self.validators_file, 'r') as f:
+                    return json.load(f)
+        except Exception as e:
+            print(f"Could not load validators: {e}")
+        return {}
+    
+    def save_validators(self, validators):
+        try:
+            write_json(self.validators_file, validators)
+        except Exception as e:
+            print(f"Could not save validators: {e}")
+    
+    def get_conditional_request(self, city_name, validators):
+        """Build (url, headers) for a city, conditional if we hold its cache"""
+        url = YABILADI_CITY_URL.format(CITIES[city_name]['id'])
+        city_validators = validators.get(city_name, {})
+        headers = {}
+        if self.store.has_city(city_name):
+            if city_validators.get('etag'):
+                headers['If-None-Match'] = city_validators['etag']
+            if city_validators.get('last_modified'):
+                headers['If-Modified-Since'] = city_validators['last_modified']
+        return url, headers
+    
+    def process_city_response(self, city_name, response, validators, pending=None):
+        """Save a fetched city page unless it is unchanged.
+
+        With a pending dict the parsed times are staged there for a later
+        save_cities_data instead of being written right away. Returns
+        'not_modified', 'unchanged', 'parsed' or None on failure.
+        """
+        if response.status_code == 304:
+            return 'not_modified'
+        
+        body_hash = hashlib.sha256(response.content).hexdigest()
+        old_validators = validators.get(city_name, {})
+        new_validators = {
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'body_hash': body_hash
+        }
+        
+        if old_validators.get('body_hash') == body_hash and self.store.has_city(city_name):
+            validators[city_name] = new_validators
+            return 'unchanged'
+        
+        all_prayer_times = self.parse_city_page(response.text)
+        if not all_prayer_times:
+            return None
+        if pending is None:
+            self.save_city_data(city_name, all_prayer_times)
+        else:
+            pending[city_name] = all_prayer_times
+        validators[city_name] = new_validators
+        return 'parsed'
+    
+    def update_city_data(self, fetcher, city_name):
+        """Fetch, parse and save one city, returning today's prayer times"""
+        os.makedirs(self.data_folder, exist_ok=True)
+        validators = self.load_validators()
+        url, headers = self.get_conditional_request(city_name, validators)
+        response = fetcher.fetch(url, headers)
+        status = self.process_city_response(city_name, response, validators)
+        if status is None:
+            return None
+        
+        self.save_validators(validators)
+        if status == 'parsed':
+            self.city_updated.emit(city_name)
+        return self.store.get_day(city_name, datetime.now().date())
+    
+    def update_all_cities_data(self, skip=(), max_workers=None):
+        """Update prayer times for all cities concurrently"""
         os.makedirs(self.data_folder, exist_ok=True)
         
-        for city_name, city_data in CITIES.items():
-            try:
-                city_id = city_data['id']
-                url = f'https://www.yabiladi.com/prieres/details/{city_id}/city.html'
-                response = requests.get(url, timeout=10)
-                response.raise_for_status()
-                
-                soup = BeautifulSoup(response.text, 'html.parser')
-                prayer_table = soup.find('table')
-                
-                if prayer_table:
-                    headers = [header.text.strip() for header in prayer_table.find_all('th')]
-                    rows = prayer_table.find_all('tr')[1:]
-                    
-                    all_prayer_times = {}
-                    for row in rows:
-                        columns = row.find_all('td')
-                        if columns:
-                            date = columns[0].text.strip()
-                            prayer_data = {}
-                            for header, col in zip(headers, columns):
-                                prayer_data[header] = col.text.strip()
-                            all_prayer_times[date] = prayer_data
-                    
-                    # Save city data to cities subfolder
-                    city_file = os.path.join(self.data_folder, f'{city_name.lower()}.json')
-                    city_data_obj = {
-                        'city': city_name,
-                        'last_updated': datetime.now().isoformat(),
-                        'prayer_times': all_prayer_times
-                    }
-                    
-                    with open(city_file, 'w', encoding='utf-8') as f:
-                        json.dump(city_data_obj, f, ensure_ascii=False, indent=2)
-                        
-            except Exception as e:
-                print(f"Error updating {city_name}: {e}")
-                continue
+        fetcher = self.create_fetcher(max_workers)
+        validators = self.load_validators()
+        validators_lock = threading.Lock()
+        urls = {city_name: self.get_conditional_request(city_name, validators)
+                for city_name in CITIES if city_name not in skip}
+        stats = {'not_modified': 0, 'unchanged': 0, 'parsed': 0}
+        pending = {}
+        
+        def handle_result(city_name, result):
+            if isinstance(result, Exception):
+                print(f"Error updating {city_name}: {result}")
+                return
+            with validators_lock:
+                city_validators = {city_name: validators.get(city_name, {})}
+            city_pending = {}
+            status = self.process_city_response(city_name, result, city_validators, city_pending)
+            if status is None:
+                return
+            with validators_lock:
+                validators.update(city_validators)
+                pending.update(city_pending)
+                stats[status] += 1
+        
+        try:
+            fetcher.fetch_all(urls, on_result=handle_result)
+        finally:
+            fetcher.close()
+        
+        # One snapshot for the whole refresh, then the validators that describe it
+        if pending:
+            self.save_cities_data(pending)
+        self.save_validators(validators)
+        for city_name in pending:
+            self.city_updated.emit(city_name)
+        
+        self.last_refresh_seconds = fetcher.last_elapsed
+        self.last_refresh_stats = stats
+        revalidated = stats['not_modified'] + stats['unchanged']
+        print(f"Updated {sum(stats.values())}/{len(urls)} cities in {fetcher.last_elapsed:.2f}s "
+              f"({fetcher.max_workers} workers): {revalidated} revalidated "
+              f"({stats['not_modified']} not modified, {stats['unchanged']} same hash), "
+              f"{stats['parsed']} parsed")
     
     def load_offline_mode(self, error_msg):
         """Load offline data or show error"""
-        if not os.path.exists(self.data_folder):
+        if not self.store.has_city(self.city_name):
             self.error_occurred.emit("No internet connection and no offline data available")
             return
             
-        offline_data = self.load_offline_data()
-        if offline_data:
-            today = datetime.now().strftime('%d/%m')
-            if today in offline_data['prayer_times']:
-                days_remaining = self.calculate_days_remaining(offline_data['prayer_times'])
-                self.offline_data_loaded.emit(offline_data['prayer_times'][today], days_remaining)
-            else:
-                self.error_occurred.emit(f"Offline mode: No data for today")
+        today_times = self.load_offline_data()
+        if today_times:
+            self.offline_data_loaded.emit(today_times, self.calculate_days_remaining())
         else:
-            self.error_occurred.emit("No internet connection and no offline data available")
+            self.error_occurred.emit(f"Offline mode: No data for today")
     
 
     
     def load_offline_data(self):
+        """Today's cached prayer times for this city, or None"""
         try:
-            if os.path.exists(self.storage_file):
-                with open(self.storage_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+            if self.cache_format == 'binary':
+                timetable = self.get_timetable()
+                if timetable is not None:
+                    return timetable.times(datetime.now().date())
+            return get_city_cache().get_day(self.city_name, datetime.now().date())
         except Exception as e:
             print(f"Error loading offline data: {e}")
         return None
     
-    def calculate_days_remaining(self, prayer_times):
+    def calculate_days_remaining(self):
+        """Days of cached data left, counting today"""
         try:
-            today = datetime.now()
-            dates = list(prayer_times.keys())
-            
-            # Convert dates to datetime objects for comparison
-            date_objects = []
-            for date_str in dates:
-                try:
-                    day, month = map(int, date_str.split('/'))
-                    year = today.year
-                    # Handle year transition
-                    if month < today.month or (month == today.month and day < today.day):
-                        year += 1
-                    date_objects.append(datetime(year, month, day))
-                except:
-                    continue
-            
-            if date_objects:
-                last_date = max(date_objects)
-                days_remaining = (last_date - today).days + 1
-                return max(0, days_remaining)
-        except:
-            pass
+            if self.cache_format == 'binary':
+                timetable = self.get_timetable()
+                if timetable is not None:
+                    return timetable.days_remaining(datetime.now().date())
+            return self.store.days_remaining(self.city_name, datetime.now().date())
+        except Exception as e:
+            print(f"Error reading cached range: {e}")
         return 0
 
 class ModernSalahApp(QMainWindow):
     def __init__(self):
         super().__init__()
         self.prayer_times = {}
+        self.timeline = None
         self.current_prayer = None
         self.is_offline = False
         self.days_remaining = 0
-        self.config_dir = os.path.join(os.path.expanduser('~'), '.salah_times', 'config')
-        self.config_file = os.path.join(self.config_dir, 'app_config.json')
-        self.geometry_file = os.path.join(self.config_dir, 'main_geometry.json')
-        self.iqama_config_file = os.path.join(self.config_dir, 'iqama_times.json')
-        self.notifications_config_file = os.path.join(self.config_dir, 'notifications.json')
-        self.ensure_iqama_config_exists()
-        self.ensure_notifications_config_exists()
+        self.config = get_config()
+        self.config.ensure_defaults('iqama', 'notifications')
         self.current_language = self.load_language_config()
         self.current_city = self.load_city_config()
         self.tray_icon = None
         
+        # The on-screen countdown shows seconds; it only ticks while the
+        # window is visible (started in showEvent)
         self.timer = QTimer()
         self.timer.timeout.connect(self.update_countdown)
-        self.timer.start(1000)  # Update every second
+        
+        # Re-arm the countdowns after a suspend, clock step or time zone change
+        self.clock_monitor = ClockMonitor(parent=self)
+        self.clock_monitor.clock_jumped.connect(self.on_clock_jumped)
+        self.clock_monitor.listen_for_sleep()
+        self.clock_monitor.start()
         
         self.init_ui()
         self.restore_geometry()
@@ -1568,25 +1685,11 @@ class ModernSalahApp(QMainWindow):
         QTimer.singleShot(2000, self.start_tray_indicator)
         
     def load_language_config(self):
-        os.makedirs(self.config_dir, exist_ok=True)
-        if os.path.exists(self.config_file):
-            try:
-                with open(self.config_file, 'r') as f:
-                    config = json.load(f)
-                    return config.get('language', 'en')
-            except:
-                pass
-        return 'en'
+        return self.config.value('app', 'language', 'en')
     
     def load_city_config(self):
-        os.makedirs(self.config_dir, exist_ok=True)
-        if os.path.exists(self.config_file):
-            try:
-                with open(self.config_file, 'r') as f:
-                    config = json.load(f)
-                    return config.get('city', 'Tangier')
-            except:
-                pass
+        if os.path.exists(self.config.path('app')):
+            return self.config.value('app', 'city', 'Tangier')
         
         # First time - show city selection
         dialog = CitySelectionDialog(self.current_language)
@@ -1598,13 +1701,11 @@ class ModernSalahApp(QMainWindow):
             return 'Tangier'  # Default fallback
     
     def save_config(self, city, language):
-        config = {'city': city, 'language': language}
         try:
-            os.makedirs(self.config_dir, exist_ok=True)
-            with open(self.config_file, 'w') as f:
-                json.dump(config, f)
-        except:
-            pass
+            # Merge so other app settings (fetch rate, cache format) survive
+            self.config.update('app', {'city': city, 'language': language})
+        except Exception as e:
+            print(f"Could not save config: {e}")
     
     def show_settings(self):
         dialog = SettingsDialog(self.current_city, self.current_language)
@@ -1612,6 +1713,7 @@ class ModernSalahApp(QMainWindow):
         if dialog.exec_() == QDialog.Accepted:
             new_city = dialog.get_selected_city()
             new_language = dialog.get_selected_language()
+            self.timeline = None  # Iqama delays may have changed
             
             if new_city != self.current_city or new_language != self.current_language:
                 old_city = self.current_city
@@ -1620,10 +1722,11 @@ class ModernSalahApp(QMainWindow):
                 self.save_config(new_city, new_language)
                 self.update_ui_language()
                 if new_city != old_city:
+                    OfflineSunriseCalculator.invalidate(old_city)
                     self.prayer_times = {}
                     self.load_prayer_times()
                 if self.tray_icon:
-                    self.create_tray_menu()
+                    self.update_tray_menu()
                     self.update_tray_tooltip()
         
     def init_ui(self):
@@ -1696,7 +1799,7 @@ class ModernSalahApp(QMainWindow):
                 margin: 5px;
             }
             
-            .prayer_card_current {
+            .prayer_card[current="true"] {
                 background: qlineargradient(x1:0, y1:0, x2:1, y2:0,
                     stop:0 #4CAF50, stop:1 #45a049);
                 border-radius: 15px;
@@ -1711,7 +1814,7 @@ class ModernSalahApp(QMainWindow):
                 border: none;
             }
             
-            .prayer_card_current QLabel {
+            .prayer_card[current="true"] QLabel {
                 color: white;
                 font-family: 'Segoe UI', Arial, sans-serif;
                 background: transparent;
@@ -1733,6 +1836,10 @@ class ModernSalahApp(QMainWindow):
                 font-weight: bold;
             }
             
+            .prayer_card .prayer_time[error="true"] {
+                color: #ff4444;
+            }
+            
             .title_text {
                 color: #2d5a27;
                 font-size: 28px;
@@ -1822,9 +1929,9 @@ class ModernSalahApp(QMainWindow):
             }
             
             .iqama_text {
-                color: #FFD700;
+                color: #90EE90;
                 font-size: 14px;
-                font-weight: 500;
+                font-weight: bold;
             }
         """
         
@@ -1904,67 +2011,10 @@ class ModernSalahApp(QMainWindow):
         return card
     
     def create_prayer_grid(self):
-        container = QWidget()
-        
-        # Create grid layout
-        grid = QGridLayout(container)
-        grid.setContentsMargins(0, 0, 0, 0)
-        grid.setSpacing(10)
-        
-        # Make rows and columns stretch equally
-        for i in range(3):  # 3 rows
-            grid.setRowStretch(i, 1)
-        for i in range(2):  # 2 columns
-            grid.setColumnStretch(i, 1)
-        
-        # Store prayer cards for updates
-        self.prayer_cards = {}
-        
-        # Create placeholder cards (use Chorok instead of Sunrise)
-        prayers = ['Fajr', 'Chorok', 'Dohr', 'Asr', 'Maghreb', 'Isha']
-        icons = {'Fajr': '☽', 'Chorok': '☀', 'Dohr': '☉', 
-                'Asr': '☀', 'Maghreb': '☾', 'Isha': '★'}
-        
-        for i, prayer in enumerate(prayers):
-            card = self.create_prayer_card_widget(prayer, icons[prayer], "--:--")
-            row = i // 2
-            col = i % 2
-            grid.addWidget(card, row, col)
-            self.prayer_cards[prayer] = card
-        
-        return container
-    
-    def create_prayer_card_widget(self, prayer_name, icon, time, is_current=False):
-        card = QWidget()
-        card.setProperty("class", "prayer_card_current" if is_current else "prayer_card")
-        
-        layout = QVBoxLayout(card)
-        layout.setContentsMargins(12, 10, 12, 10)
-        layout.setSpacing(5)
-        
-        # Icon and name row
-        top_layout = QHBoxLayout()
-        
-        icon_label = QLabel(icon)
-        icon_label.setProperty("class", "prayer_icon")
-        top_layout.addWidget(icon_label)
-        
-        name_label = QLabel(self.tr_prayer(prayer_name))
-        name_label.setProperty("class", "prayer_name")
-        name_label.setWordWrap(True)
-        top_layout.addWidget(name_label)
-        
-        top_layout.addStretch()
-        layout.addLayout(top_layout)
-        
-        # Time
-        time_label = QLabel(time)
-        time_label.setProperty("class", "prayer_time")
-        time_label.setAlignment(Qt.AlignCenter)
-        time_label.setWordWrap(True)
-        layout.addWidget(time_label)
-        
-        return card
+        # Cards keep direct label references and only push changed text
+        self.prayer_grid = PrayerGrid(self.tr_prayer)
+        self.prayer_cards = self.prayer_grid.cards
+        return self.prayer_grid.widget
     
     def create_next_prayer_highlight(self):
         card = QWidget()
@@ -2221,21 +2271,20 @@ class ModernSalahApp(QMainWindow):
             self.hijri_date.setText(self.tr('hijri_approx').format(hijri_year))
     
     def load_prayer_times(self):
-        # Show loading state in prayer cards
-        for prayer in ['Fajr', 'Chorok', 'Dohr', 'Asr', 'Maghreb', 'Isha']:
-            if hasattr(self, 'prayer_cards') and prayer in self.prayer_cards:
-                # Update card to show loading
-                card = self.prayer_cards[prayer]
-                # Find the time label and update it
-                for child in card.findChildren(QLabel):
-                    if child.property("class") == "prayer_time":
-                        child.setText("...")
-        
         # Reset offline status
         self.is_offline = False
         self.days_remaining = 0
         self.update_offline_indicator()
         
+        # A warm city (e.g. switching back in Settings) is shown straight from memory
+        cached_times = get_city_cache().get_day(self.current_city, datetime.now().date())
+        if cached_times:
+            self.display_prayer_times(cached_times)
+        else:
+            # Show loading state in prayer cards
+            if hasattr(self, 'prayer_grid'):
+                self.prayer_grid.show_placeholder("...")
+        
         # Update refresh button text
         if hasattr(self, 'refresh_btn'):
             self.refresh_btn.setText("🔄 Loading...")
@@ -2246,6 +2295,7 @@ class ModernSalahApp(QMainWindow):
         self.worker.data_received.connect(self.display_prayer_times)
         self.worker.offline_data_loaded.connect(self.display_offline_prayer_times)
         self.worker.error_occurred.connect(self.show_error)
+        self.worker.city_updated.connect(self.on_city_updated)
         self.worker.start()
         
     def clear_prayer_layout(self):
@@ -2254,18 +2304,30 @@ class ModernSalahApp(QMainWindow):
                 
     def display_prayer_times(self, prayer_times):
         self.prayer_times = prayer_times
+        self.timeline = None
         self.is_offline = False
         self.update_offline_indicator()
         self._display_prayer_times_common(prayer_times)
     
+    def on_city_updated(self, city):
+        """Show a city's freshly saved times as soon as the worker stores them"""
+        get_city_cache().invalidate(city)
+        if city == self.current_city:
+            today_times = get_city_cache().get_day(city, datetime.now().date())
+            if today_times and today_times != self.prayer_times:
+                self.display_prayer_times(today_times)
+    
     def display_offline_prayer_times(self, prayer_times, days_remaining):
         self.prayer_times = prayer_times
+        self.timeline = None
         self.is_offline = True
         self.days_remaining = days_remaining
         self.update_offline_indicator()
         self._display_prayer_times_common(prayer_times)
     
     def _display_prayer_times_common(self, prayer_times):
+        if getattr(self, 'tray_ticker', None) is not None:
+            self.tray_ticker.start()  # the tick rate depends on the new times
         current_prayer = self.get_current_prayer()
         
         # Calculate Chorok locally using solar formula
@@ -2282,23 +2344,8 @@ class ModernSalahApp(QMainWindow):
         if calculated_chorok:
             display_times['Chorok'] = calculated_chorok
         
-        # Update prayer cards with new times and styling
-        for prayer, time in display_times.items():
-            if prayer in self.prayer_cards and prayer != 'Date':
-                card = self.prayer_cards[prayer]
-                is_current = (prayer == current_prayer or (prayer == 'Chorok' and current_prayer == 'Sunrise'))
-                
-                # Update card styling
-                card.setProperty("class", "prayer_card_current" if is_current else "prayer_card")
-                card.setStyleSheet(self.get_modern_stylesheet())  # Refresh styles
-                
-                # Update both prayer name and time text
-                for child in card.findChildren(QLabel):
-                    if child.property("class") == "prayer_name":
-                        child.setText(self.tr_prayer(prayer))  # Update translated name
-                    elif child.property("class") == "prayer_time":
-                        child.setText(time)
-                        child.setStyleSheet("")  # Clear any error styling
+        # Update prayer cards with new times and styling (changed labels only)
+        self.prayer_grid.show_times(display_times, 'Chorok' if current_prayer == 'Sunrise' else current_prayer)
         
         # Update refresh button
         if hasattr(self, 'refresh_btn'):
@@ -2313,7 +2360,7 @@ class ModernSalahApp(QMainWindow):
         
         # Update tray if it exists
         if self.tray_icon:
-            self.create_tray_menu()
+            self.update_tray_menu()
             self.update_tray_tooltip()
     
     def update_offline_indicator(self):
@@ -2366,110 +2413,47 @@ class ModernSalahApp(QMainWindow):
         if self.prayer_times:
             self.display_prayer_times(self.prayer_times)
         
+    def get_timeline(self):
+        """Today's DayTimeline (calculated Chorok instead of scraped Sunrise)"""
+        today = datetime.now().date()
+        if self.timeline is None or self.timeline.day != today:
+            display_times = {p: t for p, t in self.prayer_times.items() if p != 'Sunrise'}
+            if self.prayer_times:
+                calculated_chorok = OfflineSunriseCalculator.calculate_sunrise(self.current_city, today)
+                if calculated_chorok:
+                    display_times['Chorok'] = calculated_chorok
+            self.timeline = DayTimeline(display_times, self.load_iqama_times(), day=today)
+        return self.timeline
+    
     def get_current_prayer(self):
-        now = datetime.now()
-        current_time = now.hour * 60 + now.minute
-        
-        prayers = [name for name in self.prayer_times.keys() if name != 'Date']
-        
-        for i, prayer in enumerate(prayers):
-            if prayer in self.prayer_times:
-                prayer_time = self.parse_time(self.prayer_times[prayer])
-                next_prayer_time = None
-                
-                if i < len(prayers) - 1:
-                    next_prayer = prayers[i + 1]
-                    if next_prayer in self.prayer_times:
-                        next_prayer_time = self.parse_time(self.prayer_times[next_prayer])
-                else:
-                    next_prayer_time = 24 * 60
-                
-                if next_prayer_time and prayer_time <= current_time < next_prayer_time:
-                    return prayer
-        
-        return None
+        if not self.prayer_times:
+            return None
+        return self.get_timeline().current(seconds_since_midnight(datetime.now()))
         
-    def parse_time(self, time_str):
-        try:
-            hours, minutes = map(int, time_str.split(':'))
-            return hours * 60 + minutes
-        except:
-            return 0
-            
     def update_next_prayer(self):
-        now = datetime.now()
-        current_time = now.hour * 60 + now.minute
-        
-        prayers = [name for name in self.prayer_times.keys() if name != 'Date']
+        timeline = self.get_timeline()
+        if not timeline:
+            return
         
-        for prayer in prayers:
-            if prayer in self.prayer_times:
-                prayer_time = self.parse_time(self.prayer_times[prayer])
-                if prayer_time > current_time:
-                    self.next_name.setText(self.tr_prayer(prayer))
-                    self.next_time.setText(self.prayer_times[prayer])
-                    return
-        
-        if prayers and prayers[0] in self.prayer_times:
-            first_prayer = prayers[0]
-            self.next_name.setText(f"{self.tr_prayer(first_prayer)} ({self.tr('tomorrow')})")
-            self.next_time.setText(self.prayer_times[first_prayer])
-            
-    def ensure_iqama_config_exists(self):
-        """Create Iqama config with defaults if it doesn't exist"""
-        if not os.path.exists(self.iqama_config_file):
-            try:
-                os.makedirs(self.config_dir, exist_ok=True)
-                default_iqama = {'Fajr': 20, 'Dohr': 15, 'Asr': 15, 'Maghreb': 10, 'Isha': 15}
-                with open(self.iqama_config_file, 'w') as f:
-                    json.dump(default_iqama, f, indent=2)
-            except Exception as e:
-                print(f"Could not create default Iqama config: {e}")
-    
+        prayer, _, is_tomorrow = timeline.next(seconds_since_midnight(datetime.now()))
+        if is_tomorrow:
+            self.next_name.setText(f"{self.tr_prayer(prayer)} ({self.tr('tomorrow')})")
+        else:
+            self.next_name.setText(self.tr_prayer(prayer))
+        self.next_time.setText(timeline.text(prayer))
+            
     def load_iqama_times(self):
         """Load Iqama times from config"""
-        try:
-            with open(self.iqama_config_file, 'r') as f:
-                return json.load(f)
-        except Exception as e:
-            print(f"Could not load Iqama times: {e}")
-            return {'Fajr': 20, 'Dohr': 15, 'Asr': 15, 'Maghreb': 10, 'Isha': 15}
-    
-    def ensure_notifications_config_exists(self):
-        """Create notifications config with defaults if it doesn't exist"""
-        if not os.path.exists(self.notifications_config_file):
-            try:
-                os.makedirs(self.config_dir, exist_ok=True)
-                default_notifications = {
-                    'sound_enabled': True,
-                    'snooze_duration': 5,
-                    'notification_interval': 2,
-                    'Fajr': {'enabled': True, 'repeat_count': 3},
-                    'Dohr': {'enabled': True, 'repeat_count': 3},
-                    'Asr': {'enabled': True, 'repeat_count': 3},
-                    'Maghreb': {'enabled': True, 'repeat_count': 3},
-                    'Isha': {'enabled': True, 'repeat_count': 3}
-                }
-                with open(self.notifications_config_file, 'w') as f:
-                    json.dump(default_notifications, f, indent=2)
-            except Exception as e:
-                print(f"Could not create default notifications config: {e}")
+        return self.config.iqama_delays()
     
     def get_iqama_delay(self, prayer):
         """Get Iqama delay from config"""
-        iqama_times = self.load_iqama_times()
-        return iqama_times.get(prayer, 15)
+        return self.config.iqama_delay(prayer)
     
     def is_iqama_time(self, prayer):
-        if not prayer or prayer not in self.prayer_times:
+        if not prayer or not self.prayer_times:
             return False
-        
-        now = datetime.now()
-        current_time = now.hour * 60 + now.minute
-        prayer_time = self.parse_time(self.prayer_times[prayer])
-        iqama_delay = self.get_iqama_delay(prayer)
-        
-        return prayer_time <= current_time < prayer_time + iqama_delay
+        return self.get_timeline().in_iqama_window(prayer, seconds_since_midnight(datetime.now()))
     
     def _gtk_menu_item(self, label, callback=None, sensitive=True):
         import gi
@@ -2483,45 +2467,29 @@ class ModernSalahApp(QMainWindow):
         return item
 
     def create_tray_menu(self):
-        """Create Gtk menu for GNOME AppIndicator"""
+        """Build the Gtk menu for GNOME AppIndicator once; update_tray_menu fills it in"""
         import gi
         gi.require_version('Gtk', '3.0')
         from gi.repository import Gtk
 
         menu = Gtk.Menu()
-        city_name = self.tr_city(self.current_city)
-        menu.append(self._gtk_menu_item(f"🕌 Salah Times - {city_name}", callback=self.show_and_raise))
-        menu.append(Gtk.SeparatorMenuItem.new())
+        self._tray_items = {}
+        self._tray_state = {}
 
-        if self.prayer_times:
-            icons = {'Fajr': '☽', 'Chorok': '☀', 'Dohr': '☉',
-                     'Asr': '☀', 'Maghreb': '☾', 'Isha': '★'}
-            current_prayer = self.get_current_prayer()
-            for prayer in ['Fajr', 'Chorok', 'Dohr', 'Asr', 'Maghreb', 'Isha']:
-                if prayer == 'Chorok':
-                    t = OfflineSunriseCalculator.calculate_sunrise(self.current_city, datetime.now()) or '--:--'
-                elif prayer in self.prayer_times:
-                    t = self.prayer_times[prayer]
-                else:
-                    continue
-                icon = icons.get(prayer, '🕐')
-                name = self.tr_prayer(prayer)
-                marker = ' ◄' if (prayer == current_prayer or (prayer == 'Chorok' and current_prayer == 'Sunrise')) else ''
-                menu.append(self._gtk_menu_item(f"{icon} {name}: {t}{marker}", callback=self.show_and_raise))
-        else:
-            menu.append(self._gtk_menu_item("🔄 Loading prayer times...", sensitive=False))
+        def add(key, label='', callback=None, sensitive=True):
+            item = self._gtk_menu_item(label, callback=callback, sensitive=sensitive)
+            menu.append(item)
+            self._tray_items[key] = item
+            self._tray_state[key] = (label, True)
 
+        add('title', callback=self.show_and_raise)
         menu.append(Gtk.SeparatorMenuItem.new())
-        next_prayer = self.get_next_prayer()
-        if next_prayer and self.prayer_times:
-            name = self.tr_prayer(next_prayer)
-            if next_prayer == 'Chorok':
-                t = OfflineSunriseCalculator.calculate_sunrise(self.current_city, datetime.now()) or '--:--'
-            else:
-                t = self.prayer_times.get(next_prayer, '--:--')
-            menu.append(self._gtk_menu_item(f"⏰ {self.tr('next_prayer')}: {name} {t}", callback=self.show_and_raise))
-
-        menu.append(self._gtk_menu_item(f"📅 {self.get_translated_date()}", callback=self.show_and_raise))
+        for prayer in GRID_PRAYERS:
+            add(prayer, callback=self.show_and_raise)
+        add('loading', "🔄 Loading prayer times...", sensitive=False)
+        menu.append(Gtk.SeparatorMenuItem.new())
+        add('next', callback=self.show_and_raise)
+        add('date', callback=self.show_and_raise)
         menu.append(Gtk.SeparatorMenuItem.new())
         menu.append(self._gtk_menu_item("🪟 Show Main Window", callback=self.show_and_raise))
         menu.append(self._gtk_menu_item("↻ Refresh Prayer Times", callback=self.load_prayer_times))
@@ -2529,74 +2497,64 @@ class ModernSalahApp(QMainWindow):
         menu.append(self._gtk_menu_item("❌ Quit", callback=self.cleanup_and_quit))
         menu.show_all()
         self.tray_icon.set_menu(menu)
+        self.update_tray_menu()
+    
+    def _set_tray_item(self, key, label, visible=True):
+        """Push a menu item's label/visibility to Gtk only if it changed"""
+        old_label, old_visible = self._tray_state[key]
+        item = self._tray_items[key]
+        if visible and label != old_label:
+            item.set_label(label)
+        if visible != old_visible:
+            item.set_visible(visible)
+        self._tray_state[key] = (label if visible else old_label, visible)
+    
+    def update_tray_menu(self):
+        """Refresh the AppIndicator menu texts in place"""
+        if not self.tray_icon:
+            return
+        if not getattr(self, '_tray_items', None):
+            self.create_tray_menu()
+            return
+        city_name = self.tr_city(self.current_city)
+        self._set_tray_item('title', f"🕌 Salah Times - {city_name}")
+
+        timeline = self.get_timeline() if self.prayer_times else None
+        current_prayer = self.get_current_prayer()
+        for prayer in GRID_PRAYERS:
+            shown = bool(self.prayer_times) and (prayer == 'Chorok' or prayer in self.prayer_times)
+            label = None
+            if shown:
+                t = timeline.text(prayer)
+                icon = GRID_ICONS.get(prayer, '🕐')
+                name = self.tr_prayer(prayer)
+                marker = ' ◄' if (prayer == current_prayer or (prayer == 'Chorok' and current_prayer == 'Sunrise')) else ''
+                label = f"{icon} {name}: {t}{marker}"
+            self._set_tray_item(prayer, label, shown)
+        self._set_tray_item('loading', "🔄 Loading prayer times...", not self.prayer_times)
+
+        next_prayer = self.get_next_prayer()
+        if next_prayer and self.prayer_times:
+            name = self.tr_prayer(next_prayer)
+            t = self.get_timeline().text(next_prayer)
+            self._set_tray_item('next', f"⏰ {self.tr('next_prayer')}: {name} {t}")
+        else:
+            self._set_tray_item('next', None, False)
+        self._set_tray_item('date', f"📅 {self.get_translated_date()}")
     
     def get_countdown_to_next_prayer(self):
         """Get countdown to next prayer"""
         if not self.prayer_times:
             return "00:00:00"
-
-        now = datetime.now()
-        now_secs = now.hour * 3600 + now.minute * 60 + now.second
-
-        prayers = ['Fajr', 'Chorok', 'Dohr', 'Asr', 'Maghreb', 'Isha']
-
-        for prayer in prayers:
-            if prayer == 'Chorok':
-                calculated_chorok = OfflineSunriseCalculator.calculate_sunrise(self.current_city, now)
-                if calculated_chorok:
-                    prayer_secs = self.parse_time(calculated_chorok) * 60
-                else:
-                    continue
-            elif prayer in self.prayer_times:
-                prayer_secs = self.parse_time(self.prayer_times[prayer]) * 60
-            else:
-                continue
-
-            if prayer_secs > now_secs:
-                remaining = prayer_secs - now_secs
-                h = remaining // 3600
-                m = (remaining % 3600) // 60
-                s = remaining % 60
-                return f"{h:02d}:{m:02d}:{s:02d}"
-
-        if 'Fajr' in self.prayer_times:
-            fajr_secs = self.parse_time(self.prayer_times['Fajr']) * 60
-            remaining = 86400 - now_secs + fajr_secs
-            h = remaining // 3600
-            m = (remaining % 3600) // 60
-            s = remaining % 60
-            return f"{h:02d}:{m:02d}:{s:02d}"
-
-        return "00:00:00"
+        _, remaining, _ = self.get_timeline().next(seconds_since_midnight(datetime.now()))
+        return format_hms(remaining)
     
     def get_next_prayer(self):
         """Get next prayer name"""
         if not self.prayer_times:
             return None
-        
-        now = datetime.now()
-        current_time = now.hour * 60 + now.minute
-        
-        prayers = ['Fajr', 'Chorok', 'Dohr', 'Asr', 'Maghreb', 'Isha']
-        
-        for prayer in prayers:
-            if prayer == 'Chorok':
-                today = datetime.now()
-                calculated_chorok = OfflineSunriseCalculator.calculate_sunrise(self.current_city, today)
-                if calculated_chorok:
-                    prayer_time = self.parse_time(calculated_chorok)
-                else:
-                    continue
-            elif prayer in self.prayer_times:
-                prayer_time = self.parse_time(self.prayer_times[prayer])
-            else:
-                continue
-            
-            if prayer_time > current_time:
-                return prayer
-        
-        # If no prayer today, return Fajr for tomorrow
-        return 'Fajr'
+        prayer, _, _ = self.get_timeline().next(seconds_since_midnight(datetime.now()))
+        return prayer
     
     def update_tray_tooltip(self):
         if not self.tray_icon:
@@ -2604,109 +2562,55 @@ class ModernSalahApp(QMainWindow):
         next_prayer = self.get_next_prayer()
         if next_prayer:
             name = self.tr_prayer(next_prayer)
-            if next_prayer == 'Chorok':
-                t = OfflineSunriseCalculator.calculate_sunrise(self.current_city, datetime.now()) or '--:--'
-            else:
-                t = self.prayer_times.get(next_prayer, '--:--')
+            t = self.get_timeline().text(next_prayer)
             countdown = self.get_countdown_to_next_prayer()
+            if not self.tray_ticker.second_ticks:
+                countdown = countdown[:5]
             label = f"{name} {t} {countdown}"
         else:
             label = "--"
-        self.tray_icon.set_label(label, "")
+        if label != getattr(self, '_tray_label', None):
+            self._tray_label = label
+            self.tray_icon.set_label(label, "")
     
     def update_countdown(self):
         if not self.prayer_times:
             return
-            
-        now = datetime.now()
-        current_time = now.hour * 60 + now.minute
-        current_seconds = now.second
         
-        prayers = [name for name in self.prayer_times.keys() if name != 'Date']
+        timeline = self.get_timeline()
+        now_secs = seconds_since_midnight(datetime.now())
         
         # Always show Iqama countdown for current prayer
-        current_prayer = self.get_current_prayer()
+        current_prayer = timeline.current(now_secs)
         if current_prayer:
-            prayer_time = self.parse_time(self.prayer_times[current_prayer])
-            iqama_delay = self.get_iqama_delay(current_prayer)
-            iqama_end_time = prayer_time + iqama_delay
-            
-            remaining = iqama_end_time - current_time
+            remaining = timeline.seconds_until_iqama(current_prayer, now_secs)
             
             if remaining <= 0:
                 self.iqama_countdown.setText(self.tr('iqama_passed').format(self.tr_prayer(current_prayer)))
-                self.iqama_countdown.setStyleSheet("color: #90EE90; font-weight: bold;")
             else:
-                hours = remaining // 60
-                minutes = remaining % 60
-                seconds = 60 - current_seconds if current_seconds > 0 else 0
-                
-                if seconds == 60:
-                    seconds = 0
-                elif seconds > 0 and minutes > 0:
-                    minutes -= 1
-                
+                hours = remaining // 3600
+                minutes = (remaining % 3600) // 60
+                seconds = remaining % 60
                 self.iqama_countdown.setText(self.tr('iqama_time').format(self.tr_prayer(current_prayer), hours, minutes, seconds))
-                self.iqama_countdown.setStyleSheet("color: #90EE90; font-weight: bold;")
         else:
             self.iqama_countdown.setText("")
         
-        # Regular next prayer countdown
-        next_prayer_time = None
-        
-        for prayer in prayers:
-            if prayer in self.prayer_times:
-                prayer_time = self.parse_time(self.prayer_times[prayer])
-                if prayer_time > current_time:
-                    next_prayer_time = prayer_time
-                    break
-        
-        if not next_prayer_time and prayers:
-            # After last prayer, calculate time to tomorrow's first prayer (Fajr)
-            first_prayer = 'Fajr'  # Use 'Fajr' directly
-            if first_prayer in self.prayer_times:
-                fajr_time_str = self.prayer_times[first_prayer]
-                fajr_minutes = self.parse_time(fajr_time_str)
-                
-                # Calculate tomorrow's Fajr as total minutes from now
-                tomorrow_fajr_total_minutes = (24 * 60) + fajr_minutes
-                remaining = tomorrow_fajr_total_minutes - current_time
-                
-                print(f"Debug: Current time: {now.hour:02d}:{now.minute:02d} ({current_time} minutes)")
-                print(f"Debug: Today's Fajr: {fajr_time_str} ({fajr_minutes} minutes)")
-                print(f"Debug: Tomorrow's Fajr total: {tomorrow_fajr_total_minutes} minutes")
-                print(f"Debug: Time until tomorrow's Fajr: {remaining} minutes ({remaining//60}h {remaining%60}m)")
-            else:
-                remaining = 0
-        else:
-            remaining = next_prayer_time - current_time if next_prayer_time else 0
-        
-        if next_prayer_time or remaining > 0:
-            
-            hours = remaining // 60
-            minutes = remaining % 60
-            seconds = 60 - current_seconds if current_seconds > 0 else 0
-            
-            if seconds == 60:
-                seconds = 0
-            elif seconds > 0:
-                if minutes > 0:
-                    minutes -= 1
-                elif hours > 0:
-                    hours -= 1
-                    minutes = 59
-            
-            self.countdown.setText(f"{hours:02d}:{minutes:02d}:{seconds:02d}")
+        # Regular next prayer countdown (tomorrow's Fajr after the last prayer)
+        if timeline:
+            _, remaining, _ = timeline.next(now_secs)
+            self.countdown.setText(format_hms(remaining))
             
+    def on_clock_jumped(self, reason, seconds):
+        if self.timeline is not None and self.timeline.day != datetime.now().date():
+            self.load_prayer_times()  # Slept past midnight
+        self.update_countdown()
+        if getattr(self, 'tray_ticker', None) is not None:
+            self.tray_ticker.start()
+    
     def show_error(self, error_message):
         # Show error in prayer cards
-        for prayer in ['Fajr', 'Chorok', 'Dohr', 'Asr', 'Maghreb', 'Isha']:
-            if hasattr(self, 'prayer_cards') and prayer in self.prayer_cards:
-                card = self.prayer_cards[prayer]
-                for child in card.findChildren(QLabel):
-                    if child.property("class") == "prayer_time":
-                        child.setText("Error")
-                        child.setStyleSheet("color: #ff4444;")
+        if hasattr(self, 'prayer_grid'):
+            self.prayer_grid.show_placeholder("Error", error=True)
     
     def start_tray_indicator(self):
         """Create AppIndicator tray icon (GNOME compatible)"""
@@ -2733,9 +2637,8 @@ class ModernSalahApp(QMainWindow):
             self._gtk_thread = threading.Thread(target=Gtk.main, daemon=True)
             self._gtk_thread.start()
 
-            self.tray_timer = QTimer()
-            self.tray_timer.timeout.connect(self.update_tray_display)
-            self.tray_timer.start(1000)
+            self.tray_ticker = RefreshTicker(self.update_tray_display, self.tray_refresh_policy, parent=self)
+            self.tray_ticker.start()
 
             print("AppIndicator tray started")
         except Exception as e:
@@ -2747,12 +2650,17 @@ class ModernSalahApp(QMainWindow):
         if not self.tray_icon:
             return
         self.update_tray_tooltip()
-        if not hasattr(self, '_menu_tick'):
-            self._menu_tick = 0
-        self._menu_tick += 1
-        if self._menu_tick >= 60:
-            self._menu_tick = 0
-            self.create_tray_menu()
+        # Refresh the menu once a minute, whatever the tick rate
+        minute = datetime.now().replace(second=0, microsecond=0)
+        if getattr(self, '_menu_minute', None) != minute:
+            if getattr(self, '_menu_minute', None) is not None:
+                self.update_tray_menu()
+            self._menu_minute = minute
+    
+    def tray_refresh_policy(self):
+        timeline = self.get_timeline() if self.prayer_times else None
+        window = self.config.value('app', 'second_ticks_window', DEFAULT_SECONDS_WINDOW)
+        return next_tick(timeline, datetime.now(), window)
     
     def show_and_raise(self):
         """Show and raise the main window"""
@@ -2763,9 +2671,8 @@ class ModernSalahApp(QMainWindow):
     def restore_geometry(self):
         """Restore window geometry from saved settings"""
         try:
-            if os.path.exists(self.geometry_file):
-                with open(self.geometry_file, 'r') as f:
-                    geometry = json.load(f)
+            geometry = self.config.get('main_geometry')
+            if geometry:
                 self.resize(geometry.get('width', 480), geometry.get('height', 720))
                 if 'x' in geometry and 'y' in geometry:
                     self.move(geometry['x'], geometry['y'])
@@ -2780,15 +2687,13 @@ class ModernSalahApp(QMainWindow):
     def save_geometry(self):
         """Save current window geometry"""
         try:
-            os.makedirs(self.config_dir, exist_ok=True)
             geometry = {
                 'width': self.width(),
                 'height': self.height(),
                 'x': self.x(),
                 'y': self.y()
             }
-            with open(self.geometry_file, 'w') as f:
-                json.dump(geometry, f)
+            self.config.replace('main_geometry', geometry)
         except Exception as e:
             print(f"Could not save main geometry: {e}")
     
@@ -2809,6 +2714,25 @@ class ModernSalahApp(QMainWindow):
         self.save_geometry()
         QApplication.quit()
 
+    def showEvent(self, event):
+        super().showEvent(event)
+        if not self.isMinimized():
+            self.update_countdown()
+            self.timer.start(1000)
+    
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.timer.stop()
+    
+    def changeEvent(self, event):
+        super().changeEvent(event)
+        if event.type() == QEvent.WindowStateChange:
+            if self.isMinimized():
+                self.timer.stop()
+            elif self.isVisible() and not self.timer.isActive():
+                self.update_countdown()
+                self.timer.start(1000)
+    
     def closeEvent(self, event):
         if self.tray_icon:
             self.hide()